@@ -8,10 +8,8 @@ import signal
 from pathlib import Path
 from typing import Optional
 
-from .config import Config
+from .context import AppContext
 from .services.auth_service import AuthService
-from .services.reader_service import ReaderService
-from .parsers.factory import ParserFactory
 
 # 忽略 SIGPIPE 信号，避免管道关闭时的错误
 signal.signal(signal.SIGPIPE, signal.SIG_DFL)
@@ -86,25 +84,24 @@ def main():
 
     # 处理清理数据命令
     if args.clean:
-        config = Config()
+        config = AppContext.get().config
         config.clean_all_data()
         print("✓ 已清理所有数据")
         return 0
 
     # 处理重置密码命令
     if args.reset_password:
-        config = Config()
+        config = AppContext.get().config
         config.reset_password()
         print("✓ 已重置密码，下次启动时需要重新设置")
         return 0
 
     # 处理设置密码命令
     if args.set_password:
-        config = Config()
         auth = AuthService()
         
         # 如果已有密码，先验证
-        if config.has_password():
+        if auth.has_password():
             print("当前已设置密码，需要先验证身份")
             if not auth.verify_password():
                 print("✗ 密码验证失败，无法修改密码", file=sys.stderr)
@@ -150,6 +147,9 @@ def main():
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        # 关闭共享的进度与书签存储
+        AppContext.reset()
 
 
 def start_reader(file_path: Path, jump_options: dict = None) -> int:
@@ -173,15 +173,17 @@ def start_reader(file_path: Path, jump_options: dict = None) -> int:
     # 2. 加载文档（静默模式，仅在出错时显示信息）
     # print(f"正在加载文档: {file_path.name}...", file=sys.stderr)
 
-    # 创建解析器
+    # 创建解析器（只导入该格式所需的解析器）
+    from .parsers.factory import ParserFactory
     doc_parser = ParserFactory.create_parser(file_path)
     if doc_parser is None:
         print(f"错误：无法解析文档格式: {file_path}", file=sys.stderr)
         return 1
 
-    # 解析文档
+    # 解析文档（优先使用缓存，重复打开时跳过解析）
+    from .services.document_cache import DocumentCache
     try:
-        document = doc_parser.parse()
+        document = DocumentCache().load_or_parse(file_path, doc_parser)
     except Exception as e:
         print(f"错误：解析文档失败: {e}", file=sys.stderr)
         return 1
@@ -255,10 +257,10 @@ def output_full_document_with_resume(document, file_path: Path, start_page: int
     for page in all_pages:
         page_start_lines.append(current_line_count)
 
-        # 输出章节标题
+        # 输出章节标题（分段文档的段不是章节，只在开头输出一次）
         if page.chapter_index != prev_chapter_index:
             chapter = document.get_chapter(page.chapter_index)
-            if chapter:
+            if chapter and not (document.is_segmented and prev_chapter_index != -1):
                 if content_parts:
                     content_parts.append("")
                     current_line_count += 1
@@ -347,37 +349,38 @@ def output_with_jump(document, file_path: Path, jump_options: dict) -> int:
     """
     from .core.paginator import Paginator
 
-    # 创建分页器
+    # 创建分页器（按章节懒分页，只对需要的章节换行）
     paginator = Paginator(document)
-    all_pages = paginator.paginate()
-    total_pages = len(all_pages)
 
     # 处理跳转，计算起始页码
     start_page = 1
     if 'page' in jump_options:
         page_num = jump_options['page']
-        if 1 <= page_num <= total_pages:
+        if paginator.get_page(page_num) is not None:
             start_page = page_num
         else:
+            total_pages = paginator.get_total_pages()
             print(f"✗ 错误：无效的页码: {page_num} (共 {total_pages} 页)", file=sys.stderr)
             return 1
 
     elif 'chapter' in jump_options:
         chapter_num = jump_options['chapter']
-        if 0 <= chapter_num < document.total_chapters:
-            chapter_page = paginator.get_page_by_chapter(chapter_num)
+        if 0 <= chapter_num < document.navigable_chapters:
+            # 空章节（如只有图片）跳到其后第一个有内容的章节
+            chapter_page = paginator.get_nearest_chapter_page(chapter_num)
             if chapter_page:
                 start_page = chapter_page.page_number
             else:
                 print(f"✗ 错误：无法跳转到章节: {chapter_num}", file=sys.stderr)
                 return 1
         else:
-            print(f"✗ 错误：无效的章节: {chapter_num} (共 {document.total_chapters} 章)", file=sys.stderr)
+            print(f"✗ 错误：无效的章节: {chapter_num} (共 {document.navigable_chapters} 章)", file=sys.stderr)
             return 1
 
     elif 'percent' in jump_options:
         percent = jump_options['percent']
         if 0 <= percent <= 100:
+            total_pages = paginator.get_total_pages()
             start_page = max(1, int(total_pages * percent / 100))
             if start_page == 0:
                 start_page = 1
@@ -387,27 +390,26 @@ def output_with_jump(document, file_path: Path, jump_options: dict) -> int:
 
     # 检查是否使用管道或重定向
     if sys.stdout.isatty():
-        # 终端模式：加载完整文档，跳转到指定位置
+        # 终端模式：交互式分页器需要完整内容以便向前滚动，加载完整文档后跳转到指定位置
         return output_full_document_with_resume(document, file_path, start_page)
     else:
         # 管道模式：只输出从起始页到末尾（或指定页数）的内容
-        if 'pages' in jump_options:
-            end_page = min(start_page + jump_options['pages'] - 1, total_pages)
-        else:
-            end_page = total_pages
+        max_pages = jump_options.get('pages')
 
         prev_chapter_index = -1
+        end_page = start_page - 1
+        end_chapter = 0
         try:
-            for page_num in range(start_page, end_page + 1):
-                if page_num < 1 or page_num > len(all_pages):
-                    continue
+            page_num = start_page
+            while max_pages is None or page_num < start_page + max_pages:
+                page = paginator.get_page(page_num)
+                if page is None:
+                    break
 
-                page = all_pages[page_num - 1]
-
-                # 输出章节标题
+                # 输出章节标题（分段文档的段不是章节，只在开头输出一次）
                 if page.chapter_index != prev_chapter_index:
                     chapter = document.get_chapter(page.chapter_index)
-                    if chapter:
+                    if chapter and not (document.is_segmented and prev_chapter_index != -1):
                         if prev_chapter_index != -1:
                             print()
                         print(chapter.title)
@@ -416,21 +418,22 @@ def output_with_jump(document, file_path: Path, jump_options: dict) -> int:
 
                 # 输出页面内容
                 print(page.content)
+
+                end_page = page_num
+                end_chapter = page.chapter_index
+                page_num += 1
         except BrokenPipeError:
             pass
 
-        # 保存进度
+        # 保存进度（总页数只用于阅读百分比，按已分页的章节估算，不为其余章节换行）
         try:
             from .services.progress_service import ProgressService
             progress_service = ProgressService()
 
-            if end_page > 0 and end_page <= len(all_pages):
-                end_chapter = all_pages[end_page - 1].chapter_index
-            else:
-                end_chapter = 0
-
+            end_page = max(1, end_page)
             progress = progress_service.create_progress(
-                file_path, document, end_page, end_chapter, total_pages
+                file_path, document, end_page, end_chapter,
+                max(end_page, paginator.estimate_total_pages())
             )
             progress_service.save_progress(progress)
         except Exception:
@@ -463,7 +466,7 @@ def _output_with_jump_pipe_mode(document, file_path: Path, jump_options: dict) -
 
             if page.chapter_index != prev_chapter_index:
                 chapter = document.get_chapter(page.chapter_index)
-                if chapter:
+                if chapter and not (document.is_segmented and prev_chapter_index != -1):
                     if prev_chapter_index != -1:
                         print()
                     print(chapter.title)
@@ -1,44 +1,114 @@
 """配置管理模块"""
 
+import copy
+import os
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set, Tuple
 
 from .utils.file_utils import (
     get_config_dir,
     ensure_dir,
     read_json_file,
-    write_json_file
+    write_json_file,
+    DURABILITY_MODES
 )
 
 
+# 进程内共享的配置缓存：配置文件路径 -> (文件状态签名, 配置字典)
+_config_cache: Dict[str, Tuple[Optional[tuple], Dict[str, Any]]] = {}
+
+# 本进程内已确保存在的目录
+_ensured_dirs: Set[Tuple[Path, Path]] = set()
+
+
+def _stat_key(path: Path) -> Optional[tuple]:
+    """
+    配置文件的状态签名，文件不存在时为None
+
+    配置文件总是通过原子重命名写入，每次写入 inode 都会变化，
+    因此签名中带上 inode，不依赖 mtime 的精度。
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
 class Config:
     """配置管理器"""
     
     VERSION = "1.0"
     
+    # 各类文件默认的写入持久性策略（可在 config.json 的 durability 中覆盖）
+    # 配置文件写入少、丢失代价高，保留轮转备份；进度和书签写入频繁，只保证落盘
+    DURABILITY_DEFAULTS = {
+        'config': 'paranoid',
+        'progress': 'safe',
+        'bookmarks': 'safe',
+    }
+    
     def __init__(self):
         self.config_dir = get_config_dir()
         self.config_file = self.config_dir / 'config.json'
         self.progress_file = self.config_dir / 'progress.json'
         self.bookmarks_dir = self.config_dir / 'bookmarks'
+        self.cache_dir = self.config_dir / 'cache'
         self.log_file = self.config_dir / 'app.log'
         
         # 确保目录存在
         self._ensure_directories()
     
+    @property
+    def database_file(self) -> Path:
+        """SQLite 存储的数据库文件"""
+        return self.config_dir / 'library.db'
+    
+    @property
+    def progress_lock_file(self) -> Path:
+        """进度文件的锁文件"""
+        return self.progress_file.with_name(self.progress_file.name + '.lock')
+    
+    @property
+    def bookmarks_lock_file(self) -> Path:
+        """书签的锁文件"""
+        return self.bookmarks_dir / '.lock'
+    
+    @property
+    def fingerprint_file(self) -> Path:
+        """文件指纹缓存"""
+        return self.config_dir / 'fingerprints.json'
+    
+    @property
+    def progress_journal_file(self) -> Path:
+        """日志式存储的进度日志文件"""
+        return self.config_dir / 'progress.journal'
+    
     def _ensure_directories(self) -> None:
-        """确保所有必要的目录存在"""
+        """确保所有必要的目录存在（同一进程内每组目录只检查一次）"""
+        key = (self.config_dir, self.bookmarks_dir)
+        if key in _ensured_dirs:
+            return
+        
         ensure_dir(self.config_dir)
         ensure_dir(self.bookmarks_dir)
+        _ensured_dirs.add(key)
     
     def load_config(self) -> Dict[str, Any]:
         """
         加载配置文件
         
+        配置在进程内缓存，只有文件的 inode、大小或修改时间变化时才重新读取解析。
+        
         Returns:
-            配置字典
+            配置字典（副本，可直接修改后传给 save_config）
         """
+        key = _stat_key(self.config_file)
+        cached = _config_cache.get(str(self.config_file))
+        if cached is not None and cached[0] == key:
+            return copy.deepcopy(cached[1])
+        
         default_config = {
             'version': self.VERSION,
             'password_hash': None,
@@ -53,7 +123,8 @@ class Config:
         if 'version' not in config:
             config['version'] = self.VERSION
         
-        return config
+        _config_cache[str(self.config_file)] = (key, config)
+        return copy.deepcopy(config)
     
     def save_config(self, config: Dict[str, Any]) -> None:
         """
@@ -64,7 +135,8 @@ class Config:
         """
         config['version'] = self.VERSION
         config['updated_at'] = datetime.now().isoformat()
-        write_json_file(self.config_file, config)
+        write_json_file(self.config_file, config, durability=self.get_durability('config'))
+        _config_cache[str(self.config_file)] = (_stat_key(self.config_file), copy.deepcopy(config))
     
     def has_password(self) -> bool:
         """
@@ -108,6 +180,84 @@ class Config:
         """重置密码（删除配置文件）"""
         if self.config_file.exists():
             self.config_file.unlink()
+        _config_cache.pop(str(self.config_file), None)
+    
+    def get_fingerprint_scheme(self) -> str:
+        """
+        获取文件指纹方案
+        
+        Returns:
+            指纹方案名称（'md5' 或 'sampled'）
+        """
+        from .utils.fingerprint import SCHEMES, DEFAULT_SCHEME
+        
+        scheme = self.load_config().get('fingerprint_scheme', DEFAULT_SCHEME)
+        return scheme if scheme in SCHEMES else DEFAULT_SCHEME
+    
+    def set_fingerprint_scheme(self, scheme: str) -> None:
+        """
+        设置文件指纹方案
+        
+        Args:
+            scheme: 指纹方案名称
+            
+        Raises:
+            ValueError: 未知的指纹方案
+        """
+        from .utils.fingerprint import SCHEMES
+        
+        if scheme not in SCHEMES:
+            raise ValueError(f"未知的指纹方案: {scheme}")
+        
+        config = self.load_config()
+        config['fingerprint_scheme'] = scheme
+        self.save_config(config)
+    
+    def get_storage_backend(self) -> str:
+        """
+        获取进度与书签的存储后端
+        
+        Returns:
+            存储后端名称（'sqlite'、'json' 或 'journal'）
+        """
+        from .storage import BACKENDS, DEFAULT_BACKEND
+        
+        backend = self.load_config().get('storage_backend', DEFAULT_BACKEND)
+        return backend if backend in BACKENDS else DEFAULT_BACKEND
+    
+    def set_storage_backend(self, backend: str) -> None:
+        """
+        设置进度与书签的存储后端
+        
+        Args:
+            backend: 存储后端名称
+            
+        Raises:
+            ValueError: 未知的存储后端
+        """
+        from .storage import BACKENDS
+        
+        if backend not in BACKENDS:
+            raise ValueError(f"未知的存储后端: {backend}")
+        
+        config = self.load_config()
+        config['storage_backend'] = backend
+        self.save_config(config)
+    
+    def get_durability(self, file_class: str) -> str:
+        """
+        获取某类文件的写入持久性策略
+        
+        Args:
+            file_class: 文件类别（config、progress 或 bookmarks）
+            
+        Returns:
+            持久性策略（fast、safe 或 paranoid）
+        """
+        overrides = self.load_config().get('durability')
+        if isinstance(overrides, dict) and overrides.get(file_class) in DURABILITY_MODES:
+            return overrides[file_class]
+        return self.DURABILITY_DEFAULTS.get(file_class, 'safe')
     
     def get_bookmark_file(self, file_hash: str) -> Path:
         """
@@ -133,34 +283,30 @@ class Config:
         """
         from datetime import timedelta
         
+        from .storage import create_store
+        
         cleaned_count = 0
         threshold = datetime.now() - timedelta(days=days)
+        store = create_store(self)
         
-        # 清理进度文件
-        progress_data = read_json_file(self.progress_file)
-        if progress_data and 'documents' in progress_data:
-            original_count = len(progress_data['documents'])
-            progress_data['documents'] = [
-                doc for doc in progress_data['documents']
-                if datetime.fromisoformat(doc['last_read_time']) > threshold
-            ]
-            cleaned_count += original_count - len(progress_data['documents'])
+        try:
+            # 清理过期的进度记录
+            for record in store.all_progress():
+                try:
+                    expired = datetime.fromisoformat(record['last_read_time']) <= threshold
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if expired and store.delete_progress(record['file_hash']):
+                    cleaned_count += 1
             
-            if progress_data['documents']:
-                write_json_file(self.progress_file, progress_data)
-            elif self.progress_file.exists():
-                self.progress_file.unlink()
-        
-        # 清理无效的书签文件
-        if self.bookmarks_dir.exists():
-            for bookmark_file in self.bookmarks_dir.glob('*.json'):
-                bookmark_data = read_json_file(bookmark_file)
-                if bookmark_data:
-                    file_path = Path(bookmark_data.get('file_path', ''))
-                    # 如果原文件不存在或书签列表为空，删除书签文件
-                    if not file_path.exists() or not bookmark_data.get('bookmarks'):
-                        bookmark_file.unlink()
+            # 清理无效的书签：原文件不存在或书签列表为空
+            for data in store.all_bookmarks():
+                file_path = Path(data.get('file_path', ''))
+                if not file_path.exists() or not data.get('bookmarks'):
+                    if store.delete_bookmarks(data['file_hash']):
                         cleaned_count += 1
+        finally:
+            store.close()
         
         return cleaned_count
     
@@ -170,6 +316,8 @@ class Config:
         
         if self.config_dir.exists():
             shutil.rmtree(self.config_dir)
+        _config_cache.pop(str(self.config_file), None)
+        _ensured_dirs.discard((self.config_dir, self.bookmarks_dir))
         
         # 重新创建目录
         self._ensure_directories()
@@ -0,0 +1,68 @@
+"""应用上下文模块"""
+
+import threading
+from typing import Optional
+
+from .config import Config
+from .storage import BaseStore, create_store
+
+
+class AppContext:
+    """
+    进程内共享的应用上下文
+
+    持有同一个 Config 与进度/书签存储，供 cli 与各服务共用，
+    避免每个服务各自创建配置、检查目录并打开存储。
+    """
+
+    _instance: Optional['AppContext'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, config: Optional[Config] = None):
+        """
+        初始化应用上下文
+
+        Args:
+            config: 配置管理器实例，默认新建
+        """
+        self.config = config or Config()
+        self._store: Optional[BaseStore] = None
+        self._store_lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> 'AppContext':
+        """
+        获取共享的应用上下文（首次调用时创建）
+
+        Returns:
+            应用上下文实例
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset(cls) -> None:
+        """关闭并丢弃共享的应用上下文"""
+        with cls._instance_lock:
+            if cls._instance is not None:
+                cls._instance.close()
+            cls._instance = None
+
+    @property
+    def store(self) -> BaseStore:
+        """按配置创建的进度与书签存储（首次访问时打开）"""
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = create_store(self.config)
+        return self._store
+
+    def close(self) -> None:
+        """释放上下文持有的存储"""
+        with self._store_lock:
+            if self._store is not None:
+                self._store.close()
+                self._store = None
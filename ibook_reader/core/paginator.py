@@ -1,9 +1,10 @@
 """分页引擎"""
 
 import os
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 from ..models.document import Document, Chapter
-from ..utils.text_utils import get_display_width
+from ..utils.text_utils import wrap_line
+from . import vector_wrap
 
 
 class Page:
@@ -32,6 +33,11 @@ class Paginator:
     # 大文档缓存窗口（前后各缓存的页数）
     CACHE_WINDOW = 3
     
+    # 章节字符数达到该阈值且安装了 NumPy 时，使用向量化换行后端（None 表示不使用）
+    # 纯 Python 换行按同宽字符段整体切片，实测更快（12.7MB ASCII 章节 0.18s 对 0.58s，
+    # 1.5MB 中文章节 0.06s 对 0.06s），因此默认不启用
+    VECTOR_MIN_CHARS: Optional[int] = None
+    
     def __init__(self, document: Document, rows: Optional[int] = None, cols: Optional[int] = None):
         """
         初始化分页器
@@ -49,10 +55,16 @@ class Paginator:
         self.available_rows = self._calculate_available_rows()
         self.available_cols = self._calculate_available_cols()
         
-        # 页面缓存
+        # 页面缓存（小文档缓存全部页面）
         self._pages_cache: List[Page] = []
         self._cache_valid = False
         self._is_small_doc = False
+        
+        # 页面索引：每个章节各页起始位置在章节内容中的字符偏移（None 表示尚未建立）
+        self._page_index: List[Optional[List[int]]] = [None] * document.total_chapters
+        
+        # 已生成内容的页面（大文档只保留当前页前后 CACHE_WINDOW 页）
+        self._page_window: Dict[int, Page] = {}
     
     def _get_terminal_rows(self) -> int:
         """获取终端行数"""
@@ -98,6 +110,8 @@ class Paginator:
         # 使缓存失效
         self._cache_valid = False
         self._pages_cache.clear()
+        self._page_index = [None] * self.document.total_chapters
+        self._page_window.clear()
     
     def paginate(self) -> List[Page]:
         """
@@ -131,6 +145,204 @@ class Paginator:
         
         return pages
     
+    def _get_chapter_index(self, chapter_index: int) -> List[int]:
+        """
+        获取章节的页面索引（只计算换行，不生成页面内容）
+        
+        Args:
+            chapter_index: 章节索引
+            
+        Returns:
+            章节各页起始位置的字符偏移列表
+        """
+        page_starts = self._page_index[chapter_index]
+        if page_starts is None:
+            chapter = self.document.chapters[chapter_index]
+            page_starts = self._build_chapter_index(chapter)
+            self._page_index[chapter_index] = page_starts
+        return page_starts
+    
+    def _get_chapter_start_page(self, chapter_index: int) -> int:
+        """
+        获取章节起始页码（只统计之前章节的页数）
+        
+        Args:
+            chapter_index: 章节索引
+            
+        Returns:
+            章节第一页的页码
+        """
+        return 1 + sum(len(self._get_chapter_index(i)) for i in range(chapter_index))
+    
+    def _locate_page(self, page_number: int) -> Optional[Tuple[int, int]]:
+        """
+        根据页码定位章节，只为目标章节及之前的章节建立索引
+        
+        Args:
+            page_number: 页码（从1开始）
+            
+        Returns:
+            (章节索引, 章内页面下标) 元组，如果页码无效返回None
+        """
+        if page_number < 1:
+            return None
+        
+        start_page = 1
+        for chapter_index in range(self.document.total_chapters):
+            count = len(self._get_chapter_index(chapter_index))
+            if page_number < start_page + count:
+                return chapter_index, page_number - start_page
+            start_page += count
+        
+        return None
+    
+    def _build_chapter_index(self, chapter: Chapter) -> List[int]:
+        """
+        建立章节的页面索引，分页规则与 _paginate_chapter 保持一致
+        
+        Args:
+            chapter: 章节对象
+            
+        Returns:
+            章节各页起始位置的字符偏移列表
+        """
+        if self._use_vector_backend(chapter):
+            return self._build_chapter_index_vector(chapter)
+        
+        page_starts = []
+        total_rows = 0
+        last_content_row = -1
+        line_start = 0
+        
+        for line in chapter.content.split('\n'):
+            row_start = line_start
+            for row in self._wrap_line(line):
+                # 每页第一行的起始位置即为该页的索引
+                if total_rows % self.available_rows == 0:
+                    page_starts.append(row_start)
+                row_start += len(row)
+                total_rows += 1
+            
+            if line:
+                last_content_row = total_rows - 1
+            line_start += len(line) + 1
+        
+        # 不满一页的末页去除尾部空行后没有内容则不计为一页（整页空行仍计为一页）
+        if (total_rows % self.available_rows
+                and last_content_row < (len(page_starts) - 1) * self.available_rows):
+            page_starts.pop()
+        
+        return page_starts
+    
+    def _use_vector_backend(self, chapter: Chapter) -> bool:
+        """
+        判断章节是否使用 NumPy 向量化换行后端
+        
+        Args:
+            chapter: 章节对象
+            
+        Returns:
+            是否使用向量化后端
+        """
+        return (
+            self.VECTOR_MIN_CHARS is not None
+            and len(chapter.content) >= self.VECTOR_MIN_CHARS
+            and vector_wrap.is_available()
+        )
+    
+    def _build_chapter_index_vector(self, chapter: Chapter) -> List[int]:
+        """
+        使用向量化后端建立章节的页面索引
+        
+        Args:
+            chapter: 章节对象
+            
+        Returns:
+            章节各页起始位置的字符偏移列表
+        """
+        row_starts, row_ends = vector_wrap.compute_rows(chapter.content, self.available_cols)
+        page_starts = row_starts[::self.available_rows].tolist()
+        
+        # 不满一页的末页去除尾部空行后没有内容则不计为一页（整页空行仍计为一页）
+        content_rows = (row_ends > row_starts).nonzero()[0]
+        last_content_row = int(content_rows[-1]) if len(content_rows) else -1
+        if (len(row_starts) % self.available_rows
+                and last_content_row < (len(page_starts) - 1) * self.available_rows):
+            page_starts.pop()
+        
+        return page_starts
+    
+    def _materialize_page(self, chapter_index: int, page_offset: int, page_number: int) -> Page:
+        """
+        根据页面索引生成单个页面的内容
+        
+        Args:
+            chapter_index: 章节索引
+            page_offset: 章内页面下标
+            page_number: 页码
+            
+        Returns:
+            页面对象
+        """
+        content = self.document.chapters[chapter_index].content
+        page_starts = self._get_chapter_index(chapter_index)
+        start = page_starts[page_offset]
+        is_last = page_offset == len(page_starts) - 1
+        end = len(content) if is_last else page_starts[page_offset + 1]
+        
+        # 页面片段的首尾可能落在某一行中间，这部分直接按列宽换行
+        rows = []
+        pos = start
+        while len(rows) < self.available_rows:
+            line_end = content.find('\n', pos)
+            if line_end == -1:
+                line_end = len(content)
+            piece_end = min(line_end, end)
+            piece = content[pos:piece_end]
+            
+            at_line_start = pos == 0 or content[pos - 1] == '\n'
+            if at_line_start and piece_end == line_end:
+                rows.extend(self._wrap_line(piece))
+            else:
+                rows.extend(self._wrap_text(piece))
+            
+            if piece_end >= end or line_end >= len(content):
+                break
+            pos = line_end + 1
+        
+        rows = rows[:self.available_rows]
+        
+        # 不满一页的末页移除末尾多余的空行
+        if len(rows) < self.available_rows:
+            while rows and not rows[-1]:
+                rows.pop()
+        
+        return Page('\n'.join(rows), page_number, chapter_index)
+    
+    def _get_window_page(self, chapter_index: int, page_offset: int, page_number: int) -> Page:
+        """
+        从缓存窗口获取页面，并淘汰窗口以外的页面
+        
+        Args:
+            chapter_index: 章节索引
+            page_offset: 章内页面下标
+            page_number: 页码
+            
+        Returns:
+            页面对象
+        """
+        page = self._page_window.get(page_number)
+        if page is None:
+            page = self._materialize_page(chapter_index, page_offset, page_number)
+            self._page_window[page_number] = page
+        
+        # 以当前页为中心滑动窗口
+        for cached_number in list(self._page_window):
+            if abs(cached_number - page_number) > self.CACHE_WINDOW:
+                del self._page_window[cached_number]
+        
+        return page
+    
     def _paginate_chapter(self, chapter: Chapter, start_page_number: int) -> List[Page]:
         """
         对单个章节进行分页
@@ -142,6 +354,9 @@ class Paginator:
         Returns:
             章节的页面列表
         """
+        if self._use_vector_backend(chapter):
+            return self._paginate_chapter_vector(chapter, start_page_number)
+        
         pages = []
         page_number = start_page_number
         
@@ -176,6 +391,38 @@ class Paginator:
         
         return pages
     
+    def _paginate_chapter_vector(self, chapter: Chapter, start_page_number: int) -> List[Page]:
+        """
+        使用向量化后端对单个章节进行分页，结果与 _paginate_chapter 一致
+        
+        Args:
+            chapter: 章节对象
+            start_page_number: 起始页码
+            
+        Returns:
+            章节的页面列表
+        """
+        content = chapter.content
+        row_starts, row_ends = vector_wrap.compute_rows(content, self.available_cols)
+        rows = [content[start:end] for start, end in zip(row_starts.tolist(), row_ends.tolist())]
+        
+        pages = []
+        page_number = start_page_number
+        for offset in range(0, len(rows), self.available_rows):
+            page_rows = rows[offset:offset + self.available_rows]
+            
+            # 不满一页的末页移除末尾多余的空行
+            if len(page_rows) < self.available_rows:
+                while page_rows and not page_rows[-1]:
+                    page_rows.pop()
+                if not page_rows:
+                    break
+            
+            pages.append(Page('\n'.join(page_rows), page_number, chapter.index))
+            page_number += 1
+        
+        return pages
+    
     def _wrap_line(self, line: str) -> List[str]:
         """
         对单行进行自动换行
@@ -190,36 +437,19 @@ class Paginator:
         if not line.strip():
             return [line]
         
-        lines = []
-        current_line = []
-        current_width = 0
+        return self._wrap_text(line)
+    
+    def _wrap_text(self, text: str) -> List[str]:
+        """
+        按可用列数对文本进行换行（不做空行判断，用于从行中间开始的片段）
         
-        # 遍历行中的每个字符
-        for char in line:
-            char_width = get_display_width(char)
+        Args:
+            text: 不含换行符的文本
             
-            # 检查是否需要换行
-            if current_width + char_width > self.available_cols:
-                # 尝试在合适的位置断行
-                if current_line:
-                    lines.append(''.join(current_line))
-                    current_line = [char]
-                    current_width = char_width
-                else:
-                    # 单个字符就超过宽度，强制添加
-                    current_line.append(char)
-                    lines.append(''.join(current_line))
-                    current_line = []
-                    current_width = 0
-            else:
-                current_line.append(char)
-                current_width += char_width
-        
-        # 添加最后一行
-        if current_line:
-            lines.append(''.join(current_line))
-        
-        return lines if lines else [line]
+        Returns:
+            换行后的文本列表
+        """
+        return wrap_line(text, self.available_cols)
     
     def get_page(self, page_number: int) -> Optional[Page]:
         """
@@ -231,12 +461,17 @@ class Paginator:
         Returns:
             页面对象，如果页码无效返回None
         """
-        pages = self.paginate()
+        if self._cache_valid and self._pages_cache:
+            if 1 <= page_number <= len(self._pages_cache):
+                return self._pages_cache[page_number - 1]
+            return None
         
-        if 1 <= page_number <= len(pages):
-            return pages[page_number - 1]
+        location = self._locate_page(page_number)
+        if location is None:
+            return None
         
-        return None
+        chapter_index, page_offset = location
+        return self._get_window_page(chapter_index, page_offset, page_number)
     
     def get_total_pages(self) -> int:
         """
@@ -245,8 +480,33 @@ class Paginator:
         Returns:
             总页数
         """
-        pages = self.paginate()
-        return len(pages)
+        if self._cache_valid and self._pages_cache:
+            return len(self._pages_cache)
+        
+        return sum(
+            len(self._get_chapter_index(i))
+            for i in range(self.document.total_chapters)
+        )
+    
+    def estimate_total_pages(self) -> int:
+        """
+        估算总页数（不为尚未建立索引的章节换行）
+        
+        已建立索引的章节按实际页数计，其余章节按已索引章节的平均页数估算；
+        所有章节都已建立索引时与 get_total_pages 相同。
+        
+        Returns:
+            估算的总页数（至少为1）
+        """
+        if self._cache_valid and self._pages_cache:
+            return len(self._pages_cache)
+        
+        counts = [len(page_starts) for page_starts in self._page_index if page_starts is not None]
+        total = sum(counts)
+        missing = len(self._page_index) - len(counts)
+        if missing and counts:
+            total += round(total / len(counts) * missing)
+        return max(1, total)
     
     def get_page_by_chapter(self, chapter_index: int) -> Optional[Page]:
         """
@@ -261,13 +521,32 @@ class Paginator:
         if chapter_index < 0 or chapter_index >= self.document.total_chapters:
             return None
         
-        pages = self.paginate()
+        # 空章节没有页面
+        if not self._get_chapter_index(chapter_index):
+            return None
         
-        # 查找该章节的第一页
-        for page in pages:
-            if page.chapter_index == chapter_index:
-                return page
+        page_number = self._get_chapter_start_page(chapter_index)
+        return self.get_page(page_number)
+    
+    def get_nearest_chapter_page(self, chapter_index: int, step: int = 1) -> Optional[Page]:
+        """
+        获取指定章节的第一页，章节为空时沿 step 方向跳过空章节
         
+        按需读取的文档（如大 EPUB）中只有图片的章节没有页面，
+        章节导航借此跳过这些章节。
+        
+        Args:
+            chapter_index: 章节索引（从0开始）
+            step: 跳过空章节的方向（1 向后，-1 向前）
+            
+        Returns:
+            最近的非空章节的第一页，不存在返回None
+        """
+        while 0 <= chapter_index < self.document.total_chapters:
+            page = self.get_page_by_chapter(chapter_index)
+            if page is not None:
+                return page
+            chapter_index += step
         return None
     
     def find_page_position(self, page_number: int) -> Optional[Tuple[int, int]]:
@@ -280,19 +559,9 @@ class Paginator:
         Returns:
             (章节索引, 章内页码) 元组，如果页码无效返回None
         """
-        page = self.get_page(page_number)
-        if page is None:
+        location = self._locate_page(page_number)
+        if location is None:
             return None
         
-        # 计算章内页码
-        pages = self.paginate()
-        chapter_start_page = 1
-        
-        for p in pages:
-            if p.chapter_index == page.chapter_index:
-                chapter_start_page = p.page_number
-                break
-        
-        chapter_page = page_number - chapter_start_page + 1
-        
-        return (page.chapter_index, chapter_page)
+        chapter_index, page_offset = location
+        return (chapter_index, page_offset + 1)
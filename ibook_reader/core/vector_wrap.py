@@ -0,0 +1,180 @@
+"""基于 NumPy 的批量换行计算（可选后端）"""
+
+from typing import Tuple
+
+from ..utils.text_utils import _get_width_table, _unicode_char_width
+
+# NumPy 模块（首次使用时导入，避免拖慢启动）
+np = None
+
+# NumPy 是否可用（None 表示尚未检测）
+_available = None
+
+# 每次处理的字符块大小（在换行符处切分，限制峰值内存）
+BLOCK_SIZE = 1 << 20
+
+# NumPy 格式的 BMP 宽度表及空白字符表
+_np_width_table = None
+_np_space_table = None
+
+
+def is_available() -> bool:
+    """
+    判断 NumPy 后端是否可用
+
+    Returns:
+        是否可以使用 NumPy 后端
+    """
+    global np, _available
+
+    if _available is None:
+        try:
+            import numpy
+        except ImportError:
+            # 未安装 NumPy 时不启用该后端
+            _available = False
+        else:
+            np = numpy
+            _available = True
+
+    return _available
+
+
+def _get_np_width_table():
+    """获取 NumPy 数组形式的 BMP 宽度表"""
+    global _np_width_table
+
+    if _np_width_table is None:
+        _np_width_table = np.frombuffer(_get_width_table(), dtype=np.uint8)
+
+    return _np_width_table
+
+
+def _get_np_space_table():
+    """获取 NumPy 数组形式的 BMP 空白字符表（与 str.isspace 一致）"""
+    global _np_space_table
+
+    if _np_space_table is None:
+        _np_space_table = np.array(
+            [chr(code).isspace() for code in range(0x10000)], dtype=bool
+        )
+
+    return _np_space_table
+
+
+def compute_rows(content: str, max_width: int) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    计算文本换行后每一行的起止位置
+
+    规则与 Paginator._wrap_line 一致：按显示宽度贪心换行，
+    空行及只含空白字符的行不换行。
+
+    Args:
+        content: 文本内容（可包含换行符）
+        max_width: 每行最大显示宽度（至少为2）
+
+    Returns:
+        (行起始偏移数组, 行结束偏移数组)，偏移为 content 中的字符下标
+    """
+    if not is_available():
+        raise RuntimeError("未安装 NumPy，无法使用向量化换行")
+
+    starts_parts = []
+    ends_parts = []
+
+    block_start = 0
+    length = len(content)
+    while True:
+        # 在换行符之后切分字符块
+        if length - block_start > BLOCK_SIZE:
+            newline = content.find('\n', block_start + BLOCK_SIZE)
+            block_end = length if newline == -1 else newline + 1
+        else:
+            block_end = length
+
+        starts, ends = _compute_block_rows(content, block_start, block_end, max_width)
+        starts_parts.append(starts)
+        ends_parts.append(ends)
+
+        if block_end >= length:
+            break
+        block_start = block_end
+
+    return np.concatenate(starts_parts), np.concatenate(ends_parts)
+
+
+def _compute_block_rows(
+    content: str,
+    block_start: int,
+    block_end: int,
+    max_width: int
+) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    计算一个字符块内各行的起止位置
+
+    Args:
+        content: 完整文本
+        block_start: 字符块起始位置（位于行首）
+        block_end: 字符块结束位置（位于行首或文本末尾）
+        max_width: 每行最大显示宽度
+
+    Returns:
+        (行起始偏移数组, 行结束偏移数组)
+    """
+    block = content[block_start:block_end]
+    codes = np.frombuffer(block.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+
+    # 一次性映射出每个字符的宽度，BMP 以外的少量字符单独计算
+    widths = np.ones(len(codes), dtype=np.uint8)
+    bmp = codes < 0x10000
+    widths[bmp] = _get_np_width_table()[codes[bmp]]
+    for i in np.flatnonzero(~bmp):
+        widths[i] = _unicode_char_width(block[i])
+
+    newlines = np.flatnonzero(codes == 0x0A)
+    widths[newlines] = 0
+
+    # cumulative[i] 为前 i 个字符的总宽度
+    cumulative = np.zeros(len(codes) + 1, dtype=np.int64)
+    np.cumsum(widths, out=cumulative[1:])
+
+    # 块末尾以换行结束时，最后一个换行符之后没有行
+    line_starts = np.concatenate(([0], newlines + 1))
+    line_ends = np.concatenate((newlines, [len(codes)]))
+    if block_end < len(content):
+        line_starts = line_starts[:-1]
+        line_ends = line_ends[:-1]
+
+    # 超宽且含非空白字符的行需要换行，只含空白字符的行保持原样
+    line_widths = cumulative[line_ends] - cumulative[line_starts]
+    long_lines = np.flatnonzero(line_widths > max_width)
+    if len(long_lines):
+        visible = np.zeros(len(codes) + 1, dtype=np.int64)
+        np.cumsum(~_get_np_space_table()[np.minimum(codes, 0xFFFF)], out=visible[1:])
+        has_text = visible[line_ends[long_lines]] > visible[line_starts[long_lines]]
+        long_lines = long_lines[has_text]
+
+    # 所有超宽行同时推进：每轮为每行找出当前行能容纳的最远位置
+    row_starts = [line_starts]
+    row_line_ends = [line_ends]
+    positions = line_starts[long_lines]
+    ends = line_ends[long_lines]
+    while len(positions):
+        breaks = np.searchsorted(cumulative, cumulative[positions] + max_width, side='right') - 1
+        wrapped = breaks < ends
+        positions = breaks[wrapped]
+        ends = ends[wrapped]
+        row_starts.append(positions)
+        row_line_ends.append(ends)
+
+    # 各行起始位置互不相同，按位置排序即为阅读顺序
+    starts = np.concatenate(row_starts)
+    order = np.argsort(starts, kind='stable')
+    starts = starts[order]
+    row_ends = np.concatenate(row_line_ends)[order]
+
+    # 行结束位置为同一行中下一段的起始位置或该行末尾
+    next_starts = np.append(starts[1:], len(codes))
+    row_ends = np.minimum(next_starts, row_ends)
+
+    return starts.astype(np.int64) + block_start, row_ends.astype(np.int64) + block_start
@@ -1,7 +1,7 @@
 """数据模型模块"""
 
-from .document import Document, Chapter
+from .document import Document, Chapter, LazyChapter, DocumentMetadata
 from .bookmark import Bookmark
 from .progress import ReadingProgress
 
-__all__ = ['Document', 'Chapter', 'Bookmark', 'ReadingProgress']
+__all__ = ['Document', 'Chapter', 'LazyChapter', 'DocumentMetadata', 'Bookmark', 'ReadingProgress']
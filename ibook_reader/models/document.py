@@ -1,7 +1,7 @@
 """文档数据模型"""
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 
 
 @dataclass
@@ -17,6 +17,83 @@ class Chapter:
             raise ValueError("章节索引不能为负数")
         if not self.title:
             self.title = f"第 {self.index + 1} 章"
+    
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            'index': self.index,
+            'title': self.title,
+            'content': self.content,
+            'start_position': self.start_position
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Chapter':
+        """从字典创建章节"""
+        return cls(
+            index=data['index'],
+            title=data['title'],
+            content=data['content'],
+            start_position=data.get('start_position', 0)
+        )
+
+
+class LazyChapter(Chapter):
+    """
+    按需加载内容的章节
+    
+    章节内容由加载函数在访问时提供，适用于超大文件等不宜一次性读入内存的场景。
+    加载函数自行决定是否缓存结果；对 content 赋值后则固定使用该内容。
+    """
+    
+    def __init__(
+        self,
+        index: int,
+        title: str,
+        loader: Callable[[], str],
+        start_position: int = 0,
+        position_loader: Optional[Callable[[], int]] = None
+    ):
+        """
+        初始化延迟加载章节
+        
+        Args:
+            index: 章节序号
+            title: 章节标题
+            loader: 返回章节内容的加载函数
+            start_position: 在全文中的起始位置
+            position_loader: 返回起始位置的函数（位置需解码之前的内容才能得到时使用）
+        """
+        self._loader = loader
+        self._content: Optional[str] = None
+        self._position_loader = position_loader
+        super().__init__(index=index, title=title, content=None, start_position=start_position)
+    
+    @property
+    def content(self) -> str:
+        """章节纯文本内容（访问时加载）"""
+        if self._content is not None:
+            return self._content
+        return self._loader()
+    
+    @content.setter
+    def content(self, value: Optional[str]) -> None:
+        self._content = value
+    
+    @property
+    def start_position(self) -> int:
+        """在全文中的起始位置（访问时计算）"""
+        if self._position_loader is not None:
+            return self._position_loader()
+        return self._start_position
+    
+    @start_position.setter
+    def start_position(self, value: int) -> None:
+        self._start_position = value
+    
+    def __repr__(self) -> str:
+        # 避免打印时加载内容
+        return f"LazyChapter(index={self.index!r}, title={self.title!r})"
 
 
 @dataclass
@@ -28,6 +105,9 @@ class Document:
     language: Optional[str] = None          # 文档语言
     metadata: Dict[str, str] = field(default_factory=dict)  # 其他元数据
     
+    # 延迟加载章节依赖的打开的资源（如内存映射文件），close() 时释放
+    resources: List = field(default_factory=list, init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         if not self.title:
             raise ValueError("文档标题不能为空")
@@ -39,13 +119,61 @@ class Document:
         """获取总章节数"""
         return len(self.chapters)
     
+    @property
+    def is_segmented(self) -> bool:
+        """章节是否只是按大小切分的段（如延迟加载的大 TXT），而非真正的章节"""
+        return self.metadata.get('segmented') == 'true'
+    
+    @property
+    def navigable_chapters(self) -> int:
+        """可用于章节导航的章节数（分段文档整体视为一章）"""
+        return 1 if self.is_segmented else len(self.chapters)
+    
     def get_chapter(self, index: int) -> Optional[Chapter]:
         """获取指定索引的章节"""
         if 0 <= index < len(self.chapters):
             return self.chapters[index]
         return None
     
+    def close(self) -> None:
+        """释放文档持有的资源（之后不能再读取延迟加载的章节）"""
+        while self.resources:
+            self.resources.pop().close()
+    
     @property
     def full_content(self) -> str:
         """获取完整文档内容"""
         return '\n\n'.join(chapter.content for chapter in self.chapters)
+    
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            'title': self.title,
+            'author': self.author,
+            'language': self.language,
+            'metadata': dict(self.metadata),
+            'chapters': [chapter.to_dict() for chapter in self.chapters]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Document':
+        """从字典创建文档对象"""
+        return cls(
+            title=data['title'],
+            chapters=[Chapter.from_dict(item) for item in data['chapters']],
+            author=data.get('author'),
+            language=data.get('language'),
+            metadata=data.get('metadata', {})
+        )
+
+
+@dataclass
+class DocumentMetadata:
+    """文档元数据（无需解析正文即可获取）"""
+    title: str                              # 文档标题
+    format: str                             # 文档格式
+    file_size: int = 0                      # 文件大小（字节）
+    author: Optional[str] = None            # 作者信息
+    language: Optional[str] = None          # 文档语言
+    chapter_count: Optional[int] = None     # 章节数（无法廉价获得时为None）
+    extra: Dict[str, str] = field(default_factory=dict)  # 其他元数据
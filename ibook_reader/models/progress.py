@@ -9,7 +9,7 @@ from typing import Optional
 class ReadingProgress:
     """阅读进度模型"""
     file_path: str                   # 文档文件绝对路径
-    file_hash: str                   # 文件MD5哈希值
+    file_hash: str                   # 文件指纹
     file_name: str                   # 文件名
     current_page: int                # 当前页码
     current_chapter: int             # 当前章节索引
@@ -17,6 +17,7 @@ class ReadingProgress:
     total_chapters: int              # 总章节数
     last_read_time: str              # 最后阅读时间
     read_percentage: float = 0.0     # 阅读百分比
+    hash_scheme: str = 'md5'         # 文件指纹方案
     
     def __post_init__(self):
         if self.current_page < 1:
@@ -41,7 +42,8 @@ class ReadingProgress:
             'total_pages': self.total_pages,
             'total_chapters': self.total_chapters,
             'last_read_time': self.last_read_time,
-            'read_percentage': self.read_percentage
+            'read_percentage': self.read_percentage,
+            'hash_scheme': self.hash_scheme
         }
     
     @classmethod
@@ -56,7 +58,8 @@ class ReadingProgress:
             total_pages=data['total_pages'],
             total_chapters=data['total_chapters'],
             last_read_time=data['last_read_time'],
-            read_percentage=data.get('read_percentage', 0.0)
+            read_percentage=data.get('read_percentage', 0.0),
+            hash_scheme=data.get('hash_scheme', 'md5')
         )
     
     def update_position(self, page: int, chapter: int) -> None:
@@ -1,11 +1,17 @@
 """文档解析器模块"""
 
+import importlib
+
 from .base import BaseParser
 from .factory import ParserFactory
-from .txt_parser import TxtParser
-from .markdown_parser import MarkdownParser
-from .epub_parser import EpubParser
-from .mobi_parser import MobiParser
+
+# 各解析器依赖的第三方库较重（ebooklib、lxml 等），首次访问时才导入
+_LAZY_PARSERS = {
+    'TxtParser': '.txt_parser',
+    'MarkdownParser': '.markdown_parser',
+    'EpubParser': '.epub_parser',
+    'MobiParser': '.mobi_parser',
+}
 
 __all__ = [
     'BaseParser',
@@ -15,3 +21,13 @@ __all__ = [
     'EpubParser',
     'MobiParser'
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_PARSERS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    parser_class = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = parser_class
+    return parser_class
@@ -4,12 +4,21 @@ from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Optional
 
-from ..models.document import Document
+from ..models.document import Document, DocumentMetadata
 
 
 class BaseParser(ABC):
     """文档解析器基类"""
     
+    # 解析器版本号（解析结果的格式或内容变化时递增，使文档缓存失效）
+    PARSER_VERSION = 1
+    
+    # 解析时是否顺序读完整个文件并把读到的数据送入 hasher
+    SUPPORTS_INGEST_HASH = False
+    
+    # 写入文档缓存的最大文件大小（字节，None 表示不限）
+    CACHE_MAX_BYTES: Optional[int] = None
+    
     def __init__(self, file_path: Path):
         """
         初始化解析器
@@ -22,6 +31,9 @@ class BaseParser(ABC):
         
         self.file_path = file_path
         self.file_name = file_path.name
+        
+        # 解析时顺带计算文件指纹（由文档缓存设置，仅 SUPPORTS_INGEST_HASH 的解析器使用）
+        self.hasher = None
     
     @abstractmethod
     def parse(self) -> Document:
@@ -47,6 +59,34 @@ class BaseParser(ABC):
         """
         pass
     
+    def parse_metadata(self) -> DocumentMetadata:
+        """
+        获取文档元数据（标题、作者、语言、章节数、大小）
+        
+        子类应只读取文件头部等少量数据；默认实现退回完整解析。
+        
+        Returns:
+            DocumentMetadata对象
+        """
+        document = self.parse()
+        return DocumentMetadata(
+            title=document.title,
+            format=document.metadata.get('format', ''),
+            file_size=self.file_path.stat().st_size,
+            author=document.author,
+            language=document.language,
+            chapter_count=document.total_chapters
+        )
+    
+    def should_cache(self) -> bool:
+        """
+        判断解析结果是否适合写入文档缓存
+        
+        Returns:
+            是否使用文档缓存
+        """
+        return True
+    
     def _get_default_title(self) -> str:
         """
         获取默认标题（使用文件名）
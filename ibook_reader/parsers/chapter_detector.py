@@ -0,0 +1,150 @@
+"""TXT 章节标题检测"""
+
+import os
+import re
+from typing import List, Optional, Tuple
+
+from ..models.document import Chapter
+
+
+# 中文数字（含大写与全角数字）
+_NUMERALS = r'0-9０-９零〇一二两三四五六七八九十百千万壹贰叁肆伍陆柒捌玖拾佰仟'
+
+# 章节标题：整行匹配，标题文字长度受限以避免把正文误判为标题
+HEADING_PATTERN = re.compile(
+    r'^[ \t　]*('
+    rf'第[{_NUMERALS}]+[章回节卷集部篇](?:[ \t　:：·、.．-][^\n]{{0,30}})?'
+    r'|(?:Chapter|CHAPTER)[ \t]+(?:\d+|[IVXLCDM]+)\b(?:[ \t:.-][^\n]{0,40})?'
+    r'|(?:序章|序言|楔子|引子|尾声|后记|番外)(?:[ \t　:：·、][^\n]{0,20})?'
+    r')[ \t　]*$',
+    re.MULTILINE
+)
+
+# 超过该长度（字符）的文本分块并行扫描
+PARALLEL_MIN_CHARS = 32 * 1024 * 1024
+
+# 并行扫描时每块的大致长度（字符）
+CHUNK_CHARS = 8 * 1024 * 1024
+
+
+def _scan_chunk(text: str, base: int) -> List[Tuple[int, str]]:
+    """
+    扫描一段文本中的章节标题
+
+    Args:
+        text: 文本内容（从行首开始）
+        base: 该段在全文中的起始位置
+
+    Returns:
+        (标题行在全文中的位置, 标题) 列表
+    """
+    return [
+        (base + match.start(), match.group(1).strip())
+        for match in HEADING_PATTERN.finditer(text)
+    ]
+
+
+def _split_at_lines(text: str, chunk_chars: int) -> List[Tuple[int, int]]:
+    """
+    在换行符处把文本切分为若干块
+
+    Args:
+        text: 文本内容
+        chunk_chars: 每块的大致长度
+
+    Returns:
+        (起始位置, 结束位置) 列表
+    """
+    ranges = []
+    start = 0
+    while start < len(text):
+        newline = text.find('\n', start + chunk_chars)
+        end = len(text) if newline == -1 else newline + 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def find_headings(text: str) -> List[Tuple[int, str]]:
+    """
+    查找文本中的所有章节标题
+
+    一次正则扫描完成匹配；超大文本按行切块后交给进程池并行扫描，
+    进程池不可用时退回单进程扫描。
+
+    Args:
+        text: 文本内容
+
+    Returns:
+        (标题行起始位置, 标题) 列表，按位置排序
+    """
+    if len(text) < PARALLEL_MIN_CHARS:
+        return _scan_chunk(text, 0)
+
+    ranges = _split_at_lines(text, CHUNK_CHARS)
+    workers = min(len(ranges), os.cpu_count() or 1)
+    if workers < 2:
+        return _scan_chunk(text, 0)
+
+    # 进程池相关模块较重，仅在需要时导入
+    from concurrent.futures import ProcessPoolExecutor
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_scan_chunk, text[start:end], start)
+                for start, end in ranges
+            ]
+            headings = []
+            for future in futures:
+                headings.extend(future.result())
+            return headings
+    except Exception:
+        return _scan_chunk(text, 0)
+
+
+def split_chapters(text: str, default_title: str) -> Optional[List[Chapter]]:
+    """
+    按检测到的章节标题分割文本
+
+    第一个标题之前的非空内容作为单独的一章，使用默认标题；
+    没有正文的标题被跳过，章节索引保持连续。
+
+    Args:
+        text: 文本内容
+        default_title: 前言部分使用的标题
+
+    Returns:
+        章节列表，未检测到标题（或所有标题都没有正文）时返回None
+    """
+    headings = find_headings(text)
+    if not headings:
+        return None
+
+    chapters = []
+
+    # 保留段首缩进，只去除首尾空行
+    preface = text[:headings[0][0]].strip('\n')
+    if preface.strip():
+        chapters.append(Chapter(index=0, title=default_title, content=preface, start_position=0))
+
+    for i, (position, title) in enumerate(headings):
+        end = headings[i + 1][0] if i + 1 < len(headings) else len(text)
+
+        # 章节内容不包含标题行
+        line_end = text.find('\n', position, end)
+        body_start = end if line_end == -1 else line_end + 1
+
+        # 紧跟下一个标题的标题（如开头的目录）没有正文，不单独成章
+        content = text[body_start:end].strip('\n')
+        if not content.strip():
+            continue
+
+        chapters.append(Chapter(
+            index=len(chapters),
+            title=title,
+            content=content,
+            start_position=position
+        ))
+
+    return chapters or None
@@ -0,0 +1,205 @@
+"""直接读取 EPUB 压缩包（按需加载章节）"""
+
+import posixpath
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import unquote
+
+from lxml import etree
+
+from .html_text import html_to_text
+
+
+# EPUB 容器描述文件
+CONTAINER_PATH = 'META-INF/container.xml'
+
+
+@dataclass
+class SpineItem:
+    """书脊中的一个章节文件"""
+    path: str                 # 压缩包内路径
+    title: str = ''           # 目录中的标题
+
+
+def _local_name(element) -> str:
+    """获取不含命名空间的标签名"""
+    if not isinstance(element.tag, str):
+        return ''
+    return etree.QName(element).localname
+
+
+def _iter_named(root, name: str) -> Iterator:
+    """遍历指定本地名称的所有元素"""
+    for element in root.iter():
+        if _local_name(element) == name:
+            yield element
+
+
+def _first_text(root, name: str) -> str:
+    """获取第一个指定名称元素的文本"""
+    for element in _iter_named(root, name):
+        text = ''.join(element.itertext()).strip()
+        if text:
+            return text
+    return ''
+
+
+class EpubArchive:
+    """
+    EPUB 压缩包读取器
+
+    只读取 container.xml、OPF 和目录文件，章节 XHTML 在访问时才解压并转换，
+    图片、字体、样式等资源从不读取。最近转换的几个章节会被缓存。
+    """
+
+    # 缓存的已转换章节数
+    CACHE_CHAPTERS = 4
+
+    def __init__(self, file_path: Path, read_toc: bool = True):
+        """
+        打开 EPUB 并读取书脊
+
+        Args:
+            file_path: EPUB 文件路径
+            read_toc: 是否读取目录以获得章节标题
+
+        Raises:
+            ValueError: 文件不是有效的 EPUB
+        """
+        self.file_path = file_path
+        self.metadata: Dict[str, str] = {}
+        self.spine: List[SpineItem] = []
+        self._chapters: 'OrderedDict[int, str]' = OrderedDict()
+
+        try:
+            self._zip = zipfile.ZipFile(file_path)
+        except (zipfile.BadZipFile, OSError) as e:
+            raise ValueError(f"无法打开EPUB文件: {e}")
+
+        try:
+            self._read_package(read_toc)
+        except (KeyError, etree.LxmlError) as e:
+            self._zip.close()
+            raise ValueError(f"EPUB结构无效: {e}")
+
+    def _read_xml(self, path: str):
+        """读取并解析压缩包内的 XML 文件"""
+        parser = etree.XMLParser(recover=True, resolve_entities=False, no_network=True)
+        return etree.fromstring(self._zip.read(path), parser)
+
+    def _read_package(self, read_toc: bool) -> None:
+        """读取 OPF：元数据、清单、书脊及目录"""
+        container = self._read_xml(CONTAINER_PATH)
+        rootfile = next(_iter_named(container, 'rootfile'), None)
+        if rootfile is None or not rootfile.get('full-path'):
+            raise KeyError('container.xml 中缺少 rootfile')
+
+        opf_path = rootfile.get('full-path')
+        opf_dir = posixpath.dirname(opf_path)
+        opf = self._read_xml(opf_path)
+
+        for name in ('title', 'creator', 'language'):
+            value = _first_text(opf, name)
+            if value:
+                self.metadata[name] = value
+
+        # 清单：id -> (路径, 媒体类型, 属性)
+        manifest = {}
+        for item in _iter_named(opf, 'item'):
+            href = item.get('href')
+            if item.get('id') and href:
+                path = posixpath.normpath(posixpath.join(opf_dir, unquote(href)))
+                manifest[item.get('id')] = (path, item.get('media-type', ''), item.get('properties', ''))
+
+        spine_element = next(_iter_named(opf, 'spine'), None)
+        if spine_element is None:
+            raise KeyError('OPF 中缺少 spine')
+
+        for itemref in _iter_named(spine_element, 'itemref'):
+            entry = manifest.get(itemref.get('idref'))
+            if entry:
+                self.spine.append(SpineItem(path=entry[0]))
+
+        if not read_toc:
+            return
+
+        titles = self._read_toc(manifest, spine_element.get('toc'))
+        for item in self.spine:
+            item.title = titles.get(item.path, '')
+
+    def _read_toc(self, manifest: dict, ncx_id: Optional[str]) -> Dict[str, str]:
+        """
+        从 EPUB3 导航文档或 NCX 读取各章节文件的标题
+
+        Args:
+            manifest: 清单
+            ncx_id: spine 的 toc 属性（NCX 的清单 id）
+
+        Returns:
+            章节文件路径 -> 标题（同一文件取第一个目录项）
+        """
+        titles: Dict[str, str] = {}
+
+        def add(base: str, href: Optional[str], title: str) -> None:
+            if not href or not title:
+                return
+            path = posixpath.normpath(posixpath.join(base, unquote(href.split('#')[0])))
+            titles.setdefault(path, ' '.join(title.split()))
+
+        try:
+            nav = next((p for p, _, props in manifest.values() if 'nav' in props.split()), None)
+            if nav:
+                root = etree.fromstring(self._zip.read(nav), etree.HTMLParser())
+                for link in _iter_named(root, 'a'):
+                    add(posixpath.dirname(nav), link.get('href'), ''.join(link.itertext()))
+
+            ncx = manifest.get(ncx_id) if ncx_id else None
+            if ncx is None:
+                ncx = next((entry for entry in manifest.values()
+                            if entry[1] == 'application/x-dtbncx+xml'), None)
+            if ncx and not titles:
+                root = self._read_xml(ncx[0])
+                for point in _iter_named(root, 'navPoint'):
+                    label = next(_iter_named(point, 'text'), None)
+                    content = next(_iter_named(point, 'content'), None)
+                    if label is not None and content is not None:
+                        add(posixpath.dirname(ncx[0]), content.get('src'), ''.join(label.itertext()))
+        except (KeyError, etree.LxmlError, ValueError):
+            # 目录缺失或损坏时章节使用默认标题
+            pass
+
+        return titles
+
+    def read_chapter(self, index: int) -> str:
+        """
+        读取并转换一个章节
+
+        Args:
+            index: 书脊序号
+
+        Returns:
+            章节纯文本
+        """
+        if index in self._chapters:
+            self._chapters.move_to_end(index)
+            return self._chapters[index]
+
+        try:
+            data = self._zip.read(self.spine[index].path)
+            text = html_to_text(data.decode('utf-8', errors='ignore')).text.strip()
+        except KeyError:
+            text = ''
+
+        self._chapters[index] = text
+        if len(self._chapters) > self.CACHE_CHAPTERS:
+            self._chapters.popitem(last=False)
+
+        return text
+
+    def close(self) -> None:
+        """关闭压缩包"""
+        self._chapters.clear()
+        self._zip.close()
@@ -1,18 +1,62 @@
 """EPUB文档解析器"""
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import List, Optional, Tuple
+
 import ebooklib
 from ebooklib import epub
-from bs4 import BeautifulSoup
-import html
 
 from .base import BaseParser
-from ..models.document import Document, Chapter
+from .epub_archive import EpubArchive
+from .html_text import html_to_text
+from ..models.document import Document, Chapter, LazyChapter, DocumentMetadata
+
+
+def _convert_item(data: bytes) -> Tuple[str, str]:
+    """
+    转换单个章节的HTML（模块级函数，供进程池调用）
+    
+    Args:
+        data: 章节的原始HTML内容
+        
+    Returns:
+        (文本内容, 标题)，转换失败时均为空字符串
+    """
+    try:
+        converted = html_to_text(data.decode('utf-8', errors='ignore'))
+        return converted.text, converted.title
+    except Exception:
+        return '', ''
 
 
 class EpubParser(BaseParser):
     """EPUB文档解析器"""
     
+    # 改用按块分段的 HTML 转换
+    PARSER_VERSION = 2
+    
+    # 章节数与总字节数都达到阈值时使用进程池并行转换
+    # 串行转换约 15-30MB/s；进程池启动与传输开销约 25-60ms（fork），spawn 平台
+    # 需在子进程重新导入 lxml，开销更大。64 个约 3KB 的章节串行 0.013s、进程池 0.042s，
+    # 4MB 串行 0.16s、进程池 0.23s（单核），因此只有总量较大时才值得启动进程池
+    PARALLEL_MIN_ITEMS = 4
+    PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+    
+    # 并行转换的最大进程数（None 表示使用CPU核数）
+    MAX_WORKERS: Optional[int] = None
+    
+    # 解析模式：auto（按文件大小选择）、full（ebooklib 完整加载）、lazy（按需读取章节）
+    MODE = 'auto'
+    
+    # auto 模式下超过该大小（字节）的文件按需读取章节
+    LAZY_MIN_BYTES = 20 * 1024 * 1024
+    
+    # 跳过的封面和导航页面（文件名包含这些关键字）
+    SKIP_NAMES = ('cover', 'nav', 'toc')
+    
     def parse(self) -> Document:
         """
         解析EPUB文档
@@ -20,6 +64,13 @@ class EpubParser(BaseParser):
         Returns:
             Document对象
         """
+        if self._use_lazy_mode():
+            try:
+                return self._parse_lazy()
+            except ValueError:
+                # 结构不规范的文件交给 ebooklib 处理
+                pass
+        
         try:
             # 加载 EPUB 文件
             book = epub.read_epub(str(self.file_path))
@@ -54,6 +105,82 @@ class EpubParser(BaseParser):
         
         return document
     
+    def parse_metadata(self) -> DocumentMetadata:
+        """
+        获取文档元数据：只读取 container.xml 与 OPF
+        
+        Returns:
+            DocumentMetadata对象
+        """
+        try:
+            archive = EpubArchive(self.file_path, read_toc=False)
+        except ValueError:
+            return super().parse_metadata()
+        
+        try:
+            chapter_count = sum(
+                1 for item in archive.spine
+                if not any(skip in item.path.lower() for skip in self.SKIP_NAMES)
+            )
+            return DocumentMetadata(
+                title=archive.metadata.get('title') or self._get_default_title(),
+                format='epub',
+                file_size=self.file_path.stat().st_size,
+                author=archive.metadata.get('creator'),
+                language=archive.metadata.get('language'),
+                chapter_count=chapter_count
+            )
+        finally:
+            archive.close()
+    
+    def should_cache(self) -> bool:
+        """按需读取的文档不写入文档缓存"""
+        return not self._use_lazy_mode()
+    
+    def _use_lazy_mode(self) -> bool:
+        """判断是否按需读取章节"""
+        if self.MODE == 'auto':
+            return self.file_path.stat().st_size >= self.LAZY_MIN_BYTES
+        return self.MODE == 'lazy'
+    
+    def _parse_lazy(self) -> Document:
+        """
+        直接读取压缩包，章节内容在首次访问时才解压转换
+        
+        章节标题取自目录（NCX 或 EPUB3 导航文档），图片、字体等资源不会被读取。
+        
+        Returns:
+            Document对象
+            
+        Raises:
+            ValueError: 文件不是有效的 EPUB
+        """
+        archive = EpubArchive(self.file_path)
+        
+        chapters = []
+        for spine_index, item in enumerate(archive.spine):
+            if any(skip in item.path.lower() for skip in self.SKIP_NAMES):
+                continue
+            chapters.append(LazyChapter(
+                index=len(chapters),
+                title=item.title or f"第 {len(chapters) + 1} 章",
+                loader=partial(archive.read_chapter, spine_index)
+            ))
+        
+        if not chapters:
+            archive.close()
+            raise ValueError("EPUB书脊中没有章节")
+        
+        document = Document(
+            title=archive.metadata.get('title') or self._get_default_title(),
+            chapters=chapters,
+            author=archive.metadata.get('creator'),
+            language=archive.metadata.get('language'),
+            metadata={'format': 'epub', 'lazy': 'true'}
+        )
+        document.resources.append(archive)
+        return document
+    
     def _extract_title(self, book: epub.EpubBook) -> str:
         """提取书名"""
         try:
@@ -108,105 +235,77 @@ class EpubParser(BaseParser):
                 ):
                     items.append(item)
         
+        # 跳过封面和导航页面，收集原始内容
+        contents = []
         for item in items:
             try:
-                # 跳过封面和导航页面
                 item_name = item.get_name().lower()
-                if any(skip in item_name for skip in ['cover', 'nav', 'toc']):
-                    continue
-                
-                # 获取HTML内容
-                html_content = item.get_content().decode('utf-8', errors='ignore')
-                
-                # 提取文本内容
-                text_content = self._html_to_text(html_content)
-                
-                if not text_content.strip():
+                if any(skip in item_name for skip in self.SKIP_NAMES):
                     continue
-                
-                # 尝试从HTML中提取标题
-                chapter_title = self._extract_chapter_title(html_content)
-                if not chapter_title:
-                    chapter_title = f"第 {chapter_index + 1} 章"
-                
-                # 创建章节
-                chapter = Chapter(
-                    index=chapter_index,
-                    title=chapter_title,
-                    content=text_content.strip(),
-                    start_position=0
-                )
-                chapters.append(chapter)
-                chapter_index += 1
-                
+                contents.append(item.get_content())
             except Exception:
                 continue
         
+        # 一次解析同时得到文本内容和标题
+        if self._use_parallel(contents):
+            results = self._convert_parallel(contents)
+        else:
+            results = [_convert_item(data) for data in contents]
+        
+        for text_content, chapter_title in results:
+            if not text_content.strip():
+                continue
+            
+            if not chapter_title:
+                chapter_title = f"第 {chapter_index + 1} 章"
+            
+            # 创建章节
+            chapter = Chapter(
+                index=chapter_index,
+                title=chapter_title,
+                content=text_content.strip(),
+                start_position=0
+            )
+            chapters.append(chapter)
+            chapter_index += 1
+        
         return chapters
     
-    def _html_to_text(self, html_content: str) -> str:
+    def _use_parallel(self, contents: List[bytes]) -> bool:
         """
-        将HTML转换为纯文本
+        判断是否使用进程池并行转换
         
         Args:
-            html_content: HTML内容
+            contents: 各章节的原始HTML内容
             
         Returns:
-            纯文本内容
+            是否并行转换
         """
-        try:
-            # 使用 BeautifulSoup 解析 HTML
-            soup = BeautifulSoup(html_content, 'xml')
-            
-            # 移除 script 和 style 标签
-            for script in soup(['script', 'style']):
-                script.decompose()
-            
-            # 获取文本
-            text = soup.get_text()
-            
-            # 清理空白字符
-            lines = [line.strip() for line in text.splitlines()]
-            lines = [line for line in lines if line]
-            
-            return '\n\n'.join(lines)
-            
-        except Exception:
-            # 如果解析失败，使用简单的文本提取
-            return html.unescape(html_content)
+        if (os.cpu_count() or 1) < 2:
+            return False
+        return (len(contents) >= self.PARALLEL_MIN_ITEMS
+                and sum(len(data) for data in contents) >= self.PARALLEL_MIN_BYTES)
     
-    def _extract_chapter_title(self, html_content: str) -> str:
+    def _convert_parallel(self, contents: List[bytes]) -> List[Tuple[str, str]]:
         """
-        从HTML中提取章节标题
+        在进程池中并行转换各章节，结果保持书脊顺序
+        
+        进程池无法使用时退回单进程转换。
         
         Args:
-            html_content: HTML内容
+            contents: 各章节的原始HTML内容
             
         Returns:
-            章节标题
+            (文本内容, 标题) 列表
         """
+        workers = min(self.MAX_WORKERS or os.cpu_count() or 1, len(contents))
+        chunksize = max(1, len(contents) // (workers * 4))
+        
         try:
-            soup = BeautifulSoup(html_content, 'xml')
-            
-            # 尝试查找标题标签
-            for tag in ['h1', 'h2', 'h3']:
-                title_tag = soup.find(tag)
-                if title_tag:
-                    title = title_tag.get_text().strip()
-                    if title:
-                        return title
-            
-            # 尝试查找 title 标签
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.get_text().strip()
-                if title:
-                    return title
-                    
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(_convert_item, contents, chunksize=chunksize))
         except Exception:
-            pass
-        
-        return ""
+            return [_convert_item(data) for data in contents]
     
     @classmethod
     def can_parse(cls, file_path: Path) -> bool:
@@ -1,27 +1,42 @@
 """解析器工厂"""
 
+import importlib
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Type
 
 from .base import BaseParser
-from .txt_parser import TxtParser
-from .markdown_parser import MarkdownParser
-from .epub_parser import EpubParser
-from .mobi_parser import MobiParser
 from ..core.format_detector import FormatDetector
 
 
 class ParserFactory:
     """解析器工厂类"""
     
-    # 格式到解析器的映射
+    # 格式到解析器的映射（模块路径:类名，检测到对应格式时才导入）
     PARSER_MAP = {
-        'txt': TxtParser,
-        'markdown': MarkdownParser,
-        'epub': EpubParser,
-        'mobi': MobiParser
+        'txt': 'ibook_reader.parsers.txt_parser:TxtParser',
+        'markdown': 'ibook_reader.parsers.markdown_parser:MarkdownParser',
+        'epub': 'ibook_reader.parsers.epub_parser:EpubParser',
+        'mobi': 'ibook_reader.parsers.mobi_parser:MobiParser'
     }
     
+    @classmethod
+    def get_parser_class(cls, format_type: str) -> Optional[Type[BaseParser]]:
+        """
+        获取格式对应的解析器类
+        
+        Args:
+            format_type: 文档格式
+            
+        Returns:
+            解析器类，不支持的格式返回 None
+        """
+        target = cls.PARSER_MAP.get(format_type)
+        if target is None:
+            return None
+        
+        module_name, class_name = target.split(':')
+        return getattr(importlib.import_module(module_name), class_name)
+    
     @classmethod
     def create_parser(cls, file_path: Path) -> Optional[BaseParser]:
         """
@@ -43,7 +58,7 @@ class ParserFactory:
             return None
         
         # 获取对应的解析器类
-        parser_class = cls.PARSER_MAP.get(format_type)
+        parser_class = cls.get_parser_class(format_type)
         
         if parser_class is None:
             return None
@@ -0,0 +1,190 @@
+"""HTML 转纯文本（EPUB、MOBI 共用）"""
+
+import html
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from lxml import etree
+
+
+# 块级元素：开始和结束处都会断开段落
+BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'body', 'caption', 'center',
+    'dd', 'div', 'dl', 'dt', 'figcaption', 'figure', 'footer', 'form',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'html', 'li',
+    'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tbody', 'td',
+    'tfoot', 'th', 'thead', 'tr', 'ul',
+})
+
+# 内容不显示的元素
+SKIP_TAGS = frozenset({'head', 'script', 'style', 'template', 'noscript'})
+
+# 可作为章节标题的元素（按优先级）
+TITLE_TAGS = ('h1', 'h2', 'h3', 'title')
+
+# 段落之间的分隔符
+PARAGRAPH_SEPARATOR = '\n\n'
+
+# <br> 在段落内的换行标记（合并空白时与源码中的换行区分）
+_LINE_BREAK = '\u2028'
+
+_TAG_PATTERN = re.compile(r'<[^>]*>')
+
+
+@dataclass
+class HtmlText:
+    """HTML 转换结果"""
+    text: str                                             # 纯文本，段落以空行分隔
+    title: str = ''                                       # 首个标题（h1 > h2 > h3 > title）
+    anchors: Dict[str, int] = field(default_factory=dict)  # 锚点 id/name -> 所在段落在 text 中的起始位置
+    breaks: List[int] = field(default_factory=list)       # 分页标记在 text 中的位置
+
+
+class _TextTarget:
+    """
+    lxml 解析器的事件接收器
+
+    随解析事件逐段输出文本，不构建文档树。
+    """
+
+    def __init__(self):
+        self.paragraphs: List[str] = []
+        self.length = 0
+        self.anchors: Dict[str, int] = {}
+        self.breaks: List[int] = []
+        self.titles: Dict[str, str] = {}
+
+        self._parts: List[str] = []
+        self._skip_depth = 0
+        self._pre_depth = 0
+        self._captures: List[tuple] = []
+
+    def _next_offset(self) -> int:
+        """下一段落在文本中的起始位置"""
+        if not self.paragraphs:
+            return 0
+        return self.length + len(PARAGRAPH_SEPARATOR)
+
+    def _flush(self) -> None:
+        """结束当前段落"""
+        if not self._parts:
+            return
+
+        raw = ''.join(self._parts)
+        self._parts = []
+
+        if self._pre_depth:
+            # 预格式化文本保留换行与缩进
+            paragraph = raw.replace(_LINE_BREAK, '\n').strip('\n')
+        else:
+            # 合并空白，<br> 产生的换行保留
+            lines = (' '.join(line.split()) for line in raw.split(_LINE_BREAK))
+            paragraph = '\n'.join(lines).strip()
+
+        if not paragraph.strip():
+            return
+
+        if self.paragraphs:
+            self.length += len(PARAGRAPH_SEPARATOR)
+        self.paragraphs.append(paragraph)
+        self.length += len(paragraph)
+
+    def start(self, tag, attrib) -> None:
+        if not isinstance(tag, str):
+            return
+        tag = tag.lower()
+
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        if tag in TITLE_TAGS and tag not in self.titles:
+            self._captures.append((tag, []))
+        if self._skip_depth:
+            return
+
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag == 'pre':
+            self._pre_depth += 1
+        elif tag == 'br':
+            self._parts.append(_LINE_BREAK)
+        elif tag.endswith('pagebreak'):
+            self._flush()
+            self.breaks.append(self._next_offset())
+
+        # 锚点指向其所在段落的起始位置
+        anchor = attrib.get('id') or (attrib.get('name') if tag == 'a' else None)
+        if anchor and anchor not in self.anchors:
+            self.anchors[anchor] = self._next_offset()
+
+    def end(self, tag) -> None:
+        if not isinstance(tag, str):
+            return
+        tag = tag.lower()
+
+        if self._captures and self._captures[-1][0] == tag:
+            name, parts = self._captures.pop()
+            title = ' '.join(''.join(parts).split())
+            if title and name not in self.titles:
+                self.titles[name] = title
+
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._skip_depth:
+            return
+
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag == 'pre':
+            self._pre_depth = max(0, self._pre_depth - 1)
+
+    def data(self, data: str) -> None:
+        for _, parts in self._captures:
+            parts.append(data)
+        if not self._skip_depth:
+            self._parts.append(data)
+
+    def close(self) -> HtmlText:
+        self._flush()
+
+        title = ''
+        for tag in TITLE_TAGS:
+            if self.titles.get(tag):
+                title = self.titles[tag]
+                break
+
+        return HtmlText(
+            text=PARAGRAPH_SEPARATOR.join(self.paragraphs),
+            title=title,
+            anchors=self.anchors,
+            breaks=self.breaks
+        )
+
+
+def html_to_text(html_content: str) -> HtmlText:
+    """
+    将HTML转换为纯文本
+
+    基于 lxml 的事件解析器一次扫描完成：按块级元素分段，
+    同时记录首个标题、锚点位置及分页标记，不构建 DOM。
+
+    Args:
+        html_content: HTML内容
+
+    Returns:
+        转换结果
+    """
+    try:
+        parser = etree.HTMLParser(target=_TextTarget(), remove_comments=True, remove_pis=True)
+        parser.feed(html_content)
+        result: Optional[HtmlText] = parser.close()
+        if result is not None:
+            return result
+    except (etree.LxmlError, ValueError):
+        pass
+
+    # 解析失败时去除标签后作为纯文本
+    text = html.unescape(_TAG_PATTERN.sub('', html_content))
+    lines = [' '.join(line.split()) for line in text.splitlines()]
+    return HtmlText(text=PARAGRAPH_SEPARATOR.join(line for line in lines if line))
@@ -0,0 +1,146 @@
+"""基于内存映射的大文本文件访问"""
+
+import codecs
+import mmap
+from collections import OrderedDict
+from pathlib import Path
+from typing import List
+
+
+class MappedTextFile:
+    """
+    内存映射的文本文件
+    
+    打开时只在换行符处把文件切分为若干段，记录各段的字节偏移（稀疏索引），
+    不读取也不解码内容；访问某段时才解码对应的字节范围，并缓存最近使用的几段。
+    
+    仅适用于换行符为单字节 0x0A 的编码（UTF-8、GBK、GB18030、Big5 等），
+    UTF-16/UTF-32 文件应使用常规方式读取。
+    """
+    
+    # 每段的目标大小（字节，实际在其后的第一个换行符处切分）
+    SEGMENT_SIZE = 1024 * 1024
+    
+    # 缓存的已解码段数
+    CACHE_SEGMENTS = 4
+    
+    def __init__(self, file_path: Path, encoding: str):
+        """
+        打开并索引文件
+        
+        Args:
+            file_path: 文件路径
+            encoding: 文件编码
+        """
+        self.file_path = file_path
+        self.encoding = encoding
+        self._segments: 'OrderedDict[int, str]' = OrderedDict()
+        
+        self._file = open(file_path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            self._mmap = b''
+        
+        # UTF-8 BOM 不属于正文
+        start = 0
+        if self._mmap[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+            start = len(codecs.BOM_UTF8)
+            if codecs.lookup(encoding).name == 'utf-8-sig':
+                self.encoding = 'utf-8'
+        
+        self.offsets = self._build_index(start)
+        
+        # 各段在全文中的字符位置，按需计算
+        self._char_offsets: List[int] = [0]
+    
+    def _build_index(self, start: int) -> List[int]:
+        """
+        在换行符处切分文件
+        
+        Args:
+            start: 正文起始字节偏移
+            
+        Returns:
+            各段起始字节偏移，末尾附加文件大小
+        """
+        size = len(self._mmap)
+        offsets = [start]
+        
+        pos = start
+        while size - pos > self.SEGMENT_SIZE:
+            newline = self._mmap.find(b'\n', pos + self.SEGMENT_SIZE)
+            if newline == -1 or newline + 1 >= size:
+                break
+            pos = newline + 1
+            offsets.append(pos)
+        
+        offsets.append(size)
+        return offsets
+    
+    @property
+    def segment_count(self) -> int:
+        """段数"""
+        return len(self.offsets) - 1
+    
+    def read_segment(self, index: int) -> str:
+        """
+        读取并解码一段内容
+        
+        Args:
+            index: 段序号
+            
+        Returns:
+            该段文本（换行符已统一为 \\n，不含末尾换行符）
+        """
+        if index in self._segments:
+            self._segments.move_to_end(index)
+            return self._segments[index]
+        
+        text = self._decode_segment(index)
+        
+        self._segments[index] = text
+        if len(self._segments) > self.CACHE_SEGMENTS:
+            self._segments.popitem(last=False)
+        
+        return text
+    
+    def _decode_segment(self, index: int) -> str:
+        """解码一段内容（不缓存）"""
+        data = self._mmap[self.offsets[index]:self.offsets[index + 1]]
+        
+        # 无法预先校验整个文件，个别无法解码的字节以替换字符显示
+        text = data.decode(self.encoding, errors='replace')
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        if text.endswith('\n'):
+            text = text[:-1]
+        return text
+    
+    def char_offset(self, index: int) -> int:
+        """
+        获取一段在全文（各段以换行符连接）中的字符位置
+        
+        需要解码之前的所有段，只在首次访问时计算并缓存。
+        
+        Args:
+            index: 段序号
+            
+        Returns:
+            字符位置
+        """
+        while len(self._char_offsets) <= index:
+            previous = len(self._char_offsets) - 1
+            if previous in self._segments:
+                length = len(self._segments[previous])
+            else:
+                length = len(self._decode_segment(previous))
+            self._char_offsets.append(self._char_offsets[-1] + length + 1)
+        return self._char_offsets[index]
+    
+    def close(self) -> None:
+        """关闭文件映射"""
+        self._segments.clear()
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
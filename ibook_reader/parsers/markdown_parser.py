@@ -2,16 +2,28 @@
 
 from pathlib import Path
 import re
-import chardet
 
 from .base import BaseParser
-from ..models.document import Document, Chapter
-from ..utils.text_utils import normalize_text
+from ..models.document import Document, Chapter, DocumentMetadata
+from ..utils.encoding_utils import read_text_file, detect_file_encoding
+
+
+# 一级标题（# 开头，后面跟空格或制表符和标题内容；不跨行匹配，逐行扫描结果与整体匹配一致）
+H1_PATTERN = re.compile(r'^#[^\S\n]+(.+?)$', re.MULTILINE)
 
 
 class MarkdownParser(BaseParser):
     """Markdown文档解析器"""
     
+    # 单独的 # 行不再把下一行当作一级标题
+    PARSER_VERSION = 3
+    
+    # 读取文件时同时计算文件指纹
+    SUPPORTS_INGEST_HASH = True
+    
+    # 大文件不写入文档缓存（同 TxtParser）
+    CACHE_MAX_BYTES = 8 * 1024 * 1024
+    
     # 尝试的编码列表
     ENCODINGS = ['utf-8', 'gbk', 'gb2312', 'latin1']
     
@@ -22,12 +34,9 @@ class MarkdownParser(BaseParser):
         Returns:
             Document对象
         """
-        # 读取文件内容
+        # 读取文件内容（换行符已统一）
         content = self._read_file()
         
-        # 标准化文本
-        content = normalize_text(content)
-        
         # 按一级标题分割章节
         chapters = self._split_chapters(content)
         
@@ -46,48 +55,51 @@ class MarkdownParser(BaseParser):
             chapters=chapters,
             metadata={
                 'format': 'markdown',
-                'encoding': self._detected_encoding or 'unknown'
+                **self._encoding_info.to_metadata()
             }
         )
         
         return document
     
-    def _read_file(self) -> str:
+    def parse_metadata(self) -> DocumentMetadata:
         """
-        读取文件内容，自动检测编码
+        获取文档元数据：逐行扫描统计一级标题，不读入整个文件也不分割章节
+        
+        标题与章节数与 parse() 一致：标题为文件名，每个一级标题一章，没有时为一章。
+        编码只对文件开头采样检测。
         
         Returns:
-            文件内容
+            DocumentMetadata对象
         """
-        with open(self.file_path, 'rb') as f:
-            raw_data = f.read()
-        
-        # 使用 chardet 检测编码
-        detected = chardet.detect(raw_data)
-        encoding = detected.get('encoding')
-        confidence = detected.get('confidence', 0)
+        info = detect_file_encoding(self.file_path)
         
-        # 如果检测置信度较高，使用检测到的编码
-        if encoding and confidence > 0.7:
-            try:
-                content = raw_data.decode(encoding)
-                self._detected_encoding = encoding
-                return content
-            except Exception:
-                pass
+        headings = 0
+        with open(self.file_path, 'r', encoding=info.encoding, errors='replace') as f:
+            for line in f:
+                if line.startswith('#') and H1_PATTERN.match(line.rstrip('\n')):
+                    headings += 1
         
-        # 否则依次尝试常用编码
-        for enc in self.ENCODINGS:
-            try:
-                content = raw_data.decode(enc)
-                self._detected_encoding = enc
-                return content
-            except Exception:
-                continue
+        return DocumentMetadata(
+            title=self._get_default_title(),
+            format='markdown',
+            file_size=self.file_path.stat().st_size,
+            chapter_count=max(1, headings),
+            extra=info.to_metadata()
+        )
+    
+    def _read_file(self) -> str:
+        """
+        读取文件内容，自动检测编码
         
-        # 最后使用 UTF-8 并忽略错误
-        self._detected_encoding = 'utf-8'
-        return raw_data.decode('utf-8', errors='ignore')
+        Returns:
+            文件内容（换行符已统一为 \\n）
+        """
+        content, self._encoding_info = read_text_file(
+            self.file_path,
+            fallback_encodings=self.ENCODINGS,
+            hasher=self.hasher
+        )
+        return content
     
     def _split_chapters(self, content: str) -> list[Chapter]:
         """
@@ -101,11 +113,8 @@ class MarkdownParser(BaseParser):
         """
         chapters = []
 
-        # 匹配一级标题（# 开头，后面跟空格或标题内容）
-        h1_pattern = re.compile(r'^#\s+(.+?)$', re.MULTILINE)
-
         # 找到所有一级标题
-        matches = list(h1_pattern.finditer(content))
+        matches = list(H1_PATTERN.finditer(content))
 
         if not matches:
             # 没有一级标题，返回空列表
@@ -1,141 +1,209 @@
 """MOBI文档解析器"""
 
-from pathlib import Path
-from bs4 import BeautifulSoup
 import html
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List
 
 from .base import BaseParser
-from ..models.document import Document, Chapter
+from .chapter_detector import split_chapters
+from .html_text import html_to_text
+from .mobi_reader import MobiReader, COMPRESSION_HUFFCDIC
+from ..models.document import Document, Chapter, DocumentMetadata
+
+
+# 分页标记
+PAGEBREAK_PATTERN = re.compile(rb'<mbp:pagebreak\b[^>]*>', re.IGNORECASE)
+
+# 目录中指向正文字节偏移的链接
+FILEPOS_LINK_PATTERN = re.compile(
+    rb'<a\b[^>]*?\bfilepos\s*=\s*["\']?0*(\d+)["\']?[^>]*>(.*?)</a\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+
+TAG_PATTERN = re.compile(rb'<[^>]*>')
 
 
 class MobiParser(BaseParser):
     """MOBI文档解析器"""
     
+    # 按分页标记与目录分割章节
+    PARSER_VERSION = 4
+    
     def parse(self) -> Document:
         """
         解析MOBI文档
         
         Returns:
             Document对象
-        """
-        try:
-            # 尝试使用 mobi 库解析
-            import mobi
-            
-            tempdir, filepath = mobi.extract(str(self.file_path))
-            
-            # 读取提取的HTML文件
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                html_content = f.read()
-            
-            # 提取文本内容
-            text_content = self._html_to_text(html_content)
-            
-            # 创建单章节文档
-            chapter = Chapter(
-                index=0,
-                title=self._get_default_title(),
-                content=text_content.strip(),
-                start_position=0
-            )
-            
-            # 创建文档对象
-            document = Document(
-                title=self._get_default_title(),
-                chapters=[chapter],
-                metadata={'format': 'mobi'}
-            )
-            
-            return document
             
-        except ImportError:
-            # 如果没有安装 mobi 库，降级处理
-            return self._fallback_parse()
-        except Exception as e:
-            # 解析失败，降级处理
-            return self._fallback_parse()
-    
-    def _fallback_parse(self) -> Document:
+        Raises:
+            ValueError: 文件无法解析
         """
-        降级解析方法（作为纯文本处理）
+        with MobiReader(self.file_path) as reader:
+            metadata = reader.metadata
+            is_mobi = reader.is_mobi
+            
+            if reader.compression == COMPRESSION_HUFFCDIC:
+                # HUFF/CDIC 压缩交给 mobi 库处理
+                raw, encoding = self._extract_with_mobi_lib().encode('utf-8'), 'utf-8'
+            else:
+                raw, encoding = reader.read_bytes(), reader.encoding
         
-        Returns:
-            Document对象
-        """
-        try:
-            # 尝试作为文本读取
-            with open(self.file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # 创建单章节文档
-            chapter = Chapter(
-                index=0,
-                title=self._get_default_title(),
-                content=content.strip() if content.strip() else "（无法解析文件内容）",
-                start_position=0
-            )
-            
-        except Exception:
-            # 完全失败，返回错误提示
-            chapter = Chapter(
-                index=0,
-                title=self._get_default_title(),
-                content="（无法解析MOBI文件，请安装 mobi 库：pip install mobi）",
-                start_position=0
-            )
+        title = metadata.get('title') or self._get_default_title()
+        
+        if is_mobi:
+            chapters = self._split_chapters(raw, encoding)
+        else:
+            # PalmDOC 正文为纯文本
+            text = raw.decode(encoding, errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+            chapters = [Chapter(index=0, title=title, content=text.strip(), start_position=0)]
+        
+        # 只有一章时尝试按章节标题分割
+        if len(chapters) == 1:
+            chapters = split_chapters(chapters[0].content, title) or chapters
+        
+        if not chapters or not chapters[0].content:
+            chapters = [Chapter(index=0, title=title, content="（无内容）", start_position=0)]
+        elif len(chapters) == 1:
+            chapters[0].title = title
         
         # 创建文档对象
         document = Document(
-            title=self._get_default_title(),
-            chapters=[chapter],
-            metadata={'format': 'mobi', 'parsed': 'fallback'}
+            title=title,
+            chapters=chapters,
+            author=metadata.get('author'),
+            language=metadata.get('language'),
+            metadata={'format': 'mobi'}
         )
         
         return document
     
-    def _html_to_text(self, html_content: str) -> str:
+    def parse_metadata(self) -> DocumentMetadata:
+        """
+        获取文档元数据：只读取 PDB 头、MOBI 头与 EXTH
+        
+        Returns:
+            DocumentMetadata对象
+            
+        Raises:
+            ValueError: 文件无法解析
         """
-        将HTML转换为纯文本
+        with MobiReader(self.file_path) as reader:
+            metadata = reader.metadata
+        
+        extra = {key: metadata[key] for key in ('publisher', 'subject', 'date') if key in metadata}
+        return DocumentMetadata(
+            title=metadata.get('title') or self._get_default_title(),
+            format='mobi',
+            file_size=self.file_path.stat().st_size,
+            author=metadata.get('author'),
+            language=metadata.get('language'),
+            extra=extra
+        )
+    
+    def _split_chapters(self, raw: bytes, encoding: str) -> List[Chapter]:
+        """
+        按分页标记和目录链接分割章节
+        
+        在 <mbp:pagebreak/> 及目录中 filepos 链接指向的位置切分正文字节，
+        各段分别转换为文本；目录链接的文字作为章节标题。
         
         Args:
-            html_content: HTML内容
+            raw: 正文原始字节（HTML）
+            encoding: 正文编码
             
         Returns:
-            纯文本内容
+            章节列表，start_position 为章节在全文中的字符位置
         """
-        try:
-            # 使用 BeautifulSoup 解析 HTML
-            soup = BeautifulSoup(html_content, 'lxml')
-            
-            # 移除 script 和 style 标签
-            for script in soup(['script', 'style']):
-                script.decompose()
-            
-            # 获取文本
-            text = soup.get_text(separator='\n')
-            
-            # 清理空白字符，但保留换行
-            lines = [line.strip() for line in text.splitlines()]
-            # 去除完全空白的行
-            lines = [line if line else '' for line in lines]
-            
-            # 合并连续的空行
-            result = []
-            prev_empty = False
-            for line in lines:
-                if line == '':
-                    if not prev_empty:
-                        result.append('')
-                    prev_empty = True
-                else:
-                    result.append(line)
-                    prev_empty = False
+        toc = self._read_toc_links(raw, encoding)
+        
+        boundaries = {0}
+        boundaries.update(match.start() for match in PAGEBREAK_PATTERN.finditer(raw))
+        boundaries.update(position for position in toc if 0 < position < len(raw))
+        boundaries = sorted(boundaries)
+        
+        chapters = []
+        position = 0
+        pending_title = None
+        
+        for start, end in zip(boundaries, boundaries[1:] + [len(raw)]):
+            converted = html_to_text(raw[start:end].decode(encoding, errors='replace'))
+            text = converted.text.strip()
+            title = toc.get(start) or pending_title
+            
+            # 空白段（如紧邻的分页标记与锚点之间）的标题留给下一段
+            if not text:
+                pending_title = title
+                continue
+            pending_title = None
+            
+            chapters.append(Chapter(
+                index=len(chapters),
+                title=title or converted.title or f"第 {len(chapters) + 1} 章",
+                content=text,
+                start_position=position
+            ))
+            position += len(text) + len('\n\n')
+        
+        return chapters
+    
+    def _read_toc_links(self, raw: bytes, encoding: str) -> Dict[int, str]:
+        """
+        读取目录中的 filepos 链接
+        
+        Args:
+            raw: 正文原始字节
+            encoding: 正文编码
             
-            return '\n'.join(result)
+        Returns:
+            切分位置 -> 链接文字（位置已回退到所在标签的开头）
+        """
+        links: Dict[int, str] = {}
+        
+        for match in FILEPOS_LINK_PATTERN.finditer(raw):
+            target = int(match.group(1))
+            if target >= len(raw):
+                continue
+            
+            label = TAG_PATTERN.sub(b'', match.group(2)).decode(encoding, errors='replace')
+            label = ' '.join(html.unescape(label).split())
+            if not label:
+                continue
+            
+            # filepos 可能指向标签或段落内部，回退到最近的标签开头
+            position = max(0, raw.rfind(b'<', 0, target + 1))
+            links.setdefault(position, label)
+        
+        return links
+    
+    def _extract_with_mobi_lib(self) -> str:
+        """
+        使用 mobi 库解包并读取HTML（用于内置读取器不支持的压缩方式）
+        
+        Returns:
+            HTML内容
             
-        except Exception:
-            # 如果解析失败，使用简单的文本提取
-            return html.unescape(html_content)
+        Raises:
+            ValueError: 未安装 mobi 库或解包失败
+        """
+        try:
+            import mobi
+        except ImportError:
+            raise ValueError("该MOBI文件使用 HUFF/CDIC 压缩，请安装 mobi 库：pip install mobi")
+        
+        tempdir = None
+        try:
+            tempdir, filepath = mobi.extract(str(self.file_path))
+            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read()
+        except Exception as e:
+            raise ValueError(f"无法解析MOBI文件: {e}")
+        finally:
+            # 清理解包生成的临时目录
+            if tempdir:
+                shutil.rmtree(tempdir, ignore_errors=True)
     
     @classmethod
     def can_parse(cls, file_path: Path) -> bool:
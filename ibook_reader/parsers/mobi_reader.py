@@ -0,0 +1,344 @@
+"""PDB/MOBI 容器读取（PalmDOC 解压与 EXTH 元数据）"""
+
+import codecs
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+# PDB 文件头长度及记录表项长度
+PDB_HEADER_SIZE = 78
+RECORD_INFO_SIZE = 8
+
+# 压缩方式
+COMPRESSION_NONE = 1
+COMPRESSION_PALMDOC = 2
+COMPRESSION_HUFFCDIC = 17480
+
+# MOBI 文本编码
+TEXT_ENCODINGS = {1252: 'cp1252', 65001: 'utf-8'}
+
+# 常用 EXTH 记录类型
+EXTH_AUTHOR = 100
+EXTH_PUBLISHER = 101
+EXTH_DESCRIPTION = 103
+EXTH_SUBJECT = 105
+EXTH_PUBLISH_DATE = 106
+EXTH_UPDATED_TITLE = 503
+EXTH_LANGUAGE = 524
+
+
+def palmdoc_decompress(data: bytes) -> bytes:
+    """
+    解压 PalmDOC（LZ77 变体）压缩的记录
+
+    Args:
+        data: 压缩数据
+
+    Returns:
+        解压后的字节
+    """
+    out = bytearray()
+    i = 0
+    length = len(data)
+
+    while i < length:
+        c = data[i]
+        i += 1
+
+        if 1 <= c <= 8:
+            # 原样复制随后的 c 个字节
+            out += data[i:i + c]
+            i += c
+        elif c < 0x80:
+            out.append(c)
+        elif c >= 0xC0:
+            # 空格加一个字符
+            out.append(0x20)
+            out.append(c ^ 0x80)
+        else:
+            # 回溯复制：11 位距离，3 位长度
+            if i >= length:
+                break
+            pair = (c << 8) | data[i]
+            i += 1
+            distance = (pair >> 3) & 0x07FF
+            count = (pair & 0x07) + 3
+            if distance == 0 or distance > len(out):
+                continue
+
+            start = len(out) - distance
+            if distance >= count:
+                out += out[start:start + count]
+            else:
+                # 源与目标重叠，逐字节复制
+                for offset in range(count):
+                    out.append(out[start + offset])
+
+    return bytes(out)
+
+
+def _trailing_entry_size(data: bytes, end: int) -> int:
+    """读取记录末尾反向存储的变长整数（尾部条目长度）"""
+    result = 0
+    shift = 0
+    while end > 0:
+        end -= 1
+        value = data[end]
+        result |= (value & 0x7F) << shift
+        shift += 7
+        if value & 0x80 or shift >= 28:
+            break
+    return result
+
+
+def trailing_data_size(data: bytes, flags: int) -> int:
+    """
+    计算文本记录末尾附加数据的长度
+
+    Args:
+        data: 记录原始数据
+        flags: MOBI 头中的附加数据标志
+
+    Returns:
+        需要去除的末尾字节数
+    """
+    size = 0
+    bits = flags >> 1
+    while bits:
+        if bits & 1:
+            size += _trailing_entry_size(data, len(data) - size)
+        bits >>= 1
+
+    # 最低位表示存在跨记录的多字节字符数据
+    if flags & 1 and len(data) > size:
+        size += (data[len(data) - size - 1] & 0x03) + 1
+
+    return min(size, len(data))
+
+
+class MobiReader:
+    """
+    MOBI/PDB 文件读取器
+
+    解析记录表、PalmDOC 头、MOBI 头与 EXTH 元数据，文本记录在读取时逐条
+    定位、去除附加数据并在内存中解压，不生成任何临时文件。
+    """
+
+    def __init__(self, file_path: Path):
+        """
+        打开文件并读取头部信息
+
+        Args:
+            file_path: 文件路径
+
+        Raises:
+            ValueError: 不是有效的 MOBI/PDB 文件或已加密
+        """
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        try:
+            self._read_headers()
+        except (struct.error, IndexError) as e:
+            self._file.close()
+            raise ValueError(f"MOBI文件头无效: {e}")
+        except ValueError:
+            self._file.close()
+            raise
+
+    def __enter__(self) -> 'MobiReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _read_headers(self) -> None:
+        """读取 PDB 记录表及第 0 条记录中的各个头部"""
+        header = self._file.read(PDB_HEADER_SIZE)
+        if len(header) < PDB_HEADER_SIZE:
+            raise ValueError("文件过短")
+
+        self.database_type = header[60:68]
+        record_count = struct.unpack_from('>H', header, 76)[0]
+        table = self._file.read(record_count * RECORD_INFO_SIZE)
+        if record_count == 0 or len(table) < record_count * RECORD_INFO_SIZE:
+            raise ValueError("记录表不完整")
+
+        self._file.seek(0, 2)
+        file_size = self._file.tell()
+        self._offsets: List[int] = [
+            struct.unpack_from('>I', table, i * RECORD_INFO_SIZE)[0]
+            for i in range(record_count)
+        ]
+        self._offsets.append(file_size)
+
+        record0 = self.read_record(0)
+        self.compression, = struct.unpack_from('>H', record0, 0)
+        self.text_length, self.text_record_count, self.record_size, encryption = \
+            struct.unpack_from('>IHHH', record0, 4)
+
+        if encryption:
+            raise ValueError("不支持加密（DRM）的MOBI文件")
+        if self.compression not in (COMPRESSION_NONE, COMPRESSION_PALMDOC, COMPRESSION_HUFFCDIC):
+            raise ValueError(f"未知的压缩方式: {self.compression}")
+
+        self.encoding = 'cp1252'
+        self.extra_flags = 0
+        self.title = header[:32].split(b'\x00', 1)[0].decode('latin-1')
+        self.exth: Dict[int, List[bytes]] = {}
+        self.mobi_version = 0
+
+        # PalmDOC 文件没有 MOBI 头，正文为纯文本
+        self.is_mobi = record0[16:20] == b'MOBI'
+        if not self.is_mobi:
+            return
+
+        header_length, = struct.unpack_from('>I', record0, 20)
+        encoding_code, = struct.unpack_from('>I', record0, 28)
+        self.encoding = TEXT_ENCODINGS.get(encoding_code, 'cp1252')
+        self.mobi_version, = struct.unpack_from('>I', record0, 36)
+
+        name_offset, name_length = struct.unpack_from('>II', record0, 84)
+        if name_length and name_offset + name_length <= len(record0):
+            self.title = record0[name_offset:name_offset + name_length].decode(self.encoding, errors='replace')
+
+        if header_length >= 0xE4 and len(record0) >= 0xF4:
+            self.extra_flags, = struct.unpack_from('>H', record0, 0xF2)
+
+        exth_flags, = struct.unpack_from('>I', record0, 0x80)
+        if exth_flags & 0x40:
+            self._read_exth(record0, 16 + header_length)
+
+    def _read_exth(self, record0: bytes, offset: int) -> None:
+        """读取 EXTH 元数据记录"""
+        if record0[offset:offset + 4] != b'EXTH':
+            return
+
+        count, = struct.unpack_from('>I', record0, offset + 8)
+        pos = offset + 12
+        for _ in range(count):
+            if pos + 8 > len(record0):
+                break
+            record_type, length = struct.unpack_from('>II', record0, pos)
+            if length < 8:
+                break
+            self.exth.setdefault(record_type, []).append(record0[pos + 8:pos + length])
+            pos += length
+
+    def read_record(self, index: int) -> bytes:
+        """
+        读取一条原始记录
+
+        Args:
+            index: 记录序号
+
+        Returns:
+            记录数据
+        """
+        start, end = self._offsets[index], self._offsets[index + 1]
+        self._file.seek(start)
+        return self._file.read(max(0, end - start))
+
+    def get_exth_text(self, record_type: int) -> Optional[str]:
+        """
+        获取 EXTH 文本元数据
+
+        Args:
+            record_type: EXTH 记录类型
+
+        Returns:
+            文本内容，不存在时返回None
+        """
+        values = self.exth.get(record_type)
+        if not values:
+            return None
+        text = values[0].decode(self.encoding, errors='replace').strip()
+        return text or None
+
+    @property
+    def metadata(self) -> Dict[str, str]:
+        """书籍元数据（标题、作者、语言等）"""
+        result = {'title': self.get_exth_text(EXTH_UPDATED_TITLE) or self.title}
+        for key, record_type in (
+            ('author', EXTH_AUTHOR),
+            ('publisher', EXTH_PUBLISHER),
+            ('description', EXTH_DESCRIPTION),
+            ('subject', EXTH_SUBJECT),
+            ('date', EXTH_PUBLISH_DATE),
+            ('language', EXTH_LANGUAGE),
+        ):
+            value = self.get_exth_text(record_type)
+            if value:
+                result[key] = value
+        return result
+
+    def iter_text_records(self, start: int = 1, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        逐条读取并解压文本记录
+
+        Args:
+            start: 起始文本记录序号（从1开始）
+            end: 结束序号（不含），默认到最后一条文本记录
+
+        Yields:
+            解压后的记录字节
+
+        Raises:
+            ValueError: 压缩方式需要 HUFF/CDIC 解码
+        """
+        if self.compression == COMPRESSION_HUFFCDIC:
+            raise ValueError("不支持 HUFF/CDIC 压缩")
+
+        last = self.text_record_count + 1
+        end = last if end is None else min(end, last)
+
+        for index in range(max(1, start), end):
+            data = self.read_record(index)
+            trailing = trailing_data_size(data, self.extra_flags)
+            if trailing:
+                data = data[:-trailing]
+            if self.compression == COMPRESSION_PALMDOC:
+                data = palmdoc_decompress(data)
+            yield data
+
+    def iter_text(self, start: int = 1, end: Optional[int] = None) -> Iterator[str]:
+        """
+        逐条解码文本记录（跨记录的多字节字符由增量解码器处理）
+
+        Args:
+            start: 起始文本记录序号（从1开始）
+            end: 结束序号（不含）
+
+        Yields:
+            解码后的文本片段
+        """
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+        for data in self.iter_text_records(start, end):
+            text = decoder.decode(data)
+            if text:
+                yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+    def read_bytes(self) -> bytes:
+        """
+        读取全部正文的原始字节（filepos 偏移即相对于此）
+
+        Returns:
+            解压后的正文字节
+        """
+        return b''.join(self.iter_text_records())
+
+    def read_text(self) -> str:
+        """
+        读取全部正文
+
+        Returns:
+            正文内容（MOBI 中为 HTML）
+        """
+        return ''.join(self.iter_text())
+
+    def close(self) -> None:
+        """关闭文件"""
+        self._file.close()
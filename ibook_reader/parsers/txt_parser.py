@@ -1,19 +1,52 @@
 """TXT文档解析器"""
 
+from functools import partial
 from pathlib import Path
-import chardet
+from typing import Optional
 
 from .base import BaseParser
-from ..models.document import Document, Chapter
-from ..utils.text_utils import normalize_text
+from .chapter_detector import split_chapters
+from .mapped_text import MappedTextFile
+from ..models.document import Document, Chapter, LazyChapter, DocumentMetadata
+from ..utils.encoding_utils import (
+    EncodingInfo,
+    read_text_file,
+    detect_encoding,
+    detect_file_encoding,
+    candidate_encodings,
+    select_encoding
+)
+from ..utils.file_utils import is_large_file
 
 
 class TxtParser(BaseParser):
     """TXT文档解析器"""
     
+    # 增加了章节标题检测
+    PARSER_VERSION = 3
+    
+    # 读取文件时同时计算文件指纹
+    SUPPORTS_INGEST_HASH = True
+    
+    # 纯文本重新解析与加载缓存的 JSON 耗时相当（32MB 约 0.36s 对 0.24s），
+    # 缓存却占用与原文件相当的空间，大文件不写入缓存
+    CACHE_MAX_BYTES = 8 * 1024 * 1024
+    
     # 尝试的编码列表（按优先级）
     ENCODINGS = ['utf-8', 'gbk', 'gb2312', 'gb18030', 'big5', 'latin1']
     
+    # 编码检测的采样大小（字节）
+    SAMPLE_SIZE = 64 * 1024
+    
+    # 流式解码的分块大小（字节）
+    CHUNK_SIZE = 1024 * 1024
+    
+    # 超过该大小（MB）的文件使用内存映射延迟加载
+    LAZY_THRESHOLD_MB = 100
+    
+    # 是否按章节标题（第X章、Chapter N、序章等）分割章节
+    DETECT_CHAPTERS = True
+    
     def parse(self) -> Document:
         """
         解析TXT文档
@@ -21,69 +54,133 @@ class TxtParser(BaseParser):
         Returns:
             Document对象
         """
-        # 读取文件内容
+        if self._use_lazy_mode():
+            document = self._parse_lazy()
+            if document is not None:
+                return document
+        
+        # 流式读取文件内容（换行符已统一）
         content = self._read_file()
         
-        # 标准化文本
-        content = normalize_text(content)
+        # 按章节标题分割，未检测到标题时作为单章节
+        chapters = None
+        if self.DETECT_CHAPTERS:
+            chapters = split_chapters(content, self._get_default_title())
         
-        # 创建单章节文档
-        chapter = Chapter(
-            index=0,
-            title=self._get_default_title(),
-            content=content,
-            start_position=0
-        )
+        if not chapters:
+            chapters = [Chapter(
+                index=0,
+                title=self._get_default_title(),
+                content=content,
+                start_position=0
+            )]
         
         # 创建文档对象
         document = Document(
             title=self._get_default_title(),
-            chapters=[chapter],
+            chapters=chapters,
             metadata={
                 'format': 'txt',
-                'encoding': self._detected_encoding or 'unknown'
+                **self._encoding_info.to_metadata()
             }
         )
         
         return document
     
+    def parse_metadata(self) -> DocumentMetadata:
+        """
+        获取文档元数据：只对文件开头采样检测编码，章节数需完整解析才能得知
+        
+        Returns:
+            DocumentMetadata对象
+        """
+        info = detect_file_encoding(self.file_path, self.SAMPLE_SIZE)
+        return DocumentMetadata(
+            title=self._get_default_title(),
+            format='txt',
+            file_size=self.file_path.stat().st_size,
+            extra=info.to_metadata()
+        )
+    
+    def should_cache(self) -> bool:
+        """延迟加载的大文件不写入文档缓存"""
+        return not self._use_lazy_mode()
+    
+    def _use_lazy_mode(self) -> bool:
+        """判断是否使用内存映射延迟加载"""
+        return is_large_file(self.file_path, self.LAZY_THRESHOLD_MB)
+    
+    def _parse_lazy(self) -> Optional[Document]:
+        """
+        以内存映射方式打开文件，各段内容在访问时才解码
+        
+        文件按换行符切分为约 1MB 的段，每段作为一个延迟加载的章节，
+        分页器只会解码正在显示的段。段只是内部的加载单位：都使用文档标题，
+        文档标记为 segmented，章节导航把整个文件视为一章。
+        
+        注意：总页数（以及整体输出）仍需解码并换行全部段，耗时与文件大小成正比。
+        
+        Returns:
+            Document对象，编码不支持按字节切分时返回None
+        """
+        with open(self.file_path, 'rb') as f:
+            sample = f.read(self.SAMPLE_SIZE)
+        
+        # 无法预先解码整个文件，只用采样校验候选编码
+        info = detect_encoding(sample)
+        encoding = select_encoding(sample, candidate_encodings(info, self.ENCODINGS)) or 'utf-8'
+        
+        # UTF-16/UTF-32 的换行符不是单字节，无法按字节切分
+        if encoding.replace('_', '-').lower().startswith(('utf-16', 'utf-32')):
+            return None
+        
+        source = MappedTextFile(self.file_path, encoding)
+        title = self._get_default_title()
+        
+        chapters = [
+            LazyChapter(
+                index=i,
+                title=title,
+                loader=partial(source.read_segment, i),
+                position_loader=partial(source.char_offset, i)
+            )
+            for i in range(source.segment_count)
+        ]
+        
+        if encoding != info.encoding:
+            info = EncodingInfo(encoding, 0.0, 'fallback')
+        
+        document = Document(
+            title=title,
+            chapters=chapters,
+            metadata={
+                'format': 'txt',
+                'lazy': 'true',
+                'segmented': 'true',
+                **info.to_metadata()
+            }
+        )
+        document.resources.append(source)
+        return document
+    
     def _read_file(self) -> str:
         """
         读取文件内容，自动检测编码
         
+        只对文件开头的一段采样检测编码，然后按块增量解码并统一换行符，
+        避免同时持有整个文件的字节、解码结果及其多份副本。
+        
         Returns:
-            文件内容
+            文件内容（换行符已统一为 \\n）
         """
-        # 先读取部分内容检测编码
-        with open(self.file_path, 'rb') as f:
-            raw_data = f.read()
-        
-        # 使用 chardet 检测编码
-        detected = chardet.detect(raw_data)
-        encoding = detected.get('encoding')
-        confidence = detected.get('confidence', 0)
-        
-        # 如果检测置信度较高，使用检测到的编码
-        if encoding and confidence > 0.7:
-            try:
-                content = raw_data.decode(encoding)
-                self._detected_encoding = encoding
-                return content
-            except Exception:
-                pass
-        
-        # 否则依次尝试常用编码
-        for enc in self.ENCODINGS:
-            try:
-                content = raw_data.decode(enc)
-                self._detected_encoding = enc
-                return content
-            except Exception:
-                continue
-        
-        # 最后使用 UTF-8 并忽略错误
-        self._detected_encoding = 'utf-8'
-        return raw_data.decode('utf-8', errors='ignore')
+        content, self._encoding_info = read_text_file(
+            self.file_path,
+            fallback_encodings=self.ENCODINGS,
+            sample_size=self.SAMPLE_SIZE,
+            chunk_size=self.CHUNK_SIZE,
+            hasher=self.hasher
+        )
+        return content
     
     @classmethod
     def can_parse(cls, file_path: Path) -> bool:
@@ -2,7 +2,8 @@
 
 from .auth_service import AuthService
 from .bookmark_service import BookmarkService
+from .document_cache import DocumentCache
 from .progress_service import ProgressService
 from .reader_service import ReaderService
 
-__all__ = ['AuthService', 'BookmarkService', 'ProgressService', 'ReaderService']
+__all__ = ['AuthService', 'BookmarkService', 'DocumentCache', 'ProgressService', 'ReaderService']
@@ -5,6 +5,7 @@ from typing import Optional, Tuple
 from getpass import getpass
 
 from ..config import Config
+from ..context import AppContext
 from ..utils.crypto import create_password_hash, verify_password
 
 
@@ -22,9 +23,9 @@ class AuthService:
         初始化身份验证服务
         
         Args:
-            config: 配置管理器实例
+            config: 配置管理器实例，默认使用共享的应用上下文
         """
-        self.config = config or Config()
+        self.config = config or AppContext.get().config
     
     def has_password(self) -> bool:
         """
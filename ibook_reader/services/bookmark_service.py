@@ -1,13 +1,15 @@
 """书签管理服务"""
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from pathlib import Path
 
 from ..models.bookmark import Bookmark
 from ..models.document import Document
 from ..core.paginator import Page
 from ..config import Config
-from ..utils.file_utils import read_json_file, write_json_file, get_file_hash
+from ..context import AppContext
+from ..storage import BaseStore, create_store
+from ..utils.fingerprint import FileFingerprint, get_fingerprint_cache
 from ..utils.text_utils import extract_preview
 
 
@@ -17,14 +19,66 @@ class BookmarkService:
     # 最大书签数量
     MAX_BOOKMARKS = 50
     
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None, store: Optional[BaseStore] = None):
         """
         初始化书签服务
         
         Args:
-            config: 配置管理器实例
+            config: 配置管理器实例，默认使用共享的应用上下文
+            store: 书签存储，默认按配置创建
         """
-        self.config = config or Config()
+        if config is None:
+            # 未指定配置时使用共享的应用上下文（同一配置与存储）
+            context = AppContext.get()
+            self.config = context.config
+            self.store = store or context.store
+        else:
+            self.config = config
+            self.store = store or create_store(config)
+    
+    def _fingerprint(self, file_path: Path) -> FileFingerprint:
+        """获取文件在当前配置的指纹方案下的指纹"""
+        return FileFingerprint(
+            file_path,
+            self.config.get_fingerprint_scheme(),
+            get_fingerprint_cache(self.config.fingerprint_file)
+        )
+    
+    def _locate(self, file_path: Path) -> Tuple[FileFingerprint, Optional[dict]]:
+        """
+        获取文件指纹及书签集合
+        
+        当前方案下没有书签时，查找同一路径下以其他指纹方案保存的旧书签
+        并将其迁移到当前方案。
+        
+        Args:
+            file_path: 文档文件路径
+            
+        Returns:
+            (文件指纹, 书签集合)，没有书签时集合为None
+        """
+        fingerprint = self._fingerprint(file_path)
+        data = self.store.get_bookmarks(fingerprint.digest)
+        
+        if data is None:
+            absolute_path = file_path.resolve()
+            
+            for legacy in self.store.find_bookmarks(str(absolute_path)):
+                if legacy.get('hash_scheme', 'md5') == fingerprint.scheme:
+                    continue
+                if Path(legacy.get('file_path', '')).resolve() != absolute_path:
+                    continue
+                if not fingerprint.matches(legacy.get('file_hash'), legacy.get('hash_scheme')):
+                    continue
+                
+                self.store.delete_bookmarks(legacy['file_hash'])
+                legacy['file_hash'] = fingerprint.digest
+                legacy['hash_scheme'] = fingerprint.scheme
+                self.store.put_bookmarks(legacy)
+                data = legacy
+                break
+        
+        return fingerprint, data
     
     def load_bookmarks(self, file_path: Path) -> List[Bookmark]:
         """
@@ -36,13 +90,7 @@ class BookmarkService:
         Returns:
             书签列表
         """
-        file_hash = get_file_hash(file_path)
-        bookmark_file = self.config.get_bookmark_file(file_hash)
-        
-        if not bookmark_file.exists():
-            return []
-        
-        data = read_json_file(bookmark_file)
+        _, data = self._locate(file_path)
         if not data or 'bookmarks' not in data:
             return []
         
@@ -66,8 +114,7 @@ class BookmarkService:
             file_path: 文档文件路径
             bookmarks: 书签列表
         """
-        file_hash = get_file_hash(file_path)
-        bookmark_file = self.config.get_bookmark_file(file_hash)
+        fingerprint = self._fingerprint(file_path)
 
         # 使用绝对路径保存
         absolute_path = file_path.resolve()
@@ -75,11 +122,12 @@ class BookmarkService:
         data = {
             'file_path': str(absolute_path),
             'file_name': file_path.name,
-            'file_hash': file_hash,
+            'file_hash': fingerprint.digest,
+            'hash_scheme': fingerprint.scheme,
             'bookmarks': [bookmark.to_dict() for bookmark in bookmarks]
         }
         
-        write_json_file(bookmark_file, data)
+        self.store.put_bookmarks(data)
     
     def add_bookmark(
         self,
@@ -103,40 +151,42 @@ class BookmarkService:
         Raises:
             ValueError: 如果书签数量已达上限
         """
-        # 加载现有书签
-        bookmarks = self.load_bookmarks(file_path)
+        # 读取、修改、保存期间持有书签锁，避免并发实例互相覆盖
+        with self.store.lock_bookmarks():
+            # 加载现有书签
+            bookmarks = self.load_bookmarks(file_path)
         
-        # 检查数量限制
-        if len(bookmarks) >= self.MAX_BOOKMARKS:
-            raise ValueError(f"书签数量已达上限（{self.MAX_BOOKMARKS}个）")
-        
-        # 获取章节信息
-        chapter = document.get_chapter(page.chapter_index)
-        chapter_name = chapter.title if chapter else "未知章节"
-        
-        # 提取预览文本
-        preview_text = extract_preview(page.content, max_length=50)
-        
-        # 生成新的书签ID
-        next_id = max([b.id for b in bookmarks], default=0) + 1
-        
-        # 创建书签
-        from datetime import datetime
-        bookmark = Bookmark(
-            id=next_id,
-            page_number=page.page_number,
-            chapter_index=page.chapter_index,
-            chapter_name=chapter_name,
-            preview_text=preview_text,
-            created_at=datetime.now().isoformat(),
-            note=note
-        )
+            # 检查数量限制
+            if len(bookmarks) >= self.MAX_BOOKMARKS:
+                raise ValueError(f"书签数量已达上限（{self.MAX_BOOKMARKS}个）")
+        
+            # 获取章节信息
+            chapter = document.get_chapter(page.chapter_index)
+            chapter_name = chapter.title if chapter else "未知章节"
+        
+            # 提取预览文本
+            preview_text = extract_preview(page.content, max_length=50)
         
-        # 添加到列表
-        bookmarks.append(bookmark)
+            # 生成新的书签ID
+            next_id = max([b.id for b in bookmarks], default=0) + 1
         
-        # 保存
-        self.save_bookmarks(file_path, bookmarks)
+            # 创建书签
+            from datetime import datetime
+            bookmark = Bookmark(
+                id=next_id,
+                page_number=page.page_number,
+                chapter_index=page.chapter_index,
+                chapter_name=chapter_name,
+                preview_text=preview_text,
+                created_at=datetime.now().isoformat(),
+                note=note
+            )
+        
+            # 添加到列表
+            bookmarks.append(bookmark)
+        
+            # 保存
+            self.save_bookmarks(file_path, bookmarks)
         
         return bookmark
     
@@ -151,24 +201,23 @@ class BookmarkService:
         Returns:
             是否删除成功
         """
-        bookmarks = self.load_bookmarks(file_path)
+        # 读取、修改、保存期间持有书签锁
+        with self.store.lock_bookmarks():
+            bookmarks = self.load_bookmarks(file_path)
         
-        # 查找并删除
-        original_count = len(bookmarks)
-        bookmarks = [b for b in bookmarks if b.id != bookmark_id]
+            # 查找并删除
+            original_count = len(bookmarks)
+            bookmarks = [b for b in bookmarks if b.id != bookmark_id]
         
-        if len(bookmarks) == original_count:
-            return False  # 未找到要删除的书签
+            if len(bookmarks) == original_count:
+                return False  # 未找到要删除的书签
         
-        # 保存
-        if bookmarks:
-            self.save_bookmarks(file_path, bookmarks)
-        else:
-            # 如果没有书签了，删除书签文件
-            file_hash = get_file_hash(file_path)
-            bookmark_file = self.config.get_bookmark_file(file_hash)
-            if bookmark_file.exists():
-                bookmark_file.unlink()
+            # 保存
+            if bookmarks:
+                self.save_bookmarks(file_path, bookmarks)
+            else:
+                # 如果没有书签了，删除书签记录
+                self.store.delete_bookmarks(self._fingerprint(file_path).digest)
         
         return True
     
@@ -201,13 +250,12 @@ class BookmarkService:
         Returns:
             清除的书签数量
         """
-        bookmarks = self.load_bookmarks(file_path)
-        count = len(bookmarks)
+        # 读取与删除期间持有书签锁
+        with self.store.lock_bookmarks():
+            bookmarks = self.load_bookmarks(file_path)
+            count = len(bookmarks)
         
-        if count > 0:
-            file_hash = get_file_hash(file_path)
-            bookmark_file = self.config.get_bookmark_file(file_hash)
-            if bookmark_file.exists():
-                bookmark_file.unlink()
+            if count > 0:
+                self.store.delete_bookmarks(self._fingerprint(file_path).digest)
         
         return count
@@ -0,0 +1,248 @@
+"""文档解析缓存服务"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from ..models.document import Document
+from ..parsers.base import BaseParser
+from ..config import Config
+from ..context import AppContext
+from ..utils.file_utils import read_json_file, write_json_file, get_file_hash
+from ..utils.fingerprint import STREAMING_SCHEMES, FingerprintCache, IngestHash, get_fingerprint_cache
+
+
+class DocumentCache:
+    """
+    已解析文档的磁盘缓存
+
+    以文件指纹为键，将解析后的 Document（章节、标题、元数据）保存到
+    配置目录下的 cache 子目录。解析器类型或版本变化时缓存自动失效。
+    """
+
+    # 缓存格式版本
+    CACHE_VERSION = 1
+
+    # 最多保留的缓存条目数
+    MAX_ENTRIES = 50
+    
+    # 缓存目录的总大小上限（字节）
+    MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, config: Optional[Config] = None):
+        """
+        初始化文档缓存
+
+        Args:
+            config: 配置管理器实例，默认使用共享的应用上下文
+        """
+        self.config = config or AppContext.get().config
+
+    @property
+    def fingerprints(self) -> FingerprintCache:
+        """与配置对应的文件指纹缓存"""
+        return get_fingerprint_cache(self.config.fingerprint_file)
+
+    def _get_cache_file(self, file_hash: str) -> Path:
+        """获取缓存文件路径"""
+        return self.config.cache_dir / f"{file_hash}.json"
+
+    def load(self, file_path: Path, parser: BaseParser) -> Optional[Document]:
+        """
+        加载缓存的文档
+
+        Args:
+            file_path: 文档文件路径
+            parser: 将用于解析该文档的解析器
+
+        Returns:
+            缓存的文档对象，未命中返回None
+        """
+        stat = os.stat(file_path)
+        file_hash = get_file_hash(file_path, self.config.get_fingerprint_scheme(), self.fingerprints)
+        cache_file = self._get_cache_file(file_hash)
+
+        data = read_json_file(cache_file)
+        if not data:
+            return None
+
+        # 校验缓存版本、解析器及文件名（标题可能来自文件名）；
+        # 抽样指纹无法发现大小不变的原地修改，同时校验文件大小与修改时间
+        if (data.get('cache_version') != self.CACHE_VERSION
+                or data.get('parser') != type(parser).__name__
+                or data.get('parser_version') != parser.PARSER_VERSION
+                or data.get('file_name') != file_path.name
+                or data.get('st_size') != stat.st_size
+                or data.get('st_mtime_ns') != stat.st_mtime_ns):
+            return None
+
+        try:
+            document = Document.from_dict(data['document'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        # 更新访问时间，用于淘汰最久未使用的条目
+        try:
+            os.utime(cache_file)
+        except OSError:
+            pass
+
+        return document
+
+    def save(
+        self,
+        file_path: Path,
+        parser: BaseParser,
+        document: Document,
+        file_hash: Optional[str] = None
+    ) -> None:
+        """
+        保存文档到缓存
+
+        Args:
+            file_path: 文档文件路径
+            parser: 解析该文档的解析器
+            document: 解析得到的文档对象
+            file_hash: 已知的文件指纹，None 时重新计算
+        """
+        stat = os.stat(file_path)
+        if file_hash is None:
+            file_hash = get_file_hash(file_path, self.config.get_fingerprint_scheme(), self.fingerprints)
+
+        data = {
+            'cache_version': self.CACHE_VERSION,
+            'parser': type(parser).__name__,
+            'parser_version': parser.PARSER_VERSION,
+            'file_name': file_path.name,
+            'st_size': stat.st_size,
+            'st_mtime_ns': stat.st_mtime_ns,
+            'document': document.to_dict()
+        }
+
+        write_json_file(self._get_cache_file(file_hash), data, backup=False)
+        self._evict()
+
+    def load_or_parse(self, file_path: Path, parser: BaseParser) -> Document:
+        """
+        优先从缓存加载文档，未命中时解析并写入缓存
+
+        Args:
+            file_path: 文档文件路径
+            parser: 解析器实例
+
+        Returns:
+            文档对象
+        """
+        # 延迟加载等模式的解析结果不写入缓存，也无需计算文件指纹
+        if not parser.should_cache():
+            return parser.parse()
+        
+        # 超过解析器缓存大小上限的文件不读写缓存（重新解析的代价与加载缓存相当）
+        cacheable = (parser.CACHE_MAX_BYTES is None
+                     or os.path.getsize(file_path) <= parser.CACHE_MAX_BYTES)
+        
+        # 指纹尚未缓存（冷启动）且解析器会顺序读完整个文件时，不先读一遍文件
+        # 计算指纹，而是在解析读取文件的同时计算，整个文件只读取一遍；
+        # 其他解析器（如 EPUB、MOBI）仍先计算指纹并查找文档缓存
+        scheme = self.config.get_fingerprint_scheme()
+        if parser.SUPPORTS_INGEST_HASH and scheme in STREAMING_SCHEMES and \
+                self.fingerprints.lookup(os.stat(file_path), scheme) is None:
+            return self._parse_and_hash(file_path, parser, scheme, save=cacheable)
+        
+        if not cacheable:
+            return parser.parse()
+        
+        try:
+            document = self.load(file_path, parser)
+        except Exception:
+            document = None
+
+        if document is not None:
+            return document
+
+        document = parser.parse()
+
+        # 缓存写入失败不影响阅读
+        try:
+            self.save(file_path, parser, document)
+        except Exception:
+            pass
+
+        return document
+
+    def _parse_and_hash(
+        self,
+        file_path: Path,
+        parser: BaseParser,
+        scheme: str,
+        save: bool = True
+    ) -> Document:
+        """
+        解析文档并同时计算文件指纹，然后写入缓存
+
+        指纹写入共享的指纹缓存，进度与书签服务随后直接使用而无需再次读取文件。
+        解析过程没有完整读完文件时（如解析失败后回退）退回单独计算指纹。
+
+        Args:
+            file_path: 文档文件路径
+            parser: 解析器实例
+            scheme: 指纹方案
+            save: 是否写入文档缓存（否则只发布指纹）
+
+        Returns:
+            文档对象
+        """
+        hasher = IngestHash(file_path, scheme)
+        parser.hasher = hasher
+        try:
+            document = parser.parse()
+        finally:
+            parser.hasher = None
+
+        # 缓存写入失败不影响阅读
+        try:
+            file_hash = hasher.publish(self.fingerprints)
+            if save:
+                self.save(file_path, parser, document, file_hash=file_hash)
+        except Exception:
+            pass
+
+        return document
+
+    def clear(self) -> int:
+        """
+        清空文档缓存
+
+        Returns:
+            删除的缓存条目数
+        """
+        count = 0
+        if self.config.cache_dir.exists():
+            for cache_file in self.config.cache_dir.glob('*.json'):
+                cache_file.unlink()
+                count += 1
+        return count
+
+    def _evict(self) -> None:
+        """淘汰最久未使用的缓存条目，直到条目数与总大小都不超过上限"""
+        entries = []
+        for cache_file in self.config.cache_dir.glob('*.json'):
+            try:
+                stat = cache_file.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, cache_file))
+
+        entries.sort(key=lambda entry: entry[0])
+        count = len(entries)
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, cache_file in entries:
+            if count <= self.MAX_ENTRIES and total <= self.MAX_BYTES:
+                break
+            try:
+                cache_file.unlink()
+            except OSError:
+                continue
+            count -= 1
+            total -= size
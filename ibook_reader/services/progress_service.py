@@ -7,20 +7,54 @@ from datetime import datetime
 from ..models.progress import ReadingProgress
 from ..models.document import Document
 from ..config import Config
-from ..utils.file_utils import read_json_file, write_json_file, get_file_hash
+from ..context import AppContext
+from ..storage import BaseStore, create_store
+from ..utils.fingerprint import FileFingerprint, get_fingerprint_cache
 
 
 class ProgressService:
     """阅读进度管理服务"""
     
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None, store: Optional[BaseStore] = None):
         """
         初始化进度服务
         
         Args:
-            config: 配置管理器实例
+            config: 配置管理器实例，默认使用共享的应用上下文
+            store: 进度存储，默认按配置创建
         """
-        self.config = config or Config()
+        if config is None:
+            # 未指定配置时使用共享的应用上下文（同一配置与存储）
+            context = AppContext.get()
+            self.config = context.config
+            self.store = store or context.store
+        else:
+            self.config = config
+            self.store = store or create_store(config)
+    
+    def _fingerprint(self, file_path: Path) -> FileFingerprint:
+        """获取文件在当前配置的指纹方案下的指纹"""
+        return FileFingerprint(
+            file_path,
+            self.config.get_fingerprint_scheme(),
+            get_fingerprint_cache(self.config.fingerprint_file)
+        )
+    
+    @staticmethod
+    def _matches(doc_data: dict, fingerprint: FileFingerprint, absolute_path: Path) -> bool:
+        """
+        判断进度记录是否属于该文件
+        
+        先比较路径，路径相同时才按记录自身的指纹方案比较指纹，
+        因此以其他方案保存的旧记录只在确实需要时才计算对应摘要。
+        """
+        try:
+            if Path(doc_data['file_path']).resolve() != absolute_path:
+                return False
+        except (KeyError, TypeError):
+            return False
+        
+        return fingerprint.matches(doc_data.get('file_hash'), doc_data.get('hash_scheme'))
     
     def load_progress(self, file_path: Path) -> Optional[ReadingProgress]:
         """
@@ -32,58 +66,40 @@ class ProgressService:
         Returns:
             阅读进度对象，如果不存在返回None
         """
-        file_hash = get_file_hash(file_path)
-
-        # 读取进度文件
-        data = read_json_file(self.config.progress_file)
-        if not data or 'documents' not in data:
-            return None
+        fingerprint = self._fingerprint(file_path)
 
         # 将输入路径转换为绝对路径用于比较
         absolute_file_path = file_path.resolve()
 
-        # 查找匹配的进度记录
-        for doc_data in data['documents']:
-            if doc_data.get('file_hash') == file_hash:
-                try:
-                    progress = ReadingProgress.from_dict(doc_data)
-
-                    # 验证文件路径是否匹配（比较绝对路径）
-                    saved_path = Path(progress.file_path).resolve()
-                    if saved_path == absolute_file_path:
-                        return progress
-                except (KeyError, ValueError):
-                    continue
+        # 按路径查找候选记录，再核对指纹
+        for doc_data in self.store.find_progress(str(absolute_file_path)):
+            if not self._matches(doc_data, fingerprint, absolute_file_path):
+                continue
+            
+            try:
+                progress = ReadingProgress.from_dict(doc_data)
+            except (KeyError, ValueError):
+                continue
+            
+            # 以其他方案保存的记录迁移到当前方案
+            if progress.hash_scheme != fingerprint.scheme:
+                self.store.delete_progress(progress.file_hash)
+                progress.file_hash = fingerprint.digest
+                progress.hash_scheme = fingerprint.scheme
+                self.store.put_progress(progress.to_dict())
+            
+            return progress
 
         return None
     
     def save_progress(self, progress: ReadingProgress) -> None:
         """
-        保存阅读进度
+        保存阅读进度（替换相同文件指纹的记录）
         
         Args:
             progress: 阅读进度对象
         """
-        # 读取现有进度数据
-        data = read_json_file(self.config.progress_file, default={'documents': []})
-        
-        if 'documents' not in data:
-            data['documents'] = []
-        
-        # 查找并更新现有记录
-        updated = False
-        for i, doc_data in enumerate(data['documents']):
-            if doc_data.get('file_hash') == progress.file_hash:
-                data['documents'][i] = progress.to_dict()
-                updated = True
-                break
-        
-        # 如果不存在，添加新记录
-        if not updated:
-            data['documents'].append(progress.to_dict())
-        
-        # 保存
-        write_json_file(self.config.progress_file, data)
+        self.store.put_progress(progress.to_dict())
     
     def create_progress(
         self,
@@ -106,20 +122,21 @@ class ProgressService:
         Returns:
             阅读进度对象
         """
-        file_hash = get_file_hash(file_path)
+        fingerprint = self._fingerprint(file_path)
 
         # 始终保存绝对路径，确保在不同目录下也能匹配
         absolute_path = file_path.resolve()
 
         progress = ReadingProgress(
             file_path=str(absolute_path),
-            file_hash=file_hash,
+            file_hash=fingerprint.digest,
             file_name=file_path.name,
             current_page=current_page,
             current_chapter=current_chapter,
             total_pages=total_pages,
             total_chapters=document.total_chapters,
-            last_read_time=datetime.now().isoformat()
+            last_read_time=datetime.now().isoformat(),
+            hash_scheme=fingerprint.scheme
         )
         
         return progress
@@ -154,32 +171,20 @@ class ProgressService:
         Returns:
             是否删除成功
         """
-        file_hash = get_file_hash(file_path)
-        
-        # 读取现有进度数据
-        data = read_json_file(self.config.progress_file)
-        if not data or 'documents' not in data:
-            return False
-        
-        # 删除匹配的记录
-        original_count = len(data['documents'])
-        data['documents'] = [
-            doc for doc in data['documents']
-            if doc.get('file_hash') != file_hash
-        ]
-        
-        if len(data['documents']) == original_count:
-            return False  # 未找到要删除的记录
-        
-        # 保存
-        if data['documents']:
-            write_json_file(self.config.progress_file, data)
-        else:
-            # 如果没有进度记录了，删除进度文件
-            if self.config.progress_file.exists():
-                self.config.progress_file.unlink()
+        fingerprint = self._fingerprint(file_path)
+        absolute_path = file_path.resolve()
         
-        return True
+        # 当前指纹的记录（文件可能已移动）及路径相同、指纹匹配的旧记录
+        file_hashes = set()
+        record = self.store.get_progress(fingerprint.digest)
+        if record and record.get('hash_scheme', 'md5') == fingerprint.scheme:
+            file_hashes.add(fingerprint.digest)
+        for doc_data in self.store.find_progress(str(absolute_path)):
+            if self._matches(doc_data, fingerprint, absolute_path):
+                file_hashes.add(doc_data['file_hash'])
+        
+        removed = [self.store.delete_progress(file_hash) for file_hash in file_hashes]
+        return any(removed)
     
     def get_all_progress(self) -> List[ReadingProgress]:
         """
@@ -188,12 +193,8 @@ class ProgressService:
         Returns:
             阅读进度列表
         """
-        data = read_json_file(self.config.progress_file)
-        if not data or 'documents' not in data:
-            return []
-        
         progress_list = []
-        for doc_data in data['documents']:
+        for doc_data in self.store.all_progress():
             try:
                 progress = ReadingProgress.from_dict(doc_data)
                 progress_list.append(progress)
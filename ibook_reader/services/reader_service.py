@@ -1,22 +1,36 @@
 """阅读控制服务 - 核心控制器"""
 
+import copy
+import threading
 from typing import Optional
 from pathlib import Path
 
 from ..models.document import Document
+from ..models.progress import ReadingProgress
 from ..core.paginator import Paginator, Page
 from ..parsers.factory import ParserFactory
 from .bookmark_service import BookmarkService
+from .document_cache import DocumentCache
 from .progress_service import ProgressService
 
 
 class ReaderService:
-    """阅读控制服务"""
+    """
+    阅读控制服务
+    
+    阅读进度采用延迟写回：翻页只更新内存中的进度，FLUSH_DELAY 秒后
+    由后台定时器合并写入一次；切换章节、打开其他文档及 save_and_exit
+    时立即写回。
+    """
+    
+    # 进度延迟写回的时间（秒）
+    FLUSH_DELAY = 2.0
     
     def __init__(
         self,
         bookmark_service: Optional[BookmarkService] = None,
-        progress_service: Optional[ProgressService] = None
+        progress_service: Optional[ProgressService] = None,
+        document_cache: Optional[DocumentCache] = None
     ):
         """
         初始化阅读控制服务
@@ -24,9 +38,11 @@ class ReaderService:
         Args:
             bookmark_service: 书签服务实例
             progress_service: 进度服务实例
+            document_cache: 文档缓存实例
         """
         self.bookmark_service = bookmark_service or BookmarkService()
         self.progress_service = progress_service or ProgressService()
+        self.document_cache = document_cache or DocumentCache(self.progress_service.config)
         
         # 当前状态
         self.file_path: Optional[Path] = None
@@ -34,6 +50,13 @@ class ReaderService:
         self.paginator: Optional[Paginator] = None
         self.current_page: int = 1
         self.total_pages: int = 0
+        
+        # 延迟写回的进度状态
+        self._progress: Optional[ReadingProgress] = None
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._progress_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
     
     def load_document(self, file_path: Path, rows: Optional[int] = None, cols: Optional[int] = None) -> bool:
         """
@@ -50,17 +73,25 @@ class ReaderService:
         if not file_path.exists():
             return False
         
+        # 先写回上一个文档的进度
+        self.flush_progress()
+        
         # 创建解析器
         parser = ParserFactory.create_parser(file_path)
         if parser is None:
             return False
         
-        # 解析文档
+        # 解析文档（优先使用缓存）
         try:
-            self.document = parser.parse()
+            document = self.document_cache.load_or_parse(file_path, parser)
         except Exception:
             return False
         
+        # 释放上一个文档占用的资源（如延迟加载的内存映射）
+        if self.document is not None:
+            self.document.close()
+        self.document = document
+        
         # 创建分页器
         self.paginator = Paginator(self.document, rows=rows, cols=cols)
         self.total_pages = self.paginator.get_total_pages()
@@ -70,6 +101,10 @@ class ReaderService:
         
         # 尝试加载阅读进度
         progress = self.progress_service.load_progress(file_path)
+        with self._progress_lock:
+            self._progress = progress
+            self._dirty = False
+        
         if progress:
             # 恢复进度
             self.current_page = min(progress.current_page, self.total_pages)
@@ -150,11 +185,11 @@ class ReaderService:
         # 获取下一章的索引
         next_chapter_index = current_page_obj.chapter_index + 1
         
-        if next_chapter_index >= self.document.total_chapters:
-            return False  # 已经是最后一章
+        if next_chapter_index >= self.document.navigable_chapters:
+            return False  # 已经是最后一章（分段文档只有一章）
         
-        # 跳转到下一章的第一页
-        next_chapter_page = self.paginator.get_page_by_chapter(next_chapter_index)
+        # 跳转到下一章的第一页（跳过没有页面的空章节）
+        next_chapter_page = self.paginator.get_nearest_chapter_page(next_chapter_index, step=1)
         if next_chapter_page:
             self.current_page = next_chapter_page.page_number
             self._update_progress()
@@ -179,11 +214,11 @@ class ReaderService:
         # 获取上一章的索引
         prev_chapter_index = current_page_obj.chapter_index - 1
         
-        if prev_chapter_index < 0:
-            return False  # 已经是第一章
+        if prev_chapter_index < 0 or self.document.is_segmented:
+            return False  # 已经是第一章（分段文档只有一章）
         
-        # 跳转到上一章的第一页
-        prev_chapter_page = self.paginator.get_page_by_chapter(prev_chapter_index)
+        # 跳转到上一章的第一页（跳过没有页面的空章节）
+        prev_chapter_page = self.paginator.get_nearest_chapter_page(prev_chapter_index, step=-1)
         if prev_chapter_page:
             self.current_page = prev_chapter_page.page_number
             self._update_progress()
@@ -280,7 +315,11 @@ class ReaderService:
             self.current_page = new_page.page_number
     
     def _update_progress(self) -> None:
-        """更新阅读进度"""
+        """
+        更新内存中的阅读进度
+        
+        章节变化时立即写回，否则在 FLUSH_DELAY 秒后合并写回。
+        """
         if self.file_path is None or self.document is None:
             return
         
@@ -288,24 +327,88 @@ class ReaderService:
         if current_page_obj is None:
             return
         
-        # 创建或更新进度
-        progress = self.progress_service.load_progress(self.file_path)
-        
-        if progress is None:
-            # 创建新进度
-            progress = self.progress_service.create_progress(
+        # 创建新进度需要计算文件指纹（可能读取整个文件），在锁外进行，
+        # 避免阻塞延迟写回线程
+        created = None
+        if self._progress is None:
+            created = self.progress_service.create_progress(
                 self.file_path,
                 self.document,
                 self.current_page,
                 current_page_obj.chapter_index,
                 self.total_pages
             )
+        
+        with self._progress_lock:
+            if self._progress is None:
+                if created is None:
+                    # 进度在此期间被重置（如重新加载文档）
+                    return
+                self._progress = created
+                chapter_changed = False
+            else:
+                # 更新现有进度
+                chapter_changed = current_page_obj.chapter_index != self._progress.current_chapter
+                self._progress.update_position(self.current_page, current_page_obj.chapter_index)
+            
+            self._dirty = True
+        
+        if chapter_changed:
+            self.flush_progress()
         else:
-            # 更新现有进度
-            progress.update_position(self.current_page, current_page_obj.chapter_index)
+            self._schedule_flush()
+    
+    def _schedule_flush(self) -> None:
+        """安排一次延迟写回（已有待执行的写回时不重复安排）"""
+        with self._progress_lock:
+            if self._flush_timer is not None:
+                return
+            
+            self._flush_timer = threading.Timer(self.FLUSH_DELAY, self._flush_in_background)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def flush_progress(self) -> bool:
+        """
+        立即写回内存中的阅读进度
+        
+        Returns:
+            是否写入了进度（没有未保存的变化时返回False）
+        """
+        with self._flush_lock:
+            with self._progress_lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                
+                if not self._dirty or self._progress is None:
+                    return False
+                
+                # 写入快照，写盘期间翻页不受阻塞
+                snapshot = copy.copy(self._progress)
+                self._dirty = False
+            
+            try:
+                self.progress_service.save_progress(snapshot)
+            except Exception:
+                with self._progress_lock:
+                    self._dirty = True
+                raise
         
-        self.progress_service.save_progress(progress)
+        return True
+    
+    def _flush_in_background(self) -> None:
+        """
+        延迟写回定时器的回调
+        
+        写盘失败时异常无人接收，保留未保存状态并重新安排写回。
+        """
+        try:
+            self.flush_progress()
+        except Exception:
+            self._schedule_flush()
     
     def save_and_exit(self) -> None:
         """保存进度并退出"""
         self._update_progress()
+        self.flush_progress()
@@ -0,0 +1,33 @@
+"""阅读进度与书签存储模块"""
+
+from .base import BaseStore
+from .journal_store import JournalStore
+from .json_store import JsonStore
+from .sqlite_store import SqliteStore
+
+
+# 存储后端名称 -> 存储类
+BACKENDS = {
+    'sqlite': SqliteStore,
+    'json': JsonStore,
+    'journal': JournalStore,
+}
+
+# 默认存储后端
+DEFAULT_BACKEND = 'sqlite'
+
+
+def create_store(config) -> BaseStore:
+    """
+    按配置创建存储
+
+    Args:
+        config: 配置管理器实例
+
+    Returns:
+        存储实例
+    """
+    return BACKENDS[config.get_storage_backend()](config)
+
+
+__all__ = ['BaseStore', 'JournalStore', 'JsonStore', 'SqliteStore', 'BACKENDS', 'DEFAULT_BACKEND', 'create_store']
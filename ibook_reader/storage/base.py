@@ -0,0 +1,175 @@
+"""阅读进度与书签存储接口"""
+
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from datetime import datetime
+from typing import ContextManager, List, Optional
+
+
+def is_newer(record: dict, existing: Optional[dict]) -> bool:
+    """
+    合并写入时判断新记录是否应覆盖已保存的记录
+
+    多个进程同时阅读同一文档时，以最后阅读时间较晚的进度为准，
+    避免持有旧状态的进程覆盖较新的进度。
+
+    Args:
+        record: 要写入的记录
+        existing: 已保存的记录
+
+    Returns:
+        是否覆盖（无法比较时覆盖）
+    """
+    if not existing:
+        return True
+    try:
+        return (datetime.fromisoformat(record['last_read_time'])
+                >= datetime.fromisoformat(existing['last_read_time']))
+    except (KeyError, TypeError, ValueError):
+        return True
+
+
+class BaseStore(ABC):
+    """
+    阅读进度与书签存储基类
+
+    进度记录为 ReadingProgress.to_dict() 的结果，以 file_hash 为主键；
+    书签记录为一个文档的书签集合（file_path、file_name、file_hash、
+    hash_scheme、bookmarks），同样以 file_hash 为主键。
+    """
+
+    @abstractmethod
+    def get_progress(self, file_hash: str) -> Optional[dict]:
+        """
+        按文件指纹获取进度记录
+
+        Args:
+            file_hash: 文件指纹
+
+        Returns:
+            进度记录，不存在返回None
+        """
+        pass
+
+    @abstractmethod
+    def find_progress(self, file_path: str) -> List[dict]:
+        """
+        按文件绝对路径查找进度记录
+
+        Args:
+            file_path: 文件绝对路径
+
+        Returns:
+            路径匹配的进度记录列表
+        """
+        pass
+
+    @abstractmethod
+    def put_progress(self, record: dict) -> None:
+        """
+        保存进度记录
+
+        相同 file_hash 的记录被替换，已保存的记录更新（最后阅读时间较晚）时保留原记录。
+
+        Args:
+            record: 进度记录
+        """
+        pass
+
+    @abstractmethod
+    def delete_progress(self, file_hash: str) -> bool:
+        """
+        删除进度记录
+
+        Args:
+            file_hash: 文件指纹
+
+        Returns:
+            是否删除了记录
+        """
+        pass
+
+    @abstractmethod
+    def all_progress(self) -> List[dict]:
+        """
+        获取所有进度记录
+
+        Returns:
+            进度记录列表
+        """
+        pass
+
+    @abstractmethod
+    def get_bookmarks(self, file_hash: str) -> Optional[dict]:
+        """
+        按文件指纹获取书签集合
+
+        Args:
+            file_hash: 文件指纹
+
+        Returns:
+            书签集合，不存在返回None
+        """
+        pass
+
+    @abstractmethod
+    def find_bookmarks(self, file_path: str) -> List[dict]:
+        """
+        按文件绝对路径查找书签集合
+
+        Args:
+            file_path: 文件绝对路径
+
+        Returns:
+            路径匹配的书签集合列表
+        """
+        pass
+
+    @abstractmethod
+    def put_bookmarks(self, data: dict) -> None:
+        """
+        保存书签集合（相同 file_hash 的集合被替换）
+
+        Args:
+            data: 书签集合
+        """
+        pass
+
+    @abstractmethod
+    def delete_bookmarks(self, file_hash: str) -> bool:
+        """
+        删除书签集合
+
+        Args:
+            file_hash: 文件指纹
+
+        Returns:
+            是否删除了记录
+        """
+        pass
+
+    @abstractmethod
+    def all_bookmarks(self) -> List[dict]:
+        """
+        获取所有书签集合
+
+        Returns:
+            书签集合列表
+        """
+        pass
+
+    def lock_bookmarks(self) -> ContextManager:
+        """
+        书签读-改-写期间持有的锁
+
+        书签服务在读取、修改、保存书签列表的整个过程中持有该锁，
+        避免并发的实例互相覆盖对方新增或删除的书签。
+
+        Returns:
+            上下文管理器
+        """
+        return nullcontext()
+
+    def close(self) -> None:
+        """释放存储占用的资源"""
+        pass
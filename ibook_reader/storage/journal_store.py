@@ -0,0 +1,185 @@
+"""日志式进度存储（快照 + 追加日志）"""
+
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .base import is_newer
+from .json_store import JsonStore, _same_path
+from ..utils.file_lock import file_lock
+from ..utils.file_utils import ensure_dir, read_json_file, write_json_file, DURABILITY_FAST
+
+
+class JournalStore(JsonStore):
+    """
+    日志式进度存储
+
+    progress.json 作为快照，每次进度更新只向 progress.journal 追加一行记录，
+    读取时在快照上重放日志得到最新状态。日志超过 COMPACT_BYTES 时把当前
+    状态写入新快照并清空日志。
+
+    记录都是幂等的（按 file_hash 整条替换或删除），压缩过程中崩溃导致日志
+    被重复重放也不会出错；写入中途崩溃只会留下无法解析的最后一行，重放时
+    被忽略，之前的状态不受影响。重放时较旧的进度不会覆盖较新的进度。
+    追加与压缩持有进度锁文件上的排他锁，读取不加锁。书签仍按 JsonStore 的方式保存。
+    """
+
+    # 触发压缩的日志大小（字节）
+    COMPACT_BYTES = 256 * 1024
+
+    def __init__(self, config):
+        """
+        初始化日志式存储
+
+        Args:
+            config: 配置管理器实例
+        """
+        super().__init__(config)
+        self._state: Dict[str, dict] = OrderedDict()
+        self._snapshot_key: Optional[tuple] = None
+        self._offset = 0
+
+    @staticmethod
+    def _file_key(path) -> Optional[tuple]:
+        """文件的状态签名，文件不存在时为None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _load_snapshot(self) -> None:
+        """重新加载快照并从头重放日志"""
+        self._snapshot_key = self._file_key(self.config.progress_file)
+        self._state = OrderedDict()
+        self._offset = 0
+
+        data = read_json_file(self.config.progress_file)
+        if data and isinstance(data.get('documents'), list):
+            for record in data['documents']:
+                if isinstance(record, dict) and record.get('file_hash'):
+                    self._state[record['file_hash']] = record
+
+    def _apply(self, line: bytes) -> None:
+        """应用一行日志记录（无法解析的行被忽略）"""
+        try:
+            entry = json.loads(line)
+            if entry['op'] == 'put':
+                record = entry['record']
+                if is_newer(record, self._state.get(record['file_hash'])):
+                    self._state.pop(record['file_hash'], None)
+                    self._state[record['file_hash']] = record
+            elif entry['op'] == 'del':
+                self._state.pop(entry['file_hash'], None)
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    def _refresh(self) -> None:
+        """
+        同步到最新状态
+
+        快照被替换（其他进程完成了压缩）或日志被截短时重新加载，
+        否则只读取上次之后新追加的完整行。
+        """
+        journal_file = self.config.progress_journal_file
+
+        try:
+            size = os.path.getsize(journal_file)
+        except OSError:
+            size = 0
+
+        if self._file_key(self.config.progress_file) != self._snapshot_key or size < self._offset:
+            self._load_snapshot()
+
+        if size == self._offset:
+            return
+
+        with open(journal_file, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+
+        # 只消费以换行结尾的完整行，末尾不完整的行留待下次（可能仍在写入）
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._apply(line)
+        self._offset += end
+
+    def _append(self, entry: dict) -> None:
+        """向日志追加一条记录，必要时压缩"""
+        journal_file = self.config.progress_journal_file
+        ensure_dir(journal_file.parent)
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+
+        with file_lock(self.config.progress_lock_file):
+            size = self._write_line(journal_file, line)
+
+        if size > self.COMPACT_BYTES:
+            self.compact()
+
+    def _write_line(self, journal_file, line: bytes) -> int:
+        """追加一行并返回追加后的日志大小（调用方持有进度锁）"""
+        fd = os.open(journal_file, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            # 上次写入被中断留下的残行单独成行，不与本条记录粘连
+            size = os.fstat(fd).st_size
+            if size:
+                os.lseek(fd, size - 1, os.SEEK_SET)
+                if os.read(fd, 1) != b'\n':
+                    line = b'\n' + line
+            os.write(fd, line)
+            if self.progress_durability != DURABILITY_FAST:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        return size + len(line)
+
+    def compact(self) -> None:
+        """把当前状态写入快照并清空日志"""
+        with file_lock(self.config.progress_lock_file):
+            self._refresh()
+
+            documents = list(self._state.values())
+            if documents:
+                write_json_file(self.config.progress_file, {'documents': documents},
+                                durability=self.progress_durability)
+            elif self.config.progress_file.exists():
+                self.config.progress_file.unlink()
+
+            # 快照已包含日志中的全部记录，持锁期间没有新的追加，此时截断日志是安全的
+            with open(self.config.progress_journal_file, 'wb'):
+                pass
+
+            self._snapshot_key = self._file_key(self.config.progress_file)
+            self._offset = 0
+
+    def get_progress(self, file_hash: str) -> Optional[dict]:
+        """按文件指纹获取进度记录"""
+        self._refresh()
+        return self._state.get(file_hash)
+
+    def find_progress(self, file_path: str) -> List[dict]:
+        """按文件绝对路径查找进度记录"""
+        self._refresh()
+        return [
+            record for record in self._state.values()
+            if _same_path(record.get('file_path', ''), file_path)
+        ]
+
+    def put_progress(self, record: dict) -> None:
+        """保存进度记录（追加一行日志）"""
+        self._append({'op': 'put', 'record': record})
+
+    def delete_progress(self, file_hash: str) -> bool:
+        """删除进度记录（追加一行日志）"""
+        if self.get_progress(file_hash) is None:
+            return False
+        self._append({'op': 'del', 'file_hash': file_hash})
+        return True
+
+    def all_progress(self) -> List[dict]:
+        """获取所有进度记录"""
+        self._refresh()
+        return list(self._state.values())
@@ -0,0 +1,144 @@
+"""JSON 文件存储（progress.json 与 bookmarks/*.json）"""
+
+from pathlib import Path
+from typing import ContextManager, List, Optional
+
+from .base import BaseStore, is_newer
+from ..utils.file_lock import file_lock
+from ..utils.file_utils import read_json_file, write_json_file
+
+
+def _same_path(saved: str, file_path: str) -> bool:
+    """比较保存的路径与绝对路径（保存的路径可能不是规范化的绝对路径）"""
+    try:
+        return str(Path(saved).resolve()) == file_path
+    except (TypeError, ValueError, OSError):
+        return False
+
+
+class JsonStore(BaseStore):
+    """
+    JSON 文件存储
+
+    所有进度记录保存在一个 progress.json 中，每个文档的书签各保存为
+    bookmarks 目录下以文件指纹命名的 JSON 文件。每次更新都重写整个文件。
+
+    写入方在锁文件上持有 fcntl 排他锁，锁内重新读取磁盘上的最新内容，
+    只替换要更新的那条记录（合并写入），因此多个进程同时写入不会丢失
+    彼此的更新；文件通过原子重命名替换，读取方无需加锁。
+    """
+
+    def __init__(self, config):
+        """
+        初始化 JSON 存储
+
+        Args:
+            config: 配置管理器实例
+        """
+        self.config = config
+        self.progress_durability = config.get_durability('progress')
+        self.bookmarks_durability = config.get_durability('bookmarks')
+
+    def _read_documents(self) -> List[dict]:
+        """读取全部进度记录"""
+        data = read_json_file(self.config.progress_file)
+        if not data or not isinstance(data.get('documents'), list):
+            return []
+        return data['documents']
+
+    def _write_documents(self, documents: List[dict]) -> None:
+        """写入全部进度记录（没有记录时删除进度文件）"""
+        if documents:
+            write_json_file(self.config.progress_file, {'documents': documents},
+                            durability=self.progress_durability)
+        elif self.config.progress_file.exists():
+            self.config.progress_file.unlink()
+
+    def get_progress(self, file_hash: str) -> Optional[dict]:
+        """按文件指纹获取进度记录"""
+        for record in self._read_documents():
+            if record.get('file_hash') == file_hash:
+                return record
+        return None
+
+    def find_progress(self, file_path: str) -> List[dict]:
+        """按文件绝对路径查找进度记录"""
+        return [
+            record for record in self._read_documents()
+            if _same_path(record.get('file_path', ''), file_path)
+        ]
+
+    def put_progress(self, record: dict) -> None:
+        """保存进度记录（锁内与磁盘上的最新内容合并）"""
+        with file_lock(self.config.progress_lock_file):
+            documents = self._read_documents()
+
+            for i, existing in enumerate(documents):
+                if existing.get('file_hash') == record['file_hash']:
+                    if not is_newer(record, existing):
+                        return
+                    documents[i] = record
+                    break
+            else:
+                documents.append(record)
+
+            self._write_documents(documents)
+
+    def delete_progress(self, file_hash: str) -> bool:
+        """删除进度记录"""
+        with file_lock(self.config.progress_lock_file):
+            documents = self._read_documents()
+            remaining = [record for record in documents if record.get('file_hash') != file_hash]
+
+            if len(remaining) == len(documents):
+                return False
+
+            self._write_documents(remaining)
+            return True
+
+    def all_progress(self) -> List[dict]:
+        """获取所有进度记录"""
+        return self._read_documents()
+
+    def get_bookmarks(self, file_hash: str) -> Optional[dict]:
+        """按文件指纹获取书签集合"""
+        data = read_json_file(self.config.get_bookmark_file(file_hash))
+        return data if isinstance(data, dict) else None
+
+    def find_bookmarks(self, file_path: str) -> List[dict]:
+        """按文件绝对路径查找书签集合（遍历书签目录）"""
+        return [
+            data for data in self.all_bookmarks()
+            if _same_path(data.get('file_path', ''), file_path)
+        ]
+
+    def put_bookmarks(self, data: dict) -> None:
+        """保存书签集合"""
+        with self.lock_bookmarks():
+            write_json_file(self.config.get_bookmark_file(data['file_hash']), data,
+                            durability=self.bookmarks_durability)
+
+    def delete_bookmarks(self, file_hash: str) -> bool:
+        """删除书签集合"""
+        with self.lock_bookmarks():
+            bookmark_file = self.config.get_bookmark_file(file_hash)
+            if not bookmark_file.exists():
+                return False
+            bookmark_file.unlink()
+            return True
+
+    def lock_bookmarks(self) -> ContextManager:
+        """书签读-改-写期间持有的跨进程锁"""
+        return file_lock(self.config.bookmarks_lock_file)
+
+    def all_bookmarks(self) -> List[dict]:
+        """获取所有书签集合"""
+        if not self.config.bookmarks_dir.exists():
+            return []
+
+        result = []
+        for bookmark_file in self.config.bookmarks_dir.glob('*.json'):
+            data = read_json_file(bookmark_file)
+            if isinstance(data, dict) and data.get('file_hash'):
+                result.append(data)
+        return result
@@ -0,0 +1,201 @@
+"""SQLite 存储（WAL 模式）"""
+
+import json
+import sqlite3
+import threading
+from typing import ContextManager, List, Optional
+
+from .base import BaseStore
+from ..utils.file_lock import file_lock
+from ..utils.file_utils import ensure_dir, read_json_file
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS progress (
+    file_hash TEXT PRIMARY KEY,
+    file_path TEXT NOT NULL,
+    last_read_time TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_progress_path ON progress (file_path);
+
+CREATE TABLE IF NOT EXISTS bookmarks (
+    file_hash TEXT PRIMARY KEY,
+    file_path TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bookmarks_path ON bookmarks (file_path);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+
+class SqliteStore(BaseStore):
+    """
+    SQLite 存储
+
+    进度与书签各占一张以 file_hash 为主键、file_path 带索引的表，
+    更新只改动一行。数据库使用 WAL 日志模式，读者不会被写者阻塞。
+    写入进度时若库中已有最后阅读时间更晚的记录则保留原记录。
+    首次打开时自动导入已有的 progress.json 与 bookmarks/*.json（原文件保留）。
+    """
+
+    # 数据库结构版本
+    SCHEMA_VERSION = 1
+
+    # 等待其他进程释放写锁的时间（秒）
+    BUSY_TIMEOUT = 5.0
+
+    # 进度持久性策略对应的 synchronous 级别
+    SYNCHRONOUS = {
+        'fast': 'OFF',
+        'safe': 'NORMAL',
+        'paranoid': 'FULL',
+    }
+
+    def __init__(self, config):
+        """
+        打开（必要时创建）数据库
+
+        Args:
+            config: 配置管理器实例
+        """
+        self.config = config
+        self._lock = threading.Lock()
+
+        ensure_dir(config.database_file.parent)
+        self._conn = sqlite3.connect(
+            str(config.database_file),
+            timeout=self.BUSY_TIMEOUT,
+            check_same_thread=False
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        synchronous = self.SYNCHRONOUS.get(config.get_durability('progress'), 'NORMAL')
+        self._conn.execute(f'PRAGMA synchronous={synchronous}')
+
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f'PRAGMA user_version={self.SCHEMA_VERSION}')
+
+        self._import_json()
+
+    def _import_json(self) -> None:
+        """导入 JSON 存储中的已有数据（只执行一次）"""
+        with self._lock, self._conn:
+            # 先取得写锁再检查标记，多个进程同时首次打开时只有一个执行导入
+            self._conn.execute('BEGIN IMMEDIATE')
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'json_imported'").fetchone()
+            if row is not None:
+                return
+
+            data = read_json_file(self.config.progress_file)
+            if data and isinstance(data.get('documents'), list):
+                for record in data['documents']:
+                    if isinstance(record, dict) and record.get('file_hash'):
+                        self._put_progress(record, replace=False)
+
+            if self.config.bookmarks_dir.exists():
+                for bookmark_file in self.config.bookmarks_dir.glob('*.json'):
+                    data = read_json_file(bookmark_file)
+                    if isinstance(data, dict) and data.get('file_hash'):
+                        self._put_bookmarks(data, replace=False)
+
+            self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('json_imported', '1')")
+
+    def _put_progress(self, record: dict, replace: bool = True) -> None:
+        """写入一条进度记录（调用方负责加锁与事务）"""
+        verb = 'INSERT OR REPLACE' if replace else 'INSERT OR IGNORE'
+        self._conn.execute(
+            f'{verb} INTO progress (file_hash, file_path, last_read_time, data) VALUES (?, ?, ?, ?)',
+            (record['file_hash'], record.get('file_path', ''),
+             record.get('last_read_time'), json.dumps(record, ensure_ascii=False))
+        )
+
+    def _put_bookmarks(self, data: dict, replace: bool = True) -> None:
+        """写入一个书签集合（调用方负责加锁与事务）"""
+        verb = 'INSERT OR REPLACE' if replace else 'INSERT OR IGNORE'
+        self._conn.execute(
+            f'{verb} INTO bookmarks (file_hash, file_path, data) VALUES (?, ?, ?)',
+            (data['file_hash'], data.get('file_path', ''), json.dumps(data, ensure_ascii=False))
+        )
+
+    def _query(self, sql: str, params: tuple = ()) -> List[dict]:
+        """执行查询并解码 data 列"""
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def _delete(self, table: str, file_hash: str) -> bool:
+        """按主键删除一行"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(f'DELETE FROM {table} WHERE file_hash = ?', (file_hash,))
+        return cursor.rowcount > 0
+
+    def get_progress(self, file_hash: str) -> Optional[dict]:
+        """按文件指纹获取进度记录"""
+        rows = self._query('SELECT data FROM progress WHERE file_hash = ?', (file_hash,))
+        return rows[0] if rows else None
+
+    def find_progress(self, file_path: str) -> List[dict]:
+        """按文件绝对路径查找进度记录（使用索引）"""
+        return self._query('SELECT data FROM progress WHERE file_path = ?', (file_path,))
+
+    def put_progress(self, record: dict) -> None:
+        """保存进度记录（已有更新的记录时保留原记录）"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                '''
+                INSERT INTO progress (file_hash, file_path, last_read_time, data) VALUES (?, ?, ?, ?)
+                ON CONFLICT (file_hash) DO UPDATE SET
+                    file_path = excluded.file_path,
+                    last_read_time = excluded.last_read_time,
+                    data = excluded.data
+                WHERE progress.last_read_time IS NULL
+                    OR excluded.last_read_time IS NULL
+                    OR excluded.last_read_time >= progress.last_read_time
+                ''',
+                (record['file_hash'], record.get('file_path', ''),
+                 record.get('last_read_time'), json.dumps(record, ensure_ascii=False))
+            )
+
+    def delete_progress(self, file_hash: str) -> bool:
+        """删除进度记录"""
+        return self._delete('progress', file_hash)
+
+    def all_progress(self) -> List[dict]:
+        """获取所有进度记录"""
+        return self._query('SELECT data FROM progress')
+
+    def get_bookmarks(self, file_hash: str) -> Optional[dict]:
+        """按文件指纹获取书签集合"""
+        rows = self._query('SELECT data FROM bookmarks WHERE file_hash = ?', (file_hash,))
+        return rows[0] if rows else None
+
+    def find_bookmarks(self, file_path: str) -> List[dict]:
+        """按文件绝对路径查找书签集合（使用索引）"""
+        return self._query('SELECT data FROM bookmarks WHERE file_path = ?', (file_path,))
+
+    def put_bookmarks(self, data: dict) -> None:
+        """保存书签集合"""
+        with self._lock, self._conn:
+            self._put_bookmarks(data)
+
+    def delete_bookmarks(self, file_hash: str) -> bool:
+        """删除书签集合"""
+        return self._delete('bookmarks', file_hash)
+
+    def all_bookmarks(self) -> List[dict]:
+        """获取所有书签集合"""
+        return self._query('SELECT data FROM bookmarks')
+
+    def lock_bookmarks(self) -> ContextManager:
+        """书签读-改-写期间持有的跨进程锁"""
+        return file_lock(self.config.bookmarks_lock_file)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
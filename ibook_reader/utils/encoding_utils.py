@@ -0,0 +1,274 @@
+"""文本编码检测与解码工具模块"""
+
+import codecs
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+
+# 编码检测的默认采样大小（字节）
+DEFAULT_SAMPLE_SIZE = 64 * 1024
+
+# 流式解码的默认分块大小（字节）
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# 每次送入 chardet 的字节数
+DETECTOR_FEED_SIZE = 4096
+
+# chardet 结果的最低可信度
+MIN_CONFIDENCE = 0.7
+
+# 默认的备选编码列表（按优先级）
+DEFAULT_FALLBACK_ENCODINGS = ('utf-8', 'gbk', 'gb2312', 'gb18030', 'big5', 'latin1')
+
+# BOM 与对应编码（UTF-32 LE 的 BOM 以 UTF-16 LE 的 BOM 开头，需先判断）
+BOM_ENCODINGS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+@dataclass
+class EncodingInfo:
+    """编码检测结果"""
+    encoding: str                    # 编码名称
+    confidence: float                # 可信度（0-1）
+    method: str                      # 检测方式：bom / utf-8 / chardet / fallback
+
+    def to_metadata(self) -> dict:
+        """转换为文档元数据字段"""
+        return {
+            'encoding': self.encoding,
+            'encoding_method': self.method,
+            'encoding_confidence': f"{self.confidence:.2f}"
+        }
+
+
+def detect_encoding(sample: bytes) -> EncodingInfo:
+    """
+    检测字节内容的编码
+
+    依次检查 BOM、严格 UTF-8 校验，最后才使用 chardet 的增量检测器，
+    一旦检测器得出结论就停止送入数据。
+
+    Args:
+        sample: 文件开头的采样字节
+
+    Returns:
+        编码检测结果
+    """
+    # 1. BOM
+    for bom, encoding in BOM_ENCODINGS:
+        if sample.startswith(bom):
+            return EncodingInfo(encoding, 1.0, 'bom')
+
+    # 2. 严格 UTF-8 校验（采样末尾可能截断多字节字符，不视为错误）
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return EncodingInfo('utf-8', 1.0, 'utf-8')
+    except UnicodeDecodeError:
+        pass
+
+    # 3. chardet 增量检测
+    try:
+        from chardet import UniversalDetector
+    except ImportError:
+        from chardet.universaldetector import UniversalDetector
+
+    detector = UniversalDetector()
+    for offset in range(0, len(sample), DETECTOR_FEED_SIZE):
+        detector.feed(sample[offset:offset + DETECTOR_FEED_SIZE])
+        if detector.done:
+            break
+    detector.close()
+
+    encoding = detector.result.get('encoding')
+    confidence = detector.result.get('confidence') or 0.0
+    if encoding:
+        return EncodingInfo(encoding.lower(), confidence, 'chardet')
+
+    return EncodingInfo(DEFAULT_FALLBACK_ENCODINGS[0], 0.0, 'fallback')
+
+
+def detect_file_encoding(file_path: Path, sample_size: int = DEFAULT_SAMPLE_SIZE) -> EncodingInfo:
+    """
+    检测文件编码（只读取开头的采样）
+
+    Args:
+        file_path: 文件路径
+        sample_size: 采样大小（字节）
+
+    Returns:
+        编码检测结果
+    """
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_size)
+    return detect_encoding(sample)
+
+
+def candidate_encodings(
+    info: EncodingInfo,
+    fallback_encodings: Sequence[str] = DEFAULT_FALLBACK_ENCODINGS
+) -> List[str]:
+    """
+    根据检测结果生成候选编码列表
+
+    Args:
+        info: 编码检测结果
+        fallback_encodings: 备选编码列表
+
+    Returns:
+        按优先级排列的候选编码
+    """
+    candidates = []
+
+    # chardet 结果可信度较低时不优先使用
+    if info.method != 'chardet' or info.confidence > MIN_CONFIDENCE:
+        candidates.append(info.encoding)
+
+    for encoding in fallback_encodings:
+        if encoding not in candidates:
+            candidates.append(encoding)
+
+    return candidates
+
+
+def select_encoding(sample: bytes, candidates: Sequence[str]) -> Optional[str]:
+    """
+    选出第一个能严格解码采样内容的候选编码
+
+    Args:
+        sample: 文件开头的采样字节
+        candidates: 按优先级排列的候选编码
+
+    Returns:
+        编码名称，均无法解码时返回None
+    """
+    for encoding in candidates:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+        except (LookupError, UnicodeDecodeError):
+            continue
+        return encoding
+    return None
+
+
+def decode_file(
+    file_path: Path,
+    encoding: str,
+    errors: str = 'strict',
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    hasher=None
+) -> str:
+    """
+    按块增量解码文件，同时统一换行符并去除BOM
+
+    Args:
+        file_path: 文件路径
+        encoding: 文件编码
+        errors: 解码错误处理方式
+        chunk_size: 分块大小（字节）
+        hasher: 可选的 IngestHash，读取的每一块同时送入其中计算文件指纹
+
+    Returns:
+        解码后的文本（换行符统一为 \\n）
+
+    Raises:
+        UnicodeDecodeError: 文件内容不符合该编码
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+    parts = []
+    pending_cr = False
+
+    if hasher is not None:
+        hasher.begin()
+
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if hasher is not None:
+                hasher.update(chunk)
+            text = decoder.decode(chunk, final=not chunk)
+
+            if pending_cr:
+                text = '\r' + text
+
+            # 块末尾的 \r 可能与下一块开头的 \n 组成 \r\n，留到下一块处理
+            pending_cr = bool(chunk) and text.endswith('\r')
+            if pending_cr:
+                text = text[:-1]
+
+            if text:
+                parts.append(text.replace('\r\n', '\n').replace('\r', '\n'))
+
+            if not chunk:
+                break
+
+    if hasher is not None:
+        hasher.end()
+
+    content = ''.join(parts)
+
+    # 去除BOM
+    if content.startswith('\ufeff'):
+        content = content[1:]
+
+    return content
+
+
+def read_text_file(
+    file_path: Path,
+    fallback_encodings: Sequence[str] = DEFAULT_FALLBACK_ENCODINGS,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    hasher=None
+) -> Tuple[str, EncodingInfo]:
+    """
+    读取文本文件，自动检测编码
+
+    只对文件开头的采样检测编码，然后流式解码整个文件；
+    解码失败时依次尝试备选编码。
+
+    Args:
+        file_path: 文件路径
+        fallback_encodings: 备选编码列表
+        sample_size: 编码检测采样大小（字节）
+        chunk_size: 流式解码分块大小（字节）
+        hasher: 可选的 IngestHash，解码时同时计算文件指纹（只有完整读完的一遍有效）
+
+    Returns:
+        (文件内容, 编码检测结果) 元组
+    """
+    info = detect_file_encoding(file_path, sample_size)
+    candidates = candidate_encodings(info, fallback_encodings)
+    tried = set()
+
+    while candidates:
+        encoding = candidates.pop(0)
+        if encoding in tried:
+            continue
+        tried.add(encoding)
+
+        try:
+            content = decode_file(file_path, encoding, chunk_size=chunk_size, hasher=hasher)
+        except LookupError:
+            continue
+        except UnicodeDecodeError as e:
+            # 采样之后才出现不符合的内容时，对出错位置重新检测
+            if info.method != 'chardet':
+                retry = detect_encoding(e.object[e.start:e.start + sample_size])
+                if retry.method == 'chardet' and retry.confidence > MIN_CONFIDENCE:
+                    info = retry
+                    candidates.insert(0, retry.encoding)
+            continue
+
+        if encoding != info.encoding:
+            info = EncodingInfo(encoding, 0.0, 'fallback')
+        return content, info
+
+    # 最后使用 UTF-8 并忽略错误
+    content = decode_file(file_path, 'utf-8', errors='ignore', chunk_size=chunk_size, hasher=hasher)
+    return content, EncodingInfo('utf-8', 0.0, 'fallback')
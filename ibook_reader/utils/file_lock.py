@@ -0,0 +1,71 @@
+"""跨进程文件锁（fcntl 建议锁）"""
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Set
+
+try:
+    import fcntl
+except ImportError:
+    # Windows 没有 fcntl，退化为只在进程内互斥
+    fcntl = None
+
+from .file_utils import ensure_dir
+
+
+# 当前线程已持有的锁文件
+_held = threading.local()
+
+# 进程内各锁文件对应的线程锁：同一进程的线程先在此排队，再竞争文件锁
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(key: str) -> threading.Lock:
+    """获取锁文件对应的进程内线程锁"""
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(key, threading.Lock())
+
+
+@contextmanager
+def file_lock(lock_path: Path) -> Iterator[None]:
+    """
+    持有锁文件上的排他锁
+
+    锁文件与数据文件分开，数据文件仍通过原子重命名替换，因此读取方无需加锁，
+    不会被写入方阻塞。同一线程可重入。
+
+    Args:
+        lock_path: 锁文件路径
+
+    Yields:
+        None
+    """
+    key = str(lock_path)
+    held: Set[str] = getattr(_held, 'locks', None)
+    if held is None:
+        held = _held.locks = set()
+
+    # 同一线程重入
+    if key in held:
+        yield
+        return
+
+    thread_lock = _thread_lock(key)
+    with thread_lock:
+        ensure_dir(lock_path.parent)
+        fd = os.open(key, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            held.add(key)
+            try:
+                yield
+            finally:
+                held.discard(key)
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
@@ -1,6 +1,5 @@
 """文件操作工具模块"""
 
-import hashlib
 import json
 import os
 import shutil
@@ -38,23 +37,81 @@ def ensure_dir(path: Path) -> None:
             pass
 
 
-def atomic_write(file_path: Path, content: str, backup: bool = True) -> None:
+# 写入持久性策略
+DURABILITY_FAST = 'fast'            # 不备份、不 fsync（可重建的缓存数据）
+DURABILITY_SAFE = 'safe'            # fsync 临时文件和目录后再重命名，不备份
+DURABILITY_PARANOID = 'paranoid'    # 同 safe，并保留轮转备份
+DURABILITY_MODES = (DURABILITY_FAST, DURABILITY_SAFE, DURABILITY_PARANOID)
+
+# paranoid 模式保留的备份数（.bak、.bak.1、.bak.2 ...）
+BACKUP_COUNT = 3
+
+
+def _fsync_dir(path: Path) -> None:
+    """同步目录项，使重命名在掉电后仍然有效（不支持的平台忽略）"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _rotate_backups(file_path: Path, count: int = BACKUP_COUNT) -> None:
+    """
+    轮转备份文件，并把当前文件保存为 .bak
+    
+    优先用硬链接保留旧文件（随后的重命名只替换目录项，不复制数据），
+    不支持硬链接时退回复制。
+    """
+    backup_path = file_path.with_suffix(file_path.suffix + '.bak')
+    
+    # .bak.{n-2} -> .bak.{n-1}, ..., .bak -> .bak.1
+    names = [backup_path] + [
+        backup_path.with_suffix(backup_path.suffix + f'.{i}') for i in range(1, count)
+    ]
+    for older, newer in reversed(list(zip(names, names[1:]))):
+        if older.exists():
+            os.replace(older, newer)
+    
+    if backup_path.exists():
+        backup_path.unlink()
+    try:
+        os.link(file_path, backup_path)
+    except OSError:
+        shutil.copy2(file_path, backup_path)
+
+
+def atomic_write(
+    file_path: Path,
+    content: str,
+    backup: bool = True,
+    durability: Optional[str] = None
+) -> None:
     """
     原子写入文件（先写入临时文件，再重命名）
     
     Args:
         file_path: 目标文件路径
         content: 要写入的内容
-        backup: 是否备份原文件
+        backup: 是否备份原文件（未指定 durability 时，True 等同 paranoid，False 等同 fast）
+        durability: 持久性策略：fast、safe 或 paranoid
+        
+    Raises:
+        ValueError: 未知的持久性策略
     """
+    if durability is None:
+        durability = DURABILITY_PARANOID if backup else DURABILITY_FAST
+    if durability not in DURABILITY_MODES:
+        raise ValueError(f"未知的持久性策略: {durability}")
+    
     # 确保父目录存在
     ensure_dir(file_path.parent)
     
-    # 如果需要备份且原文件存在
-    if backup and file_path.exists():
-        backup_path = file_path.with_suffix(file_path.suffix + '.bak')
-        shutil.copy2(file_path, backup_path)
-    
     # 创建临时文件
     fd, temp_path = tempfile.mkstemp(
         dir=file_path.parent,
@@ -66,37 +123,56 @@ def atomic_write(file_path: Path, content: str, backup: bool = True) -> None:
         # 写入临时文件
         with os.fdopen(fd, 'w', encoding='utf-8') as f:
             f.write(content)
+            if durability != DURABILITY_FAST:
+                f.flush()
+                os.fsync(f.fileno())
+        
+        # 备份原文件
+        if durability == DURABILITY_PARANOID and file_path.exists():
+            _rotate_backups(file_path)
         
         # 原子替换
-        shutil.move(temp_path, file_path)
+        os.replace(temp_path, file_path)
     except Exception:
         # 清理临时文件
         if os.path.exists(temp_path):
             os.remove(temp_path)
         raise
+    
+    if durability != DURABILITY_FAST:
+        _fsync_dir(file_path.parent)
 
 
-def get_file_hash(file_path: Path) -> str:
+def get_file_hash(
+    file_path: Path,
+    scheme: str = 'md5',
+    cache: Optional['FingerprintCache'] = None
+) -> str:
     """
-    计算文件的MD5哈希值
+    计算文件指纹
+    
+    结果按文件状态 (st_dev, st_ino, st_size, st_mtime_ns) 缓存，
+    文件未变化时不会重新读取文件。
     
     Args:
         file_path: 文件路径
+        scheme: 指纹方案，'md5' 为全文 MD5，'sampled' 为抽样 BLAKE2b
+        cache: 指纹缓存，默认使用共享应用上下文的缓存
         
     Returns:
-        MD5哈希值（十六进制字符串）
+        指纹（十六进制字符串）
+        
+    Raises:
+        ValueError: 未知的指纹方案
     """
     if not file_path.exists():
         raise FileNotFoundError(f"文件不存在: {file_path}")
     
-    md5_hash = hashlib.md5()
-    
-    # 分块读取大文件
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
-            md5_hash.update(chunk)
+    from .fingerprint import SCHEMES, get_fingerprint_cache
+    if scheme not in SCHEMES:
+        raise ValueError(f"未知的指纹方案: {scheme}")
     
-    return md5_hash.hexdigest()
+    return (cache or get_fingerprint_cache()).get_hash(file_path, scheme, SCHEMES[scheme])
 
 
 def read_json_file(file_path: Path, default: Any = None) -> Any:
@@ -120,7 +196,12 @@ def read_json_file(file_path: Path, default: Any = None) -> Any:
         return default
 
 
-def write_json_file(file_path: Path, data: Any, backup: bool = True) -> None:
+def write_json_file(
+    file_path: Path,
+    data: Any,
+    backup: bool = True,
+    durability: Optional[str] = None
+) -> None:
     """
     写入JSON文件
     
@@ -128,9 +209,10 @@ def write_json_file(file_path: Path, data: Any, backup: bool = True) -> None:
         file_path: 文件路径
         data: 要写入的数据
         backup: 是否备份原文件
+        durability: 持久性策略（见 atomic_write）
     """
     content = json.dumps(data, ensure_ascii=False, indent=2)
-    atomic_write(file_path, content, backup=backup)
+    atomic_write(file_path, content, backup=backup, durability=durability)
 
 
 def get_file_size(file_path: Path) -> int:
@@ -0,0 +1,383 @@
+"""文件指纹缓存模块"""
+
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from .file_lock import file_lock
+from .file_utils import read_json_file, write_json_file
+
+
+def compute_md5(file_path: Path) -> str:
+    """
+    计算文件的MD5哈希值（读取整个文件）
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        MD5哈希值（十六进制字符串）
+    """
+    md5_hash = hashlib.md5()
+
+    # 分块读取大文件
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            md5_hash.update(chunk)
+
+    return md5_hash.hexdigest()
+
+
+def compute_sampled(file_path: Path, block_size: int = 64 * 1024) -> str:
+    """
+    计算文件的抽样指纹：文件大小加头部、中部、尾部各一块数据的 BLAKE2b 摘要
+
+    耗时与文件大小无关；小文件（不超过三块）读取全部内容。
+
+    Args:
+        file_path: 文件路径
+        block_size: 每块的字节数
+
+    Returns:
+        摘要（32 位十六进制字符串）
+    """
+    digest = hashlib.blake2b(digest_size=16, person=b'ibook-sampled')
+
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        digest.update(size.to_bytes(8, 'little'))
+
+        if size <= block_size * 3:
+            digest.update(f.read())
+        else:
+            for offset in (0, (size - block_size) // 2, size - block_size):
+                f.seek(offset)
+                digest.update(f.read(block_size))
+
+    return digest.hexdigest()
+
+
+# 指纹方案 -> 计算函数
+SCHEMES: Dict[str, Callable[[Path], str]] = {
+    'md5': compute_md5,
+    'sampled': compute_sampled,
+}
+
+# 默认指纹方案（历史数据均为 MD5）
+DEFAULT_SCHEME = 'md5'
+
+# 可在顺序读取文件的同时计算的指纹方案
+STREAMING_SCHEMES: Dict[str, Callable] = {
+    'md5': hashlib.md5,
+}
+
+
+def stat_key(stat: os.stat_result) -> str:
+    """
+    由文件状态生成缓存键 (st_dev, st_ino, st_size, st_mtime_ns)
+
+    Args:
+        stat: os.stat 的结果
+
+    Returns:
+        缓存键
+    """
+    return f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class FileFingerprint:
+    """
+    单个文件在各指纹方案下的摘要（按需计算）
+
+    用于匹配以不同方案保存的历史记录：只有遇到某方案的记录时才计算该方案的摘要。
+    """
+
+    def __init__(
+        self,
+        file_path: Path,
+        scheme: str = DEFAULT_SCHEME,
+        cache: Optional['FingerprintCache'] = None
+    ):
+        """
+        初始化文件指纹
+
+        Args:
+            file_path: 文件路径
+            scheme: 当前使用的指纹方案
+            cache: 指纹缓存，默认使用共享应用上下文的缓存
+        """
+        self.file_path = file_path
+        self.scheme = scheme
+        self.cache = cache
+        self._digests: Dict[str, str] = {}
+
+    def get(self, scheme: str) -> str:
+        """
+        获取指定方案的摘要
+
+        Args:
+            scheme: 指纹方案
+
+        Returns:
+            摘要
+        """
+        if scheme not in self._digests:
+            from .file_utils import get_file_hash
+            self._digests[scheme] = get_file_hash(self.file_path, scheme, self.cache)
+        return self._digests[scheme]
+
+    @property
+    def digest(self) -> str:
+        """当前方案的摘要"""
+        return self.get(self.scheme)
+
+    def matches(self, file_hash: str, scheme: Optional[str] = None) -> bool:
+        """
+        判断记录中的摘要是否属于该文件
+
+        Args:
+            file_hash: 记录中的摘要
+            scheme: 记录的指纹方案（缺省为 MD5）
+
+        Returns:
+            是否匹配
+        """
+        scheme = scheme or DEFAULT_SCHEME
+        if scheme not in SCHEMES:
+            return False
+        return self.get(scheme) == file_hash
+
+
+class FingerprintCache:
+    """
+    文件指纹缓存
+
+    以文件的设备号、inode、大小和修改时间为键保存已计算的摘要，
+    文件状态不变时直接返回缓存结果，避免反复读取整个文件。
+    缓存同时保存在内存和配置目录下的 JSON 文件中，写入时在锁文件保护下
+    与其他进程写入的条目合并。
+    """
+
+    # 持久化保存的最大条目数
+    MAX_ENTRIES = 2000
+
+    # 修改时间距今不足该秒数的文件不缓存（同一时间戳内可能再次被修改）
+    RACY_SECONDS = 2.0
+
+    def __init__(self, store_file: Optional[Path] = None, lock_file: Optional[Path] = None):
+        """
+        初始化指纹缓存
+
+        Args:
+            store_file: 持久化文件路径，None 表示只在内存中缓存
+            lock_file: 写入时持有的锁文件，默认为 store_file 加 .lock 后缀
+        """
+        self.store_file = store_file
+        if lock_file is None and store_file is not None:
+            lock_file = store_file.with_name(store_file.name + '.lock')
+        self.lock_file = lock_file
+        self._entries: Optional[Dict[str, dict]] = None
+
+    def _read(self) -> Dict[str, dict]:
+        """读取持久化文件中的条目"""
+        data = read_json_file(self.store_file, default={}) if self.store_file else {}
+        return data if isinstance(data, dict) else {}
+
+    def _load(self) -> Dict[str, dict]:
+        """加载缓存条目"""
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _save(self) -> None:
+        """合并其他进程写入的条目后保存（淘汰最久未使用的条目）"""
+        if not self.store_file:
+            return
+
+        # 缓存写入失败不影响使用
+        try:
+            with file_lock(self.lock_file):
+                entries = self._read()
+                for key, entry in self._load().items():
+                    merged = entries.setdefault(key, {})
+                    used = max(merged.get('used', 0), entry.get('used', 0))
+                    merged.update(entry)
+                    merged['used'] = used
+
+                if len(entries) > self.MAX_ENTRIES:
+                    keep = sorted(entries, key=lambda key: entries[key].get('used', 0))[-self.MAX_ENTRIES:]
+                    entries = {key: entries[key] for key in keep}
+
+                write_json_file(self.store_file, entries, backup=False)
+        except OSError:
+            return
+
+        self._entries = entries
+
+    def lookup(self, stat: os.stat_result, scheme: str = 'md5') -> Optional[str]:
+        """
+        查找缓存的摘要
+
+        Args:
+            stat: 文件状态
+            scheme: 指纹方案
+
+        Returns:
+            摘要，未命中返回None
+        """
+        entry = self._load().get(stat_key(stat))
+        if entry is None:
+            return None
+        return entry.get(scheme)
+
+    def store(self, stat: os.stat_result, scheme: str, digest: str) -> None:
+        """
+        保存摘要
+
+        Args:
+            stat: 计算摘要前获取的文件状态
+            scheme: 指纹方案
+            digest: 摘要
+        """
+        if time.time() - stat.st_mtime < self.RACY_SECONDS:
+            return
+
+        entry = self._load().setdefault(stat_key(stat), {})
+        entry[scheme] = digest
+        entry['used'] = int(time.time())
+        self._save()
+
+    def get_hash(
+        self,
+        file_path: Path,
+        scheme: str = 'md5',
+        compute: Callable[[Path], str] = compute_md5
+    ) -> str:
+        """
+        获取文件摘要，文件状态未变化时使用缓存
+
+        Args:
+            file_path: 文件路径
+            scheme: 指纹方案
+            compute: 缓存未命中时计算摘要的函数
+
+        Returns:
+            摘要（十六进制字符串）
+        """
+        stat = os.stat(file_path)
+
+        digest = self.lookup(stat, scheme)
+        if digest is None:
+            digest = compute(file_path)
+            self.store(stat, scheme, digest)
+
+        return digest
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries = {}
+        if self.store_file:
+            with file_lock(self.lock_file):
+                if self.store_file.exists():
+                    self.store_file.unlink()
+
+
+# 进程内共享的指纹缓存（按持久化文件路径）
+_caches: Dict[str, FingerprintCache] = {}
+
+
+def get_fingerprint_cache(store_file: Optional[Path] = None) -> FingerprintCache:
+    """
+    获取进程内共享的指纹缓存
+
+    Args:
+        store_file: 持久化文件路径（Config.fingerprint_file），默认使用共享应用上下文的配置
+
+    Returns:
+        FingerprintCache实例
+    """
+    if store_file is None:
+        from ..context import AppContext
+        store_file = AppContext.get().config.fingerprint_file
+
+    cache = _caches.get(str(store_file))
+    if cache is None:
+        cache = _caches.setdefault(str(store_file), FingerprintCache(store_file))
+    return cache
+
+
+class IngestHash:
+    """
+    解析时顺带计算的文件指纹
+
+    解析器顺序读取整个文件时把读到的每一块送入该对象，读完后即得到与
+    get_file_hash 相同的摘要，冷启动时文件只需读取一遍。每次 begin()
+    重新开始计算，只有以 end() 结束的完整一遍才有效。
+    """
+
+    def __init__(self, file_path: Path, scheme: str = DEFAULT_SCHEME):
+        """
+        初始化
+
+        Args:
+            file_path: 文件路径
+            scheme: 指纹方案（必须支持流式计算）
+
+        Raises:
+            ValueError: 指纹方案不支持流式计算
+        """
+        if scheme not in STREAMING_SCHEMES:
+            raise ValueError(f"指纹方案不支持流式计算: {scheme}")
+
+        self.file_path = file_path
+        self.scheme = scheme
+        self._stat = os.stat(file_path)
+        self._hash = None
+        self._digest: Optional[str] = None
+
+    def begin(self) -> None:
+        """从文件开头重新开始计算"""
+        self._hash = STREAMING_SCHEMES[self.scheme]()
+        self._digest = None
+
+    def update(self, chunk: bytes) -> None:
+        """送入按顺序读取的一块数据"""
+        if self._hash is not None:
+            self._hash.update(chunk)
+
+    def end(self) -> None:
+        """文件已读到末尾，完成计算"""
+        if self._hash is not None:
+            self._digest = self._hash.hexdigest()
+            self._hash = None
+
+    @property
+    def digest(self) -> Optional[str]:
+        """完整读取后的摘要，未完整读取时为None"""
+        return self._digest
+
+    def publish(self, cache: Optional[FingerprintCache] = None) -> Optional[str]:
+        """
+        将摘要写入指纹缓存，供进度、书签等服务直接使用
+
+        解析期间文件发生变化时摘要作废。
+
+        Args:
+            cache: 指纹缓存，默认使用共享应用上下文的缓存
+
+        Returns:
+            摘要，未完整读取或文件已变化时返回None
+        """
+        if self._digest is None:
+            return None
+
+        try:
+            if stat_key(os.stat(self.file_path)) != stat_key(self._stat):
+                return None
+        except OSError:
+            return None
+
+        (cache or get_fingerprint_cache()).store(self._stat, self.scheme, self._digest)
+        return self._digest
@@ -1,22 +1,19 @@
 """文本处理工具模块"""
 
+import re
 import unicodedata
-from typing import Optional
+from typing import List, Optional, Pattern
 
 
-def get_char_width(char: str) -> int:
-    """
-    获取单个字符的显示宽度
-    
-    Args:
-        char: 单个字符
-        
-    Returns:
-        显示宽度（1或2）
-    """
-    if not char:
-        return 0
-    
+# 基本多文种平面（BMP）码位的显示宽度表，首次使用时构建
+_bmp_width_table: Optional[bytes] = None
+
+# 按显示宽度切分字符串的正则：窄字符段 | 宽字符段 | 单个 BMP 以外的字符
+_width_run_pattern: Optional[Pattern] = None
+
+
+def _unicode_char_width(char: str) -> int:
+    """根据 Unicode East Asian Width 属性计算字符宽度"""
     # 获取Unicode East Asian Width属性
     width = unicodedata.east_asian_width(char)
     
@@ -34,6 +31,69 @@ def get_char_width(char: str) -> int:
         return 1
 
 
+def _get_width_table() -> bytes:
+    """
+    获取 BMP 码位到显示宽度的查找表
+    
+    Returns:
+        下标为码位、值为显示宽度的字节串
+    """
+    global _bmp_width_table
+    
+    if _bmp_width_table is None:
+        _bmp_width_table = bytes(
+            _unicode_char_width(chr(code)) for code in range(0x10000)
+        )
+    
+    return _bmp_width_table
+
+
+def _get_width_run_pattern() -> Pattern:
+    """
+    获取按显示宽度切分字符串的正则（由宽度表生成字符区间）
+    
+    Returns:
+        编译后的正则，分组1匹配窄字符段，分组2匹配宽字符段，分组3匹配 BMP 以外的单个字符
+    """
+    global _width_run_pattern
+    
+    if _width_run_pattern is None:
+        table = _get_width_table()
+        ranges = {1: [], 2: []}
+        start = 0
+        for code in range(1, 0x10001):
+            if code == 0x10000 or table[code] != table[start]:
+                ranges[table[start]].append(f'\\u{start:04x}-\\u{code - 1:04x}')
+                start = code
+        
+        _width_run_pattern = re.compile(
+            f"([{''.join(ranges[1])}]+)|([{''.join(ranges[2])}]+)|(.)",
+            re.DOTALL
+        )
+    
+    return _width_run_pattern
+
+
+def get_char_width(char: str) -> int:
+    """
+    获取单个字符的显示宽度
+    
+    Args:
+        char: 单个字符
+        
+    Returns:
+        显示宽度（1或2）
+    """
+    if not char:
+        return 0
+    
+    code = ord(char[0])
+    if code < 0x10000:
+        return _get_width_table()[code]
+    
+    return _unicode_char_width(char[0])
+
+
 def get_display_width(text: str) -> int:
     """
     计算文本的显示宽度（考虑中文字符）
@@ -44,7 +104,118 @@ def get_display_width(text: str) -> int:
     Returns:
         显示宽度
     """
-    return sum(get_char_width(char) for char in text)
+    # 纯ASCII文本每个字符占1个宽度
+    if text.isascii():
+        return len(text)
+    
+    width = 0
+    for match in _get_width_run_pattern().finditer(text):
+        if match.lastindex == 1:
+            width += match.end() - match.start()
+        elif match.lastindex == 2:
+            width += 2 * (match.end() - match.start())
+        else:
+            width += _unicode_char_width(match.group())
+    
+    return width
+
+
+def wrap_line(text: str, max_width: int) -> List[str]:
+    """
+    按显示宽度对单行文本进行贪心换行
+    
+    按宽度相同的字符段整体处理，纯ASCII或纯宽字符段直接按列数切片，
+    不逐字符计算宽度。结果与逐字符累加宽度的换行方式完全一致。
+    
+    Args:
+        text: 不含换行符的单行文本
+        max_width: 每行最大显示宽度
+        
+    Returns:
+        换行后的文本列表
+    """
+    if not text:
+        return [text]
+    
+    # 纯ASCII快速路径
+    if text.isascii() and max_width >= 1:
+        if len(text) <= max_width:
+            return [text]
+        return [text[i:i + max_width] for i in range(0, len(text), max_width)]
+    
+    # 宽度过小时单个宽字符就可能超宽，逐字符处理
+    if max_width < 2:
+        return _wrap_line_by_char(text, max_width)
+    
+    rows = []
+    row_start = 0
+    row_width = 0
+    
+    for match in _get_width_run_pattern().finditer(text):
+        run_start, run_end = match.span()
+        if match.lastindex == 1:
+            char_width = 1
+        elif match.lastindex == 2:
+            char_width = 2
+        else:
+            char_width = _unicode_char_width(match.group())
+        
+        # 当前行还能放下的字符数
+        fit = (max_width - row_width) // char_width
+        if run_end - run_start <= fit:
+            row_width += (run_end - run_start) * char_width
+            continue
+        
+        pos = run_start + fit
+        rows.append(text[row_start:pos])
+        
+        # 剩余部分按整行切片
+        per_row = max_width // char_width
+        full_rows = (run_end - pos - 1) // per_row
+        rows.extend(text[i:i + per_row] for i in range(pos, pos + full_rows * per_row, per_row))
+        
+        row_start = pos + full_rows * per_row
+        row_width = (run_end - row_start) * char_width
+    
+    rows.append(text[row_start:])
+    return rows
+
+
+def _wrap_line_by_char(text: str, max_width: int) -> List[str]:
+    """
+    逐字符累加宽度进行换行
+    
+    Args:
+        text: 不含换行符的单行文本
+        max_width: 每行最大显示宽度
+        
+    Returns:
+        换行后的文本列表
+    """
+    lines = []
+    current_line = []
+    current_width = 0
+    
+    for char in text:
+        char_width = get_char_width(char)
+        
+        if current_width + char_width > max_width:
+            if current_line:
+                lines.append(''.join(current_line))
+                current_line = [char]
+                current_width = char_width
+            else:
+                # 单个字符就超过宽度，强制添加
+                lines.append(char)
+                current_width = 0
+        else:
+            current_line.append(char)
+            current_width += char_width
+    
+    if current_line:
+        lines.append(''.join(current_line))
+    
+    return lines if lines else [text]
 
 
 def truncate_text(text: str, max_width: int, suffix: str = '...') -> str:
@@ -0,0 +1,85 @@
+"""集成测试 - 启动耗时预算"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+# 项目根目录
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# 打开小 TXT 文件到显示第一页的耗时预算（秒），可通过环境变量调整
+STARTUP_BUDGET = float(os.environ.get('IBOOK_STARTUP_BUDGET', '1.0'))
+
+# 打开 TXT 时不应导入的重量级模块
+HEAVY_MODULES = ('numpy', 'lxml', 'ebooklib', 'bs4', 'chardet', 'mobi', 'multiprocessing')
+
+# 在子进程中执行：以命令行入口打开 TXT 并输出到管道（包含身份验证、文档缓存、
+# 应用上下文与存储、进度保存），耗时与已导入的重量级模块写到 stderr
+FIRST_PAGE_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+heavy = sys.argv[2].split(',')
+from ibook_reader.cli import main
+sys.argv = ['ibook', sys.argv[1]]
+code = main()
+sys.stdout.flush()
+print(time.perf_counter() - start, file=sys.stderr)
+print(','.join(name for name in heavy if name in sys.modules), file=sys.stderr)
+sys.exit(code)
+'''
+
+
+def _run_python(args, tmp_path):
+    """在干净的子进程中运行 Python"""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT), HOME=str(tmp_path))
+    return subprocess.run(
+        [sys.executable, *args],
+        capture_output=True, text=True, env=env, cwd=str(tmp_path), timeout=60
+    )
+
+
+class TestStartup:
+    """启动耗时测试"""
+
+    @pytest.fixture
+    def small_txt(self, tmp_path):
+        """创建小 TXT 文件"""
+        file_path = tmp_path / 'small.txt'
+        file_path.write_text('第一章 开始\n这是一个很小的测试文档。\n' * 20, encoding='utf-8')
+        return file_path
+
+    def test_time_to_first_page(self, small_txt, tmp_path):
+        """测试命令行打开小 TXT 并输出的耗时在预算内，且不导入重量级依赖"""
+        result = _run_python(['-c', FIRST_PAGE_SCRIPT, str(small_txt), ','.join(HEAVY_MODULES)], tmp_path)
+        assert result.returncode == 0, result.stderr
+
+        elapsed, loaded = result.stderr.splitlines()[-2:]
+
+        assert '这是一个很小的测试文档。' in result.stdout
+        assert loaded == ''
+        assert float(elapsed) < STARTUP_BUDGET
+
+        # 经过了文档缓存
+        assert list((tmp_path / '.ibook_reader' / 'cache').glob('*.json'))
+
+    def test_import_time_excludes_parsers(self, tmp_path):
+        """测试 -X importtime 下命令行入口不导入格式解析器"""
+        result = _run_python(['-X', 'importtime', '-c', 'import ibook_reader.cli'], tmp_path)
+        assert result.returncode == 0, result.stderr
+
+        imported = {
+            line.split('|')[-1].strip()
+            for line in result.stderr.splitlines()
+            if line.startswith('import time:')
+        }
+
+        assert not imported & {
+            'ibook_reader.parsers.epub_parser',
+            'ibook_reader.parsers.mobi_parser',
+            'ibook_reader.parsers.txt_parser',
+            *HEAVY_MODULES
+        }
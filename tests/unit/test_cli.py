@@ -0,0 +1,67 @@
+"""测试命令行输出"""
+
+import pytest
+
+from ibook_reader import cli
+from ibook_reader.config import Config
+from ibook_reader.context import AppContext
+from ibook_reader.core.paginator import Paginator
+from ibook_reader.parsers.mapped_text import MappedTextFile
+from ibook_reader.parsers.txt_parser import TxtParser
+from ibook_reader.services.progress_service import ProgressService
+
+
+@pytest.fixture
+def temp_context(tmp_path, monkeypatch):
+    """使用临时配置目录的应用上下文"""
+    config = Config()
+    config.config_dir = tmp_path / 'config'
+    config.config_file = config.config_dir / 'config.json'
+    config.progress_file = config.config_dir / 'progress.json'
+    config.bookmarks_dir = config.config_dir / 'bookmarks'
+    config._ensure_directories()
+    context = AppContext(config)
+    monkeypatch.setattr(AppContext, '_instance', context)
+    yield context
+    context.close()
+
+
+class TestPipeOutput:
+    """管道输出测试类"""
+
+    def test_segmented_document_prints_title_once(self, temp_context, tmp_path, monkeypatch, capsys):
+        """测试分段加载的大 TXT 只在开头输出一次标题"""
+        monkeypatch.setattr(TxtParser, 'LAZY_THRESHOLD_MB', 0)
+        monkeypatch.setattr(MappedTextFile, 'SEGMENT_SIZE', 64)
+        lines = [f'第{i}行内容' for i in range(100)]
+        file_path = tmp_path / 'big.txt'
+        file_path.write_text('\n'.join(lines), encoding='utf-8')
+        document = TxtParser(file_path).parse()
+        assert document.total_chapters > 1
+
+        assert cli.output_with_jump(document, file_path, {'page': 1}) == 0
+
+        output = capsys.readouterr().out.split('\n')
+        assert output[:2] == ['big', '']
+        assert output.count('big') == 1
+        assert [line for line in output[2:] if line] == lines
+
+    def test_page_limit_does_not_paginate_whole_document(self, temp_context, tmp_path, monkeypatch, capsys):
+        """测试输出指定页数后保存进度时不对整个文档分页"""
+        file_path = tmp_path / 'book.txt'
+        file_path.write_text(
+            ''.join(f'第{i + 1}章 标题\n' + '内容\n' * 100 for i in range(10)), encoding='utf-8'
+        )
+        document = TxtParser(file_path).parse()
+
+        def fail_total(self):
+            raise AssertionError("不应计算精确总页数")
+        monkeypatch.setattr(Paginator, 'get_total_pages', fail_total)
+        monkeypatch.setattr(Paginator, 'paginate', fail_total)
+
+        assert cli.output_with_jump(document, file_path, {'chapter': 1, 'pages': 2}) == 0
+        capsys.readouterr()
+
+        progress = ProgressService().load_progress(file_path)
+        assert progress.current_chapter == 1
+        assert progress.total_pages > progress.current_page
@@ -54,6 +54,19 @@ class TestConfig:
         assert loaded_config['version'] == "1.0"
         assert 'updated_at' in loaded_config
     
+    def test_durability_defaults_and_override(self, temp_config):
+        """测试各类文件的持久性策略默认值及覆盖"""
+        assert temp_config.get_durability('config') == 'paranoid'
+        assert temp_config.get_durability('progress') == 'safe'
+        assert temp_config.get_durability('bookmarks') == 'safe'
+        
+        temp_config.save_config({})
+        temp_config.save_config({'durability': {'progress': 'fast', 'bookmarks': 'bogus'}})
+        
+        assert temp_config.get_durability('progress') == 'fast'
+        assert temp_config.get_durability('bookmarks') == 'safe'
+        assert temp_config.config_file.with_suffix('.json.bak').exists()
+    
     def test_has_password_false(self, temp_config):
         """测试未设置密码"""
         assert temp_config.has_password() is False
@@ -124,3 +137,89 @@ class TestConfig:
         assert temp_config.bookmarks_dir.exists()
         assert not temp_config.config_file.exists()
         assert not bookmark_file.exists()
+
+
+class TestConfigCache:
+    """配置缓存测试"""
+    
+    @pytest.fixture
+    def temp_config(self, tmp_path):
+        """创建临时配置目录"""
+        config = Config()
+        config.config_dir = tmp_path
+        config.config_file = tmp_path / 'config.json'
+        config.progress_file = tmp_path / 'progress.json'
+        config.bookmarks_dir = tmp_path / 'bookmarks'
+        config._ensure_directories()
+        return config
+    
+    def test_load_reads_file_once(self, temp_config, monkeypatch):
+        """测试配置文件未变化时不重复读取"""
+        import ibook_reader.config as config_module
+        
+        temp_config.save_config({'password_hash': 'h', 'salt': 's'})
+        calls = []
+        original = config_module.read_json_file
+        monkeypatch.setattr(config_module, 'read_json_file',
+                            lambda *args, **kwargs: calls.append(args) or original(*args, **kwargs))
+        
+        other = Config()
+        other.config_file = temp_config.config_file
+        assert temp_config.has_password() is True
+        assert other.get_password_info() == ('h', 's')
+        assert temp_config.get_fingerprint_scheme() == 'md5'
+        assert calls == []
+    
+    def test_reload_after_external_change(self, temp_config):
+        """测试其他进程修改配置文件后重新读取"""
+        import json
+        
+        assert temp_config.has_password() is False
+        temp_config.config_file.write_text(
+            json.dumps({'password_hash': 'h', 'salt': 's'}), encoding='utf-8'
+        )
+        
+        assert temp_config.has_password() is True
+    
+    def test_returned_config_is_a_copy(self, temp_config):
+        """测试修改返回的配置字典不影响缓存"""
+        temp_config.load_config()['password_hash'] = 'changed'
+        
+        assert temp_config.load_config()['password_hash'] is None
+    
+    def test_directories_ensured_once(self, temp_config, monkeypatch):
+        """测试同一进程内目录只检查一次"""
+        import ibook_reader.config as config_module
+        
+        calls = []
+        monkeypatch.setattr(config_module, 'ensure_dir', calls.append)
+        temp_config._ensure_directories()
+        
+        assert calls == []
+
+
+class TestAppContext:
+    """应用上下文测试"""
+    
+    def test_services_share_context(self, monkeypatch, tmp_path):
+        """测试未指定配置的服务共用同一配置与存储"""
+        from ibook_reader.context import AppContext
+        from ibook_reader.services import AuthService, BookmarkService, ProgressService
+        
+        config = Config()
+        config.config_dir = tmp_path
+        config.config_file = tmp_path / 'config.json'
+        config.progress_file = tmp_path / 'progress.json'
+        config.bookmarks_dir = tmp_path / 'bookmarks'
+        config._ensure_directories()
+        monkeypatch.setattr(AppContext, '_instance', AppContext(config))
+        
+        progress_service = ProgressService()
+        bookmark_service = BookmarkService()
+        
+        assert AuthService().config is config
+        assert progress_service.config is config
+        assert progress_service.store is bookmark_service.store
+        
+        AppContext.reset()
+        assert AppContext._instance is None
@@ -0,0 +1,76 @@
+"""测试编码检测工具"""
+
+import codecs
+
+import chardet
+
+from ibook_reader.utils.encoding_utils import (
+    EncodingInfo,
+    detect_encoding,
+    candidate_encodings,
+    read_text_file
+)
+
+
+class TestDetectEncoding:
+    """编码检测测试"""
+    
+    def test_bom(self):
+        """测试根据BOM识别编码"""
+        assert detect_encoding(codecs.BOM_UTF8 + b'abc').encoding == 'utf-8-sig'
+        assert detect_encoding(codecs.BOM_UTF16_LE + 'abc'.encode('utf-16-le')).encoding == 'utf-16'
+        assert detect_encoding(codecs.BOM_UTF32_LE + 'abc'.encode('utf-32-le')).encoding == 'utf-32'
+        assert detect_encoding(codecs.BOM_UTF8).method == 'bom'
+    
+    def test_utf8_skips_chardet(self, monkeypatch):
+        """测试合法UTF-8不调用chardet"""
+        def fail(*args, **kwargs):
+            raise AssertionError('不应调用chardet')
+        monkeypatch.setattr(chardet, 'UniversalDetector', fail)
+        
+        # 采样末尾截断的多字节字符不影响判断
+        sample = '中文内容'.encode('utf-8')[:-1]
+        info = detect_encoding(sample)
+        
+        assert info.encoding == 'utf-8'
+        assert info.method == 'utf-8'
+    
+    def test_non_utf8_uses_chardet(self):
+        """测试非UTF-8内容使用chardet检测"""
+        sample = ('这是一段用于检测的简体中文文本内容。' * 20).encode('gbk')
+        info = detect_encoding(sample)
+        
+        assert info.method == 'chardet'
+        assert sample.decode(info.encoding).startswith('这是一段')
+    
+    def test_candidate_encodings(self):
+        """测试低可信度的chardet结果不优先使用"""
+        low = EncodingInfo('windows-1252', 0.3, 'chardet')
+        high = EncodingInfo('gb18030', 0.9, 'chardet')
+        
+        assert candidate_encodings(low, ['utf-8', 'gbk']) == ['utf-8', 'gbk']
+        assert candidate_encodings(high, ['utf-8', 'gbk']) == ['gb18030', 'utf-8', 'gbk']
+
+
+class TestReadTextFile:
+    """文本文件读取测试"""
+    
+    def test_read_utf16_with_bom(self, tmp_path):
+        """测试读取带BOM的UTF-16文件"""
+        test_file = tmp_path / 'utf16.txt'
+        test_file.write_bytes('第一行\r\n第二行'.encode('utf-16'))
+        
+        content, info = read_text_file(test_file)
+        
+        assert content == '第一行\n第二行'
+        assert info.method == 'bom'
+    
+    def test_read_gbk(self, tmp_path):
+        """测试读取GBK文件"""
+        test_file = tmp_path / 'gbk.txt'
+        test_file.write_bytes('这是GBK编码的文本'.encode('gbk'))
+        
+        content, info = read_text_file(test_file)
+        
+        assert content == '这是GBK编码的文本'
+        assert info.method in ('chardet', 'fallback')
@@ -3,6 +3,7 @@
 import pytest
 import tempfile
 import json
+import os
 from pathlib import Path
 from ibook_reader.utils.file_utils import (
     get_config_dir,
@@ -14,6 +15,7 @@ from ibook_reader.utils.file_utils import (
     get_file_size,
     is_large_file
 )
+from ibook_reader.utils.fingerprint import FingerprintCache, compute_md5, compute_sampled
 
 
 class TestFileUtils:
@@ -76,6 +78,36 @@ class TestFileUtils:
         assert backup_file.exists()
         assert backup_file.read_text(encoding='utf-8') == original_content
     
+    def test_atomic_write_durability_modes(self, tmp_path, monkeypatch):
+        """测试各持久性策略的 fsync 与备份行为"""
+        test_file = tmp_path / 'test.txt'
+        test_file.write_text('原始内容', encoding='utf-8')
+        synced = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(os, 'fsync', lambda fd: (synced.append(fd), real_fsync(fd)))
+        
+        atomic_write(test_file, '快速', durability='fast')
+        assert synced == []
+        
+        atomic_write(test_file, '安全', durability='safe')
+        assert len(synced) == 2  # 临时文件和目录
+        assert not (tmp_path / 'test.txt.bak').exists()
+        
+        with pytest.raises(ValueError):
+            atomic_write(test_file, '内容', durability='unknown')
+    
+    def test_atomic_write_rotating_backups(self, tmp_path):
+        """测试 paranoid 模式保留轮转备份"""
+        test_file = tmp_path / 'test.txt'
+        for i in range(5):
+            atomic_write(test_file, f'版本{i}', durability='paranoid')
+        
+        assert test_file.read_text(encoding='utf-8') == '版本4'
+        assert (tmp_path / 'test.txt.bak').read_text(encoding='utf-8') == '版本3'
+        assert (tmp_path / 'test.txt.bak.1').read_text(encoding='utf-8') == '版本2'
+        assert (tmp_path / 'test.txt.bak.2').read_text(encoding='utf-8') == '版本1'
+        assert not (tmp_path / 'test.txt.bak.3').exists()
+    
     def test_get_file_hash(self, tmp_path):
         """测试计算文件哈希"""
         test_file = tmp_path / 'test.txt'
@@ -197,3 +229,181 @@ class TestFileUtils:
         # 应该是大文件
         assert is_large_file(large_file, threshold_mb=1) is True
         assert is_large_file(large_file, threshold_mb=5) is False
+
+
+class TestFingerprintCache:
+    """文件指纹缓存测试类"""
+    
+    @pytest.fixture
+    def old_file(self, tmp_path):
+        """创建修改时间较早的测试文件"""
+        file_path = tmp_path / 'book.txt'
+        file_path.write_text('指纹测试内容', encoding='utf-8')
+        os.utime(file_path, (1_600_000_000, 1_600_000_000))
+        return file_path
+    
+    def test_cache_hit_skips_rehash(self, tmp_path, old_file):
+        """测试文件未变化时不重新计算摘要"""
+        cache = FingerprintCache(tmp_path / 'fingerprints.json')
+        calls = []
+        
+        def compute(path):
+            calls.append(path)
+            return compute_md5(path)
+        
+        first = cache.get_hash(old_file, compute=compute)
+        second = cache.get_hash(old_file, compute=compute)
+        
+        assert first == second == compute_md5(old_file)
+        assert len(calls) == 1
+    
+    def test_stat_change_invalidates(self, tmp_path, old_file):
+        """测试文件状态变化后重新计算摘要"""
+        cache = FingerprintCache(tmp_path / 'fingerprints.json')
+        first = cache.get_hash(old_file)
+        
+        old_file.write_text('修改后的内容', encoding='utf-8')
+        os.utime(old_file, (1_600_000_100, 1_600_000_100))
+        
+        assert cache.get_hash(old_file) != first
+    
+    def test_persisted_across_instances(self, tmp_path, old_file):
+        """测试缓存持久化到文件"""
+        store_file = tmp_path / 'fingerprints.json'
+        digest = FingerprintCache(store_file).get_hash(old_file)
+        
+        def fail(path):
+            raise AssertionError('不应重新计算')
+        
+        assert FingerprintCache(store_file).get_hash(old_file, compute=fail) == digest
+    
+    def test_concurrent_writers_are_merged(self, tmp_path, old_file):
+        """测试两个实例（如两个进程）先后写入时合并而不是互相覆盖"""
+        store_file = tmp_path / 'fingerprints.json'
+        other_file = tmp_path / 'other.txt'
+        other_file.write_text('另一个文件', encoding='utf-8')
+        os.utime(other_file, (1_600_000_000, 1_600_000_000))
+        
+        first = FingerprintCache(store_file)
+        second = FingerprintCache(store_file)
+        first.lookup(old_file.stat())
+        second.lookup(other_file.stat())
+        
+        first.get_hash(old_file)
+        second.get_hash(other_file)
+        
+        def fail(path):
+            raise AssertionError('不应重新计算')
+        
+        merged = FingerprintCache(store_file)
+        assert merged.get_hash(old_file, compute=fail) == compute_md5(old_file)
+        assert merged.get_hash(other_file, compute=fail) == compute_md5(other_file)
+        assert (tmp_path / 'fingerprints.json.lock').exists()
+    
+    def test_recently_modified_not_cached(self, tmp_path):
+        """测试刚修改的文件不缓存"""
+        cache = FingerprintCache(tmp_path / 'fingerprints.json')
+        file_path = tmp_path / 'fresh.txt'
+        file_path.write_text('内容', encoding='utf-8')
+        
+        cache.get_hash(file_path)
+        
+        assert cache.lookup(file_path.stat()) is None
+
+
+class TestSampledFingerprint:
+    """抽样指纹测试类"""
+    
+    def test_small_file_hashes_whole_content(self, tmp_path):
+        """测试小文件的抽样指纹覆盖全部内容"""
+        file_path = tmp_path / 'small.txt'
+        file_path.write_bytes(b'a' * 1000)
+        first = compute_sampled(file_path, block_size=512)
+        
+        file_path.write_bytes(b'a' * 500 + b'b' + b'a' * 499)
+        
+        assert compute_sampled(file_path, block_size=512) != first
+        assert len(first) == 32
+    
+    def test_large_file_reads_samples_only(self, tmp_path):
+        """测试大文件只读取头、中、尾三块"""
+        file_path = tmp_path / 'large.bin'
+        data = bytearray(b'x' * 10000)
+        file_path.write_bytes(bytes(data))
+        first = compute_sampled(file_path, block_size=100)
+        
+        # 抽样块之外的改动不影响指纹
+        data[2000] = ord('y')
+        file_path.write_bytes(bytes(data))
+        assert compute_sampled(file_path, block_size=100) == first
+        
+        # 中部抽样块内的改动改变指纹
+        data[4960] = ord('y')
+        file_path.write_bytes(bytes(data))
+        assert compute_sampled(file_path, block_size=100) != first
+    
+    def test_size_change_changes_fingerprint(self, tmp_path):
+        """测试文件大小变化改变指纹"""
+        file_path = tmp_path / 'book.txt'
+        file_path.write_bytes(b'z' * 10000)
+        first = compute_sampled(file_path, block_size=100)
+        
+        file_path.write_bytes(b'z' * 10001)
+        
+        assert compute_sampled(file_path, block_size=100) != first
+    
+    def test_get_file_hash_scheme(self, tmp_path):
+        """测试按方案计算文件指纹"""
+        file_path = tmp_path / 'book.txt'
+        file_path.write_text('内容', encoding='utf-8')
+        
+        assert get_file_hash(file_path, 'sampled') == compute_sampled(file_path)
+        assert get_file_hash(file_path, 'md5') == compute_md5(file_path)
+        
+        with pytest.raises(ValueError):
+            get_file_hash(file_path, 'sha1')
+    
+    def test_ingest_hash_requires_complete_pass(self, tmp_path):
+        """测试边读边算的指纹只在完整读取一遍后有效"""
+        from ibook_reader.utils.fingerprint import IngestHash
+        
+        file_path = tmp_path / 'book.txt'
+        file_path.write_bytes(b'ingest' * 100)
+        hasher = IngestHash(file_path)
+        
+        hasher.begin()
+        hasher.update(file_path.read_bytes()[:10])
+        assert hasher.publish(FingerprintCache()) is None
+        
+        hasher.begin()
+        hasher.update(file_path.read_bytes())
+        hasher.end()
+        assert hasher.publish(FingerprintCache()) == compute_md5(file_path)
+
+
+class TestFileLock:
+    """跨进程文件锁测试类"""
+    
+    def test_lock_is_exclusive_and_reentrant(self, tmp_path):
+        """测试持锁期间其他打开者无法加锁，同一线程可重入"""
+        fcntl = pytest.importorskip('fcntl')
+        from ibook_reader.utils.file_lock import file_lock
+        
+        lock_path = tmp_path / 'locks' / 'progress.lock'
+        
+        def try_lock():
+            fd = os.open(lock_path, os.O_RDWR)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                return False
+            finally:
+                os.close(fd)
+        
+        with file_lock(lock_path):
+            with file_lock(lock_path):
+                assert try_lock() is False
+            assert try_lock() is False
+        
+        assert try_lock() is True
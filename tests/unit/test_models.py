@@ -2,7 +2,7 @@
 
 import pytest
 from datetime import datetime
-from ibook_reader.models.document import Document, Chapter
+from ibook_reader.models.document import Document, Chapter, LazyChapter
 from ibook_reader.models.bookmark import Bookmark
 from ibook_reader.models.progress import ReadingProgress
 
@@ -110,6 +110,41 @@ class TestDocument:
         full = doc.full_content
         assert "第一章内容" in full
         assert "第二章内容" in full
+    
+    def test_document_dict_roundtrip(self):
+        """测试文档字典序列化往返"""
+        chapters = [
+            Chapter(0, "第一章", "第一章内容"),
+            Chapter(1, "第二章", "第二章内容", start_position=10)
+        ]
+        doc = Document(
+            title="文档",
+            chapters=chapters,
+            author="作者",
+            metadata={'format': 'txt'}
+        )
+        
+        restored = Document.from_dict(doc.to_dict())
+        
+        assert restored == doc
+        assert restored.chapters[1].start_position == 10
+
+    
+    def test_lazy_chapter_loads_on_access(self):
+        """测试延迟加载章节在访问时才读取内容"""
+        calls = []
+        
+        def loader():
+            calls.append(1)
+            return "延迟内容"
+        
+        chapter = LazyChapter(0, "第一段", loader)
+        doc = Document(title="文档", chapters=[chapter])
+        repr(doc)
+        
+        assert calls == []
+        assert doc.chapters[0].content == "延迟内容"
+        assert len(calls) == 1
 
 
 class TestBookmark:
@@ -357,3 +392,5 @@ class TestReadingProgress:
         assert progress.file_path == "/path/to/book.epub"
         assert progress.current_page == 25
         assert progress.current_chapter == 5
+        assert progress.hash_scheme == 'md5'
+        assert progress.to_dict()['hash_scheme'] == 'md5'
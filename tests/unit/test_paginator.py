@@ -261,3 +261,128 @@ class TestPaginator:
         all_content = '\n'.join(page.content for page in pages)
         assert "中文" in all_content
         assert "English" in all_content
+    
+    def test_lazy_page_matches_paginate(self):
+        """测试按需分页与整体分页结果一致"""
+        chapters = [
+            Chapter(i, f"第{i + 1}章", "\n".join(f"第{i + 1}章第{j}行" * (j % 7 + 1) for j in range(60)) + "\n\n\n")
+            for i in range(5)
+        ]
+        chapters.append(Chapter(5, "空章节", ""))
+        doc = Document("文档", chapters=chapters)
+        
+        expected = Paginator(doc, rows=24, cols=80).paginate()
+        paginator = Paginator(doc, rows=24, cols=80)
+        
+        assert paginator.get_total_pages() == len(expected)
+        for page in reversed(expected):
+            lazy_page = paginator.get_page(page.page_number)
+            assert lazy_page.content == page.content
+            assert lazy_page.chapter_index == page.chapter_index
+        assert paginator.get_page(len(expected) + 1) is None
+        assert paginator.get_page_by_chapter(5) is None
+    
+    def test_estimate_total_pages_does_not_wrap_remaining_chapters(self):
+        """测试估算总页数不为未访问的章节换行，全部索引后与实际总页数相同"""
+        chapters = [Chapter(i, f"第{i + 1}章", "内容\n" * 100) for i in range(10)]
+        doc = Document("文档", chapters=chapters)
+        paginator = Paginator(doc, rows=24, cols=80)
+        
+        paginator.get_page(1)
+        indexed = sum(page_starts is not None for page_starts in paginator._page_index)
+        estimate = paginator.estimate_total_pages()
+        
+        assert indexed == sum(page_starts is not None for page_starts in paginator._page_index)
+        assert indexed < len(chapters)
+        assert estimate == paginator.get_total_pages()
+        assert paginator.estimate_total_pages() == paginator.get_total_pages()
+    
+    def test_get_page_by_chapter_only_paginates_target(self, monkeypatch):
+        """测试章节跳转只为目标章节生成页面内容"""
+        chapters = [Chapter(i, f"第{i + 1}章", "内容\n" * 100) for i in range(10)]
+        doc = Document("文档", chapters=chapters)
+        paginator = Paginator(doc, rows=24, cols=80)
+        
+        paginated = []
+        original = paginator._materialize_page
+        
+        def tracking_materialize(chapter_index, page_offset, page_number):
+            paginated.append(chapter_index)
+            return original(chapter_index, page_offset, page_number)
+        
+        monkeypatch.setattr(paginator, '_materialize_page', tracking_materialize)
+        
+        page = paginator.get_page_by_chapter(8)
+        
+        assert page.chapter_index == 8
+        assert paginated == [8]
+        assert paginator.find_page_position(page.page_number) == (8, 1)
+    
+    def test_large_doc_page_window(self):
+        """测试大文档只保留当前页附近的页面内容"""
+        content = "\n".join(f"第{i}行内容" for i in range(Paginator.SMALL_DOC_THRESHOLD * 2))
+        doc = Document("文档", chapters=[Chapter(0, "章节", content)])
+        paginator = Paginator(doc, rows=24, cols=80)
+        
+        total_pages = paginator.get_total_pages()
+        for page_number in range(1, 30):
+            paginator.get_page(page_number)
+        
+        window = paginator.CACHE_WINDOW
+        assert set(paginator._page_window) <= set(range(29 - window, 30))
+        
+        # 索引已建立，跳页不会重新建立索引
+        paginator._build_chapter_index = None
+        page = paginator.get_page(total_pages)
+        assert page.page_number == total_pages
+        assert set(paginator._page_window) == {total_pages}
+    
+    def test_vector_backend_matches_python(self, monkeypatch):
+        """测试 NumPy 向量化后端与纯 Python 分页结果一致"""
+        pytest.importorskip('numpy')
+        
+        content = "\n".join(
+            ("中文English混排😀" * (i % 9)) + (" " * (i % 50)) + ("\t" if i % 4 else "")
+            for i in range(400)
+        ) + "\n\n\n"
+        doc = Document("文档", chapters=[Chapter(0, "章节", content), Chapter(1, "空", "")])
+        
+        python_paginator = Paginator(doc, rows=24, cols=47)
+        monkeypatch.setattr(python_paginator, 'VECTOR_MIN_CHARS', float('inf'))
+        vector_paginator = Paginator(doc, rows=24, cols=47)
+        monkeypatch.setattr(vector_paginator, 'VECTOR_MIN_CHARS', 0)
+        
+        expected = [(p.content, p.page_number, p.chapter_index) for p in python_paginator.paginate()]
+        actual = [(p.content, p.page_number, p.chapter_index) for p in vector_paginator.paginate()]
+        
+        assert actual == expected
+        assert vector_paginator._build_chapter_index(doc.chapters[0]) == \
+            python_paginator._build_chapter_index(doc.chapters[0])
+    
+    @pytest.mark.parametrize('vector', [False, True])
+    def test_blank_padded_chapter_counts_agree(self, monkeypatch, vector):
+        """测试末尾为整页空行的章节，按需分页与整体分页的页数一致"""
+        if vector:
+            pytest.importorskip('numpy')
+        
+        for blank_lines in range(1, 40):
+            doc = Document("文档", chapters=[Chapter(0, "章节", 'a' + '\n' * blank_lines)])
+            lazy = Paginator(doc, rows=16, cols=80)
+            full = Paginator(doc, rows=16, cols=80)
+            threshold = 0 if vector else float('inf')
+            monkeypatch.setattr(lazy, 'VECTOR_MIN_CHARS', threshold)
+            monkeypatch.setattr(full, 'VECTOR_MIN_CHARS', threshold)
+            
+            total = lazy.get_total_pages()
+            pages = full.paginate()
+            
+            assert total == len(pages), blank_lines
+            assert full.get_total_pages() == total
+            assert lazy.get_page(total).content == pages[-1].content
+    
+    def test_vector_backend_not_selected_by_default(self):
+        """测试默认不使用向量化后端（纯 Python 换行更快）"""
+        doc = Document("文档", chapters=[Chapter(0, "章节", "内容\n" * 500_000)])
+        paginator = Paginator(doc, rows=24, cols=80)
+        
+        assert paginator._use_vector_backend(doc.chapters[0]) is False
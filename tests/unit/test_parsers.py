@@ -9,7 +9,9 @@ from ibook_reader.parsers import (
     MobiParser,
     ParserFactory
 )
-from ibook_reader.models.document import Document
+from ibook_reader.parsers.html_text import html_to_text
+from ibook_reader.parsers.mapped_text import MappedTextFile
+from ibook_reader.models.document import Document, LazyChapter
 
 
 class TestTxtParser:
@@ -29,6 +31,8 @@ class TestTxtParser:
         assert len(doc.chapters) == 1
         assert '测试文档' in doc.chapters[0].content
         assert doc.metadata['format'] == 'txt'
+        assert doc.metadata['encoding'] == 'utf-8'
+        assert doc.metadata['encoding_method'] == 'utf-8'
     
     def test_parse_gbk(self, tmp_path):
         """测试解析GBK编码文本"""
@@ -54,6 +58,19 @@ class TestTxtParser:
         assert not doc.chapters[0].content.startswith('\ufeff')
         assert '带BOM的文本' in doc.chapters[0].content
     
+    def test_parse_metadata(self, tmp_path):
+        """测试只采样获取TXT元数据"""
+        test_file = tmp_path / 'meta.txt'
+        test_file.write_text('第一章 开始\n内容', encoding='utf-8')
+        
+        meta = TxtParser(test_file).parse_metadata()
+        
+        assert meta.title == 'meta'
+        assert meta.format == 'txt'
+        assert meta.file_size == test_file.stat().st_size
+        assert meta.chapter_count is None
+        assert meta.extra['encoding'] == 'utf-8'
+    
     def test_can_parse(self, tmp_path):
         """测试能否解析"""
         txt_file = tmp_path / 'test.txt'
@@ -71,6 +88,118 @@ class TestTxtParser:
         
         with pytest.raises(FileNotFoundError):
             TxtParser(test_file)
+    
+    def test_streaming_newline_normalization(self, tmp_path, monkeypatch):
+        """测试分块解码时跨块的换行符统一"""
+        monkeypatch.setattr(TxtParser, 'CHUNK_SIZE', 3)
+        test_file = tmp_path / 'crlf.txt'
+        test_file.write_bytes('第一行\r\n第二行\r第三行\r\n\r\n末行'.encode('utf-8'))
+        
+        doc = TxtParser(test_file).parse()
+        
+        assert doc.chapters[0].content == '第一行\n第二行\n第三行\n\n末行'
+        assert doc.metadata['encoding'].lower().startswith('utf')
+    
+    def test_streaming_falls_back_when_sample_misleads(self, tmp_path, monkeypatch):
+        """测试采样之后出现非UTF-8内容时回退到其他编码"""
+        monkeypatch.setattr(TxtParser, 'SAMPLE_SIZE', 16)
+        monkeypatch.setattr(TxtParser, 'CHUNK_SIZE', 16)
+        test_file = tmp_path / 'late_gbk.txt'
+        test_file.write_bytes(b'ascii only header line\n' + '后面是GBK编码的中文内容'.encode('gbk'))
+        
+        doc = TxtParser(test_file).parse()
+        
+        assert 'GBK编码的中文内容' in doc.chapters[0].content
+    
+    def test_detect_chapters(self, tmp_path):
+        """测试按章节标题分割TXT"""
+        test_file = tmp_path / 'novel.txt'
+        content = (
+            '作品简介\n\n'
+            '第一章 开端\n　　故事开始了。\n第一章讲的不是标题，这一行是正文内容的一部分而已。\n'
+            '第二回：风起\n　　故事继续。\n'
+            'Chapter 3 The End\n　　结束。'
+        )
+        test_file.write_text(content, encoding='utf-8')
+        
+        doc = TxtParser(test_file).parse()
+        
+        assert [c.title for c in doc.chapters] == ['novel', '第一章 开端', '第二回：风起', 'Chapter 3 The End']
+        assert doc.chapters[1].content.startswith('　　故事开始了。')
+        assert '这一行是正文' in doc.chapters[1].content
+        for chapter in doc.chapters[1:]:
+            assert content[chapter.start_position:].startswith(chapter.title)
+    
+    def test_table_of_contents_not_chapters(self, tmp_path):
+        """测试开头目录中的标题没有正文，不生成空章节"""
+        test_file = tmp_path / 'novel.txt'
+        test_file.write_text(
+            '目录\n第一章 开端\n第二章 风起\n第三章 结局\n\n'
+            '第一章 开端\n　　故事开始了。\n'
+            '第二章 风起\n　　故事继续。\n'
+            '第三章 结局\n　　结束。',
+            encoding='utf-8'
+        )
+        
+        doc = TxtParser(test_file).parse()
+        
+        assert [c.title for c in doc.chapters] == ['novel', '第一章 开端', '第二章 风起', '第三章 结局']
+        assert [c.index for c in doc.chapters] == [0, 1, 2, 3]
+        assert all(c.content.strip() for c in doc.chapters)
+    
+    def test_parallel_heading_scan(self, monkeypatch):
+        """测试分块并行扫描与单次扫描结果一致"""
+        from ibook_reader.parsers import chapter_detector
+        text = ''.join(f'第{i}章 标题\n正文内容{i}\n' for i in range(200))
+        expected = chapter_detector.find_headings(text)
+        
+        monkeypatch.setattr(chapter_detector, 'PARALLEL_MIN_CHARS', 0)
+        monkeypatch.setattr(chapter_detector, 'CHUNK_CHARS', 500)
+        monkeypatch.setattr(chapter_detector.os, 'cpu_count', lambda: 2)
+        
+        assert chapter_detector.find_headings(text) == expected
+        assert len(expected) == 200
+    
+    def test_lazy_mode_segments(self, tmp_path, monkeypatch):
+        """测试大文件以内存映射方式分段延迟加载"""
+        monkeypatch.setattr(TxtParser, 'LAZY_THRESHOLD_MB', 0)
+        monkeypatch.setattr(MappedTextFile, 'SEGMENT_SIZE', 64)
+        lines = [f'第{i}行：内容' for i in range(100)]
+        test_file = tmp_path / 'big.txt'
+        test_file.write_bytes(('\r\n'.join(lines)).encode('gbk'))
+        
+        parser = TxtParser(test_file)
+        doc = parser.parse()
+        
+        assert parser.should_cache() is False
+        assert doc.metadata['lazy'] == 'true'
+        assert all(isinstance(chapter, LazyChapter) for chapter in doc.chapters)
+        assert len(doc.chapters) > 1
+        assert '\n'.join(chapter.content for chapter in doc.chapters) == '\n'.join(lines)
+        
+        # 段不是章节：不显示为章节标题，也不参与章节导航
+        assert doc.is_segmented is True
+        assert doc.navigable_chapters == 1
+        assert {chapter.title for chapter in doc.chapters} == {'big'}
+        
+        # 起始位置为字符位置，与其他解析器一致
+        full_text = '\n'.join(lines)
+        for chapter in doc.chapters:
+            assert full_text[chapter.start_position:].startswith(chapter.content)
+        
+        doc.close()
+        assert doc.resources == []
+    
+    def test_lazy_mode_falls_back_for_utf16(self, tmp_path, monkeypatch):
+        """测试UTF-16文件不使用延迟加载"""
+        monkeypatch.setattr(TxtParser, 'LAZY_THRESHOLD_MB', 0)
+        test_file = tmp_path / 'utf16.txt'
+        test_file.write_bytes('第一行\n第二行'.encode('utf-16'))
+        
+        doc = TxtParser(test_file).parse()
+        
+        assert 'lazy' not in doc.metadata
+        assert doc.chapters[0].content == '第一行\n第二行'
 
 
 class TestMarkdownParser:
@@ -130,6 +259,32 @@ class TestMarkdownParser:
         assert len(doc.chapters) == 1
         assert doc.chapters[0].title == '唯一的章节'
     
+    def test_parse_metadata(self, tmp_path):
+        """测试Markdown元数据的标题与章节数与完整解析一致"""
+        test_file = tmp_path / 'test.md'
+        test_file.write_text(
+            '前言\r\n# 书名\r\n内容\r\n\r\n## 小节\r\n#\r\n单独的井号\r\n# 第二章\r\n内容',
+            encoding='utf-8'
+        )
+        
+        parser = MarkdownParser(test_file)
+        meta = parser.parse_metadata()
+        doc = MarkdownParser(test_file).parse()
+        
+        assert meta.title == doc.title == 'test'
+        assert meta.chapter_count == doc.total_chapters == 2
+    
+    def test_parse_metadata_streams_file(self, tmp_path, monkeypatch):
+        """测试获取元数据时不读入整个文件"""
+        test_file = tmp_path / 'test.md'
+        test_file.write_text('# 第一章\n内容\n', encoding='utf-8')
+        
+        def fail_read(self):
+            raise AssertionError("不应读入整个文件")
+        monkeypatch.setattr(MarkdownParser, '_read_file', fail_read)
+        
+        assert MarkdownParser(test_file).parse_metadata().chapter_count == 1
+    
     def test_can_parse(self, tmp_path):
         """测试能否解析"""
         md_file1 = tmp_path / 'test.md'
@@ -146,6 +301,305 @@ class TestMarkdownParser:
         assert MarkdownParser.can_parse(txt_file) is False
 
 
+def _write_epub(path, chapter_count, image=False):
+    """生成测试用EPUB文件"""
+    from ebooklib import epub
+    
+    book = epub.EpubBook()
+    book.set_identifier('test-book')
+    book.set_title('测试书籍')
+    book.add_author('作者')
+    
+    items = []
+    for i in range(chapter_count):
+        item = epub.EpubHtml(title=f'第{i + 1}章', file_name=f'chap_{i}.xhtml', lang='zh')
+        item.content = f'<h1>第{i + 1}章</h1><p>第{i + 1}章的正文</p>'
+        book.add_item(item)
+        items.append(item)
+    
+    if image:
+        book.add_item(epub.EpubItem(
+            uid='image', file_name='images/big.png', media_type='image/png', content=b'\x89PNG' * 1000
+        ))
+    
+    book.toc = items
+    book.spine = items
+    book.add_item(epub.EpubNcx())
+    epub.write_epub(str(path), book)
+
+
+class TestEpubParser:
+    """EPUB解析器测试"""
+    
+    def test_parse_chapters(self, tmp_path):
+        """测试按书脊顺序提取章节"""
+        test_file = tmp_path / 'book.epub'
+        _write_epub(test_file, 3)
+        
+        doc = EpubParser(test_file).parse()
+        
+        assert doc.title == '测试书籍'
+        assert doc.author == '作者'
+        assert [c.title for c in doc.chapters] == ['第1章', '第2章', '第3章']
+        assert doc.chapters[1].content == '第2章\n\n第2章的正文'
+    
+    def test_parse_metadata(self, tmp_path, monkeypatch):
+        """测试EPUB元数据只读取OPF"""
+        import zipfile
+        
+        test_file = tmp_path / 'book.epub'
+        _write_epub(test_file, 3, image=True)
+        read_names = []
+        original_read = zipfile.ZipFile.read
+        
+        def tracking_read(self, name, *args, **kwargs):
+            read_names.append(name)
+            return original_read(self, name, *args, **kwargs)
+        
+        monkeypatch.setattr(zipfile.ZipFile, 'read', tracking_read)
+        meta = EpubParser(test_file).parse_metadata()
+        
+        assert (meta.title, meta.author, meta.chapter_count) == ('测试书籍', '作者', 3)
+        assert all(name.endswith(('container.xml', '.opf')) for name in read_names)
+    
+    def test_parallel_matches_serial(self, tmp_path, monkeypatch):
+        """测试并行转换结果与串行一致且保持顺序"""
+        test_file = tmp_path / 'book.epub'
+        _write_epub(test_file, 12)
+        serial = EpubParser(test_file).parse()
+        
+        monkeypatch.setattr(EpubParser, 'PARALLEL_MIN_ITEMS', 1)
+        monkeypatch.setattr(EpubParser, 'PARALLEL_MIN_BYTES', 0)
+        monkeypatch.setattr(EpubParser, 'MAX_WORKERS', 2)
+        monkeypatch.setattr('ibook_reader.parsers.epub_parser.os.cpu_count', lambda: 2)
+        calls = []
+        original = EpubParser._convert_parallel
+        
+        def tracking(self, contents):
+            calls.append(len(contents))
+            return original(self, contents)
+        
+        monkeypatch.setattr(EpubParser, '_convert_parallel', tracking)
+        parallel = EpubParser(test_file).parse()
+        
+        assert calls == [12]
+        assert parallel.chapters == serial.chapters
+    
+    def test_many_small_chapters_stay_serial(self, monkeypatch):
+        """测试章节多但总量小的书不启动进程池"""
+        monkeypatch.setattr('ibook_reader.parsers.epub_parser.os.cpu_count', lambda: 8)
+        parser = EpubParser.__new__(EpubParser)
+        
+        assert parser._use_parallel([b'x' * 3000] * 256) is False
+        assert parser._use_parallel([b'x' * EpubParser.PARALLEL_MIN_BYTES]) is False
+        assert parser._use_parallel([b'x' * (EpubParser.PARALLEL_MIN_BYTES // 4)] * 4) is True
+    
+    def test_lazy_mode(self, tmp_path, monkeypatch):
+        """测试按需读取模式只解压访问到的章节"""
+        import zipfile
+        
+        test_file = tmp_path / 'book.epub'
+        _write_epub(test_file, 3, image=True)
+        full = EpubParser(test_file).parse()
+        
+        monkeypatch.setattr(EpubParser, 'MODE', 'lazy')
+        read_names = []
+        original_read = zipfile.ZipFile.read
+        
+        def tracking_read(self, name, *args, **kwargs):
+            read_names.append(name)
+            return original_read(self, name, *args, **kwargs)
+        
+        monkeypatch.setattr(zipfile.ZipFile, 'read', tracking_read)
+        parser = EpubParser(test_file)
+        doc = parser.parse()
+        
+        assert parser.should_cache() is False
+        assert doc.metadata['lazy'] == 'true'
+        assert doc.title == '测试书籍'
+        assert [c.title for c in doc.chapters] == ['第1章', '第2章', '第3章']
+        assert not any(name.endswith('.xhtml') for name in read_names)
+        
+        assert doc.chapters[1].content == full.chapters[1].content
+        assert not any(name.endswith(('chap_2.xhtml', '.png')) for name in read_names)
+
+
+def _palmdoc_compress(data):
+    """PalmDOC 压缩（测试用的简单贪心实现）"""
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        best, best_distance = 0, 0
+        for distance in range(1, min(i, 2047) + 1):
+            length = 0
+            while length < 10 and i + length < len(data) and data[i + length - distance] == data[i + length]:
+                length += 1
+            if length > best:
+                best, best_distance = length, distance
+        if best >= 3:
+            out += (0x8000 | (best_distance << 3) | (best - 3)).to_bytes(2, 'big')
+            i += best
+        elif data[i] == 0x20 and i + 1 < len(data) and 0x40 <= data[i + 1] < 0x80:
+            out.append(data[i + 1] ^ 0x80)
+            i += 2
+        elif data[i] == 0 or 0x09 <= data[i] < 0x80:
+            out.append(data[i])
+            i += 1
+        else:
+            out += bytes([1, data[i]])
+            i += 1
+    return bytes(out)
+
+
+def _write_mobi(path, html_text, title='测试书', author='作者', record_size=64):
+    """生成测试用MOBI文件（PalmDOC 压缩、UTF-8、含 EXTH 与末尾附加数据）"""
+    import struct
+    
+    raw = html_text.encode('utf-8')
+    chunks = [raw[i:i + record_size] for i in range(0, len(raw), record_size)]
+    # 每条记录末尾：多字节标记（无跨记录字节）+ 一个长度为3的附加条目
+    text_records = [_palmdoc_compress(chunk) + b'\x00' + b'xy\x83' for chunk in chunks]
+    
+    exth_records = b''.join(
+        struct.pack('>II', record_type, len(value) + 8) + value
+        for record_type, value in ((100, author.encode()), (503, title.encode()))
+    )
+    exth = b'EXTH' + struct.pack('>II', len(exth_records) + 12, 2) + exth_records
+    
+    header_length = 0xE8
+    mobi = bytearray(header_length)
+    mobi[0:4] = b'MOBI'
+    struct.pack_into('>III', mobi, 4, header_length, 2, 65001)
+    struct.pack_into('>I', mobi, 20, 6)
+    struct.pack_into('>I', mobi, 0x80 - 16, 0x40)
+    struct.pack_into('>H', mobi, 0xF2 - 16, 0b11)
+    
+    name = b'Fallback Name'
+    name_offset = 16 + header_length + len(exth)
+    struct.pack_into('>II', mobi, 84 - 16, name_offset, len(name))
+    
+    palmdoc = struct.pack('>HHIHHHH', 2, 0, len(raw), len(text_records), record_size, 0, 0)
+    record0 = palmdoc + bytes(mobi) + exth + name
+    
+    records = [record0] + text_records
+    offset = 78 + 8 * len(records) + 2
+    header = bytearray(78)
+    header[0:8] = b'testbook'
+    header[60:68] = b'BOOKMOBI'
+    struct.pack_into('>H', header, 76, len(records))
+    table = b''
+    for i, record in enumerate(records):
+        table += struct.pack('>II', offset, i)
+        offset += len(record)
+    
+    path.write_bytes(bytes(header) + table + b'\x00\x00' + b''.join(records))
+
+
+class TestMobiParser:
+    """MOBI解析器测试"""
+    
+    def test_palmdoc_decompress(self):
+        """测试PalmDOC解压（含重叠回溯复制）"""
+        from ibook_reader.parsers.mobi_reader import palmdoc_decompress
+        
+        data = b'aaaaaaaaaaaa hello hello world \xe4\xb8\xad\x00'
+        
+        assert palmdoc_decompress(_palmdoc_compress(data)) == data
+        assert palmdoc_decompress(b'a\x80\x0f') == b'a' * 11
+    
+    def test_parse_native(self, tmp_path, monkeypatch):
+        """测试内置读取器解析MOBI，不调用 mobi 库"""
+        import mobi
+        monkeypatch.setattr(mobi, 'extract', lambda *args: pytest.fail('不应解包到临时目录'))
+        
+        test_file = tmp_path / 'book.mobi'
+        body = ''.join(f'<p>第{i}段中文内容</p>' for i in range(20))
+        _write_mobi(test_file, f'<html><body>{body}</body></html>')
+        
+        doc = MobiParser(test_file).parse()
+        
+        assert doc.title == '测试书'
+        assert doc.author == '作者'
+        assert doc.chapters[0].content == '\n\n'.join(f'第{i}段中文内容' for i in range(20))
+    
+    def test_split_chapters(self, tmp_path):
+        """测试按目录链接和分页标记分割章节"""
+        toc = ''.join(f'<p><a filepos={{pos{i}}}>第{i}章 标题</a></p>' for i in (1, 2))
+        body = (
+            '<html><body><h1>目录</h1>' + toc + '<mbp:pagebreak/>'
+            '<a name="c1"/><h2>第一章</h2><p>第一章正文</p><mbp:pagebreak/>'
+            '<p id="c2">第二章正文</p></body></html>'
+        )
+        # filepos 为正文字节偏移，占位符宽度固定以免影响偏移
+        placeholder = {'pos1': '0' * 10, 'pos2': '0' * 10}
+        raw = body.format(**placeholder).encode('utf-8')
+        positions = {
+            'pos1': f"{raw.index('<a name'.encode()):010d}",
+            'pos2': f"{raw.index('<p id'.encode()) + 2:010d}",
+        }
+        test_file = tmp_path / 'book.mobi'
+        _write_mobi(test_file, body.format(**positions))
+        
+        doc = MobiParser(test_file).parse()
+        
+        assert [c.title for c in doc.chapters] == ['目录', '第1章 标题', '第2章 标题']
+        assert doc.chapters[1].content == '第一章\n\n第一章正文'
+        assert doc.chapters[2].content == '第二章正文'
+        for chapter in doc.chapters:
+            assert doc.full_content[chapter.start_position:].startswith(chapter.content)
+    
+    def test_parse_metadata(self, tmp_path, monkeypatch):
+        """测试MOBI元数据只读取文件头"""
+        from ibook_reader.parsers.mobi_reader import MobiReader
+        monkeypatch.setattr(MobiReader, 'iter_text_records', lambda *args: pytest.fail('不应读取正文'))
+        test_file = tmp_path / 'book.mobi'
+        _write_mobi(test_file, '<p>内容</p>')
+        
+        meta = MobiParser(test_file).parse_metadata()
+        
+        assert (meta.title, meta.author, meta.format) == ('测试书', '作者', 'mobi')
+    
+    def test_invalid_file(self, tmp_path):
+        """测试非MOBI文件直接报错而不是当作文本读取"""
+        test_file = tmp_path / 'bad.mobi'
+        test_file.write_bytes(b'not a mobi file')
+        
+        with pytest.raises(ValueError):
+            MobiParser(test_file).parse()
+
+
+class TestHtmlText:
+    """HTML转文本测试"""
+    
+    def test_blocks_and_title(self):
+        """测试按块分段并提取标题"""
+        result = html_to_text(
+            '<html><head><title>页面</title><style>p {}</style></head><body>'
+            '<h2>第一章 <b>开始</b></h2><p>第一段\n  继续<br/>换行</p>'
+            '<div>第二段</div><script>var x;</script></body></html>'
+        )
+        
+        assert result.title == '第一章 开始'
+        assert result.text == '第一章 开始\n\n第一段 继续\n换行\n\n第二段'
+    
+    def test_title_priority(self):
+        """测试标题优先级 h1 > h2 > title"""
+        result = html_to_text('<html><head><title>页面</title></head><body><h2>副标题</h2><h1>主标题</h1></body></html>')
+        
+        assert result.title == '主标题'
+    
+    def test_anchors_and_breaks(self):
+        """测试锚点与分页标记位置"""
+        result = html_to_text(
+            '<html><body><p>前文</p><mbp:pagebreak/><p id="c2">第二章</p>'
+            '<p>正文<a name="n1">注</a></p></body></html>'
+        )
+        
+        assert result.text[result.anchors['c2']:].startswith('第二章')
+        assert result.text[result.anchors['n1']:].startswith('正文')
+        assert result.breaks == [result.anchors['c2']]
+
+
 class TestParserFactory:
     """解析器工厂测试"""
     
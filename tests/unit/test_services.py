@@ -1,5 +1,6 @@
 """测试业务服务层"""
 
+import os
 import pytest
 from pathlib import Path
 from datetime import datetime
@@ -10,10 +11,13 @@ from ibook_reader.services.auth_service import AuthService
 from ibook_reader.services.bookmark_service import BookmarkService
 from ibook_reader.services.progress_service import ProgressService
 from ibook_reader.services.reader_service import ReaderService
+from ibook_reader.services.document_cache import DocumentCache
+from ibook_reader.parsers.txt_parser import TxtParser
 from ibook_reader.models.document import Document, Chapter
 from ibook_reader.models.bookmark import Bookmark
 from ibook_reader.core.paginator import Page
 from ibook_reader.config import Config
+from ibook_reader.utils.file_utils import get_file_hash
 
 
 class TestAuthService:
@@ -231,6 +235,44 @@ class TestBookmarkService:
         assert len(service.load_bookmarks(temp_file)) == 0
 
 
+    @pytest.mark.parametrize('backend', ['json', 'sqlite'])
+    def test_concurrent_adds_are_kept(self, temp_config, temp_file, backend):
+        """测试两个实例并发添加书签时互不覆盖"""
+        import threading
+        
+        temp_config.set_storage_backend(backend)
+        services = [BookmarkService(config=temp_config) for _ in range(2)]
+        doc = Document("测试文档", chapters=[Chapter(0, "第一章", "内容")])
+        page = Page("页面内容", 1, 0)
+        
+        def add_many(service):
+            for _ in range(10):
+                service.add_bookmark(temp_file, page, doc)
+        
+        threads = [threading.Thread(target=add_many, args=(service,)) for service in services]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        bookmarks = services[0].load_bookmarks(temp_file)
+        assert sorted(b.id for b in bookmarks) == list(range(1, 21))
+    
+    def test_sampled_scheme_migrates_md5_bookmarks(self, temp_config, temp_file):
+        """测试切换到抽样指纹后旧的 MD5 书签被迁移"""
+        service = BookmarkService(config=temp_config)
+        doc = Document("测试文档", chapters=[Chapter(0, "第一章", "内容")])
+        page = Page("页面内容", 1, 0)
+        service.add_bookmark(temp_file, page, doc)
+        
+        temp_config.set_fingerprint_scheme('sampled')
+        bookmarks = service.load_bookmarks(temp_file)
+        
+        assert len(bookmarks) == 1
+        assert service.store.get_bookmarks(get_file_hash(temp_file, 'md5')) is None
+        assert service.store.get_bookmarks(get_file_hash(temp_file, 'sampled')) is not None
+
+
 class TestProgressService:
     """进度服务测试类"""
     
@@ -331,6 +373,222 @@ class TestProgressService:
         
         assert len(all_progress) == 1
         assert all_progress[0].file_name == temp_file.name
+    
+    def test_sampled_scheme_migrates_md5_progress(self, temp_config, temp_file):
+        """测试切换到抽样指纹后旧的 MD5 进度仍能匹配并被迁移"""
+        service = ProgressService(config=temp_config)
+        
+        doc = Document("测试文档", chapters=[Chapter(0, "第一章", "内容")])
+        service.save_progress(service.create_progress(temp_file, doc, 7, 0, 100))
+        
+        temp_config.set_fingerprint_scheme('sampled')
+        loaded = service.load_progress(temp_file)
+        
+        assert loaded.current_page == 7
+        assert loaded.hash_scheme == 'sampled'
+        assert loaded.file_hash == get_file_hash(temp_file, 'sampled')
+        
+        stored = service.get_all_progress()
+        assert len(stored) == 1
+        assert stored[0].hash_scheme == 'sampled'
+
+
+class TestDocumentCache:
+    """文档缓存测试类"""
+    
+    @pytest.fixture
+    def temp_config(self):
+        """创建临时配置目录"""
+        temp_dir = Path(tempfile.mkdtemp())
+        config = Config()
+        config.config_dir = temp_dir
+        config.config_file = temp_dir / 'config.json'
+        config.progress_file = temp_dir / 'progress.json'
+        config.bookmarks_dir = temp_dir / 'bookmarks'
+        config.cache_dir = temp_dir / 'cache'
+        config._ensure_directories()
+        
+        yield config
+        
+        # 清理
+        if temp_dir.exists():
+            shutil.rmtree(temp_dir)
+    
+    @pytest.fixture
+    def temp_file(self):
+        """创建临时文件"""
+        temp_file = Path(tempfile.mktemp(suffix='.txt'))
+        temp_file.write_text("缓存测试内容\n第二行", encoding='utf-8')
+        # 修改时间较早，文件指纹可以被缓存
+        os.utime(temp_file, (1_600_000_000, 1_600_000_000))
+        
+        yield temp_file
+        
+        # 清理
+        if temp_file.exists():
+            temp_file.unlink()
+    
+    def test_load_miss(self, temp_config, temp_file):
+        """测试缓存未命中"""
+        cache = DocumentCache(config=temp_config)
+        
+        assert cache.load(temp_file, TxtParser(temp_file)) is None
+    
+    def test_lazy_document_not_cached(self, temp_config, temp_file, monkeypatch):
+        """测试延迟加载的文档不写入缓存"""
+        monkeypatch.setattr(TxtParser, 'LAZY_THRESHOLD_MB', 0)
+        cache = DocumentCache(config=temp_config)
+        
+        document = cache.load_or_parse(temp_file, TxtParser(temp_file))
+        
+        assert document.metadata['lazy'] == 'true'
+        assert list(temp_config.cache_dir.glob('*.json')) == []
+    
+    def test_load_or_parse_caches_document(self, temp_config, temp_file, monkeypatch):
+        """测试解析结果被缓存，再次打开跳过解析"""
+        cache = DocumentCache(config=temp_config)
+        document = cache.load_or_parse(temp_file, TxtParser(temp_file))
+        
+        # 第二次加载不应再调用 parse
+        def fail_parse(self):
+            raise AssertionError("不应重新解析")
+        monkeypatch.setattr(TxtParser, 'parse', fail_parse)
+        
+        cached = cache.load_or_parse(temp_file, TxtParser(temp_file))
+        
+        assert cached == document
+    
+    def test_cold_open_reads_file_once(self, temp_config, temp_file, monkeypatch):
+        """测试冷启动时解析与计算指纹只读取一遍文件"""
+        from ibook_reader.utils import fingerprint
+        
+        def fail_compute(path):
+            raise AssertionError("不应单独读取文件计算指纹")
+        monkeypatch.setitem(fingerprint.SCHEMES, 'md5', fail_compute)
+        
+        cache = DocumentCache(config=temp_config)
+        document = cache.load_or_parse(temp_file, TxtParser(temp_file))
+        
+        digest = cache.fingerprints.lookup(temp_file.stat(), 'md5')
+        assert digest == fingerprint.compute_md5(temp_file)
+        assert get_file_hash(temp_file, cache=cache.fingerprints) == digest
+        assert cache.load(temp_file, TxtParser(temp_file)) == document
+    
+    def test_fingerprints_stored_in_config_dir(self, temp_config, temp_file):
+        """测试文件指纹保存在注入配置的目录下"""
+        cache = DocumentCache(config=temp_config)
+        cache.load_or_parse(temp_file, TxtParser(temp_file))
+        
+        assert temp_config.fingerprint_file.parent == temp_config.config_dir
+        assert temp_config.fingerprint_file.exists()
+    
+    def test_uncached_fingerprint_still_uses_document_cache(self, temp_config, temp_file, monkeypatch):
+        """测试指纹未缓存时，不边读边算指纹的解析器（如 EPUB）仍命中文档缓存"""
+        from ibook_reader.utils import fingerprint
+        
+        monkeypatch.setattr(TxtParser, 'SUPPORTS_INGEST_HASH', False)
+        cache = DocumentCache(config=temp_config)
+        document = cache.load_or_parse(temp_file, TxtParser(temp_file))
+        
+        # 模拟文件被复制或指纹缓存被淘汰
+        monkeypatch.setitem(fingerprint._caches, str(temp_config.fingerprint_file), fingerprint.FingerprintCache())
+        
+        def fail_parse(self):
+            raise AssertionError("不应重新解析")
+        monkeypatch.setattr(TxtParser, 'parse', fail_parse)
+        
+        assert cache.load_or_parse(temp_file, TxtParser(temp_file)) == document
+    
+    def test_parser_version_invalidates(self, temp_config, temp_file, monkeypatch):
+        """测试解析器版本变化使缓存失效"""
+        cache = DocumentCache(config=temp_config)
+        cache.load_or_parse(temp_file, TxtParser(temp_file))
+        
+        monkeypatch.setattr(TxtParser, 'PARSER_VERSION', TxtParser.PARSER_VERSION + 1)
+        
+        assert cache.load(temp_file, TxtParser(temp_file)) is None
+    
+    def test_content_change_invalidates(self, temp_config, temp_file):
+        """测试文件内容变化使缓存失效"""
+        cache = DocumentCache(config=temp_config)
+        cache.load_or_parse(temp_file, TxtParser(temp_file))
+        
+        temp_file.write_text("新的内容", encoding='utf-8')
+        
+        assert cache.load(temp_file, TxtParser(temp_file)) is None
+    
+    def test_same_size_edit_invalidates_sampled(self, temp_config, tmp_path, monkeypatch):
+        """测试抽样指纹下大小不变的原地修改也使缓存失效"""
+        from ibook_reader.utils import fingerprint
+        
+        monkeypatch.setattr(temp_config, 'get_fingerprint_scheme', lambda: 'sampled')
+        file_path = tmp_path / 'big.txt'
+        file_path.write_bytes(b'a' * 300_000)
+        os.utime(file_path, (1_600_000_000, 1_600_000_000))
+        cache = DocumentCache(config=temp_config)
+        cache.load_or_parse(file_path, TxtParser(file_path))
+        digest = fingerprint.compute_sampled(file_path)
+        
+        # 修改抽样块之外的内容，抽样指纹不变
+        with open(file_path, 'r+b') as f:
+            f.seek(100_000)
+            f.write(b'b')
+        os.utime(file_path, (1_600_000_100, 1_600_000_100))
+        assert fingerprint.compute_sampled(file_path) == digest
+        
+        assert cache.load(file_path, TxtParser(file_path)) is None
+        assert 'b' in cache.load_or_parse(file_path, TxtParser(file_path)).chapters[0].content
+    
+    def test_evict_old_entries(self, temp_config, tmp_path, monkeypatch):
+        """测试缓存条目数量上限"""
+        monkeypatch.setattr(DocumentCache, 'MAX_ENTRIES', 2)
+        cache = DocumentCache(config=temp_config)
+        
+        for i in range(4):
+            file_path = tmp_path / f'book{i}.txt'
+            file_path.write_text(f"内容{i}", encoding='utf-8')
+            cache.load_or_parse(file_path, TxtParser(file_path))
+        
+        assert len(list(temp_config.cache_dir.glob('*.json'))) == 2
+    
+    def test_evict_by_total_bytes(self, temp_config, tmp_path, monkeypatch):
+        """测试缓存总大小上限"""
+        cache = DocumentCache(config=temp_config)
+        
+        for i in range(4):
+            file_path = tmp_path / f'book{i}.txt'
+            file_path.write_text(f"内容{i}", encoding='utf-8')
+            cache.load_or_parse(file_path, TxtParser(file_path))
+            if i == 0:
+                entry_size = next(temp_config.cache_dir.glob('*.json')).stat().st_size
+                monkeypatch.setattr(DocumentCache, 'MAX_BYTES', entry_size * 2 + entry_size // 2)
+        
+        assert len(list(temp_config.cache_dir.glob('*.json'))) == 2
+    
+    def test_large_plain_text_not_cached(self, temp_config, temp_file, monkeypatch):
+        """测试超过解析器缓存上限的纯文本不写入缓存，但仍发布文件指纹"""
+        from ibook_reader.utils import fingerprint
+        
+        monkeypatch.setattr(TxtParser, 'CACHE_MAX_BYTES', 1)
+        cache = DocumentCache(config=temp_config)
+        
+        document = cache.load_or_parse(temp_file, TxtParser(temp_file))
+        
+        assert document.chapters
+        assert list(temp_config.cache_dir.glob('*.json')) == []
+        assert cache.fingerprints.lookup(temp_file.stat(), 'md5') == fingerprint.compute_md5(temp_file)
+        
+        # 指纹已缓存时同样跳过文档缓存
+        assert cache.load_or_parse(temp_file, TxtParser(temp_file)) == document
+        assert list(temp_config.cache_dir.glob('*.json')) == []
+    
+    def test_clear(self, temp_config, temp_file):
+        """测试清空缓存"""
+        cache = DocumentCache(config=temp_config)
+        cache.load_or_parse(temp_file, TxtParser(temp_file))
+        
+        assert cache.clear() == 1
+        assert cache.load(temp_file, TxtParser(temp_file)) is None
 
 
 class TestReaderService:
@@ -457,3 +715,166 @@ class TestReaderService:
         
         assert result is True
         assert service.current_page == service.total_pages
+    
+    def test_page_turns_are_written_behind(self, temp_config, temp_txt_file, monkeypatch):
+        """测试翻页不立即写盘，save_and_exit 时写回最终位置"""
+        monkeypatch.setattr(ReaderService, 'FLUSH_DELAY', 60)
+        progress_service = ProgressService(config=temp_config)
+        service = ReaderService(
+            bookmark_service=BookmarkService(config=temp_config),
+            progress_service=progress_service
+        )
+        service.load_document(temp_txt_file, rows=10, cols=40)
+        
+        saved = []
+        original_save = progress_service.save_progress
+        monkeypatch.setattr(progress_service, 'save_progress',
+                            lambda progress: (saved.append(progress.current_page), original_save(progress)))
+        
+        service.next_page()
+        service.next_page()
+        assert saved == []
+        
+        service.save_and_exit()
+        assert saved == [3]
+        assert progress_service.load_progress(temp_txt_file).current_page == 3
+        assert service.flush_progress() is False
+    
+    def test_flush_after_delay(self, temp_config, temp_txt_file, monkeypatch):
+        """测试延迟时间到达后自动写回"""
+        import time
+        
+        monkeypatch.setattr(ReaderService, 'FLUSH_DELAY', 0.05)
+        progress_service = ProgressService(config=temp_config)
+        service = ReaderService(
+            bookmark_service=BookmarkService(config=temp_config),
+            progress_service=progress_service
+        )
+        service.load_document(temp_txt_file, rows=10, cols=40)
+        
+        service.next_page()
+        deadline = time.monotonic() + 5
+        while service._dirty and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        assert progress_service.load_progress(temp_txt_file).current_page == 2
+    
+    def test_failed_background_flush_is_rescheduled(self, temp_config, temp_txt_file, monkeypatch):
+        """测试延迟写回失败时保留未保存状态并重新安排写回"""
+        import time
+        
+        monkeypatch.setattr(ReaderService, 'FLUSH_DELAY', 0.05)
+        progress_service = ProgressService(config=temp_config)
+        service = ReaderService(
+            bookmark_service=BookmarkService(config=temp_config),
+            progress_service=progress_service
+        )
+        service.load_document(temp_txt_file, rows=10, cols=40)
+        
+        attempts = []
+        original_save = progress_service.save_progress
+        def flaky_save(progress):
+            attempts.append(progress.current_page)
+            if len(attempts) == 1:
+                raise OSError("磁盘已满")
+            original_save(progress)
+        monkeypatch.setattr(progress_service, 'save_progress', flaky_save)
+        
+        service.next_page()
+        deadline = time.monotonic() + 5
+        while (len(attempts) < 2 or service._dirty) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        assert attempts == [2, 2]
+        assert progress_service.load_progress(temp_txt_file).current_page == 2
+    
+    def test_fingerprint_computed_outside_progress_lock(self, temp_config, temp_txt_file, monkeypatch):
+        """测试创建进度（计算文件指纹）时不持有进度锁"""
+        progress_service = ProgressService(config=temp_config)
+        service = ReaderService(
+            bookmark_service=BookmarkService(config=temp_config),
+            progress_service=progress_service
+        )
+        service.load_document(temp_txt_file, rows=10, cols=40)
+        
+        original_create = progress_service.create_progress
+        def create_progress(*args):
+            assert not service._progress_lock.locked()
+            return original_create(*args)
+        monkeypatch.setattr(progress_service, 'create_progress', create_progress)
+        
+        service.next_page()
+        
+        assert service._progress.current_page == 2
+        service.flush_progress()
+    
+    def test_chapter_change_flushes(self, temp_config, tmp_path, monkeypatch):
+        """测试切换章节时立即写回"""
+        monkeypatch.setattr(ReaderService, 'FLUSH_DELAY', 60)
+        file_path = tmp_path / 'book.txt'
+        file_path.write_text(
+            "第一章 开始\n" + "内容" * 200 + "\n第二章 继续\n" + "内容" * 200, encoding='utf-8'
+        )
+        progress_service = ProgressService(config=temp_config)
+        service = ReaderService(
+            bookmark_service=BookmarkService(config=temp_config),
+            progress_service=progress_service
+        )
+        service.load_document(file_path, rows=10, cols=40)
+        service.next_page()
+        
+        assert service.next_chapter() is True
+        
+        progress = progress_service.load_progress(file_path)
+        assert progress is not None
+        assert progress.current_chapter == 1
+    
+    def test_chapter_navigation_skips_empty_chapters(self, temp_config):
+        """测试章节跳转跳过没有页面的空章节（如按需读取的只有图片的 EPUB 章节）"""
+        from ibook_reader.core.paginator import Paginator
+        from ibook_reader.models.document import LazyChapter
+        
+        doc = Document("测试文档", chapters=[
+            Chapter(0, "第一章", "内容一"),
+            LazyChapter(1, "插图", loader=lambda: ""),
+            Chapter(2, "第三章", "内容三"),
+        ])
+        service = ReaderService(
+            bookmark_service=BookmarkService(config=temp_config),
+            progress_service=ProgressService(config=temp_config)
+        )
+        service.document = doc
+        service.paginator = Paginator(doc, rows=10, cols=40)
+        service.total_pages = service.paginator.get_total_pages()
+        
+        assert service.next_chapter() is True
+        assert service.get_current_page().chapter_index == 2
+        assert service.prev_chapter() is True
+        assert service.get_current_page().chapter_index == 0
+        assert service.paginator.get_nearest_chapter_page(1).chapter_index == 2
+        assert service.paginator.get_nearest_chapter_page(1, step=-1).chapter_index == 0
+    
+    def test_segmented_document_has_one_chapter(self, temp_config, tmp_path, monkeypatch):
+        """测试分段加载的大 TXT 不把段当作章节导航"""
+        from ibook_reader.parsers.mapped_text import MappedTextFile
+        
+        monkeypatch.setattr(TxtParser, 'LAZY_THRESHOLD_MB', 0)
+        monkeypatch.setattr(MappedTextFile, 'SEGMENT_SIZE', 64)
+        file_path = tmp_path / 'big.txt'
+        file_path.write_text('\n'.join(f'第{i}行内容' for i in range(200)), encoding='utf-8')
+        service = ReaderService(
+            bookmark_service=BookmarkService(config=temp_config),
+            progress_service=ProgressService(config=temp_config)
+        )
+        service.load_document(file_path, rows=10, cols=40)
+        
+        assert service.document.total_chapters > 1
+        assert service.next_chapter() is False
+        assert service.current_page == 1
+        
+        # 打开其他文档时释放内存映射
+        first = service.document
+        other = tmp_path / 'other.txt'
+        other.write_text('内容', encoding='utf-8')
+        service.load_document(other, rows=10, cols=40)
+        assert first.resources == []
@@ -0,0 +1,264 @@
+"""测试进度与书签存储模块"""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from ibook_reader.config import Config
+from ibook_reader.storage import JournalStore, JsonStore, SqliteStore, create_store
+
+
+def _progress(file_hash, file_path='/books/a.txt', days_ago=0):
+    """构造进度记录"""
+    return {
+        'file_path': file_path,
+        'file_hash': file_hash,
+        'file_name': file_path.rsplit('/', 1)[-1],
+        'current_page': 3,
+        'current_chapter': 0,
+        'total_pages': 10,
+        'total_chapters': 1,
+        'last_read_time': (datetime.now() - timedelta(days=days_ago)).isoformat(),
+        'read_percentage': 30.0,
+        'hash_scheme': 'md5'
+    }
+
+
+@pytest.fixture
+def temp_config(tmp_path):
+    """创建临时配置目录"""
+    config = Config()
+    config.config_dir = tmp_path
+    config.config_file = tmp_path / 'config.json'
+    config.progress_file = tmp_path / 'progress.json'
+    config.bookmarks_dir = tmp_path / 'bookmarks'
+    config._ensure_directories()
+    return config
+
+
+class TestStores:
+    """各存储后端的共同行为"""
+
+    @pytest.fixture(params=[JsonStore, SqliteStore, JournalStore])
+    def store(self, request, temp_config):
+        """创建存储"""
+        store = request.param(temp_config)
+        yield store
+        store.close()
+
+    def test_progress_roundtrip(self, store):
+        """测试进度记录的保存、查找与替换"""
+        store.put_progress(_progress('h1'))
+        store.put_progress(_progress('h2', '/books/b.txt'))
+
+        updated = _progress('h1')
+        updated['current_page'] = 7
+        store.put_progress(updated)
+
+        assert store.get_progress('h1')['current_page'] == 7
+        assert [r['file_hash'] for r in store.find_progress('/books/b.txt')] == ['h2']
+        assert len(store.all_progress()) == 2
+        assert store.get_progress('missing') is None
+
+    def test_older_progress_not_overwrite_newer(self, store):
+        """测试合并写入：较旧的进度不会覆盖较新的进度"""
+        newer = _progress('h1')
+        newer['current_page'] = 9
+        store.put_progress(newer)
+
+        stale = _progress('h1', days_ago=1)
+        stale['current_page'] = 2
+        store.put_progress(stale)
+
+        assert store.get_progress('h1')['current_page'] == 9
+
+    def test_delete_progress(self, store):
+        """测试删除进度记录"""
+        store.put_progress(_progress('h1'))
+
+        assert store.delete_progress('h1') is True
+        assert store.delete_progress('h1') is False
+        assert store.all_progress() == []
+
+    def test_bookmarks_roundtrip(self, store):
+        """测试书签集合的保存、查找与删除"""
+        data = {'file_path': '/books/a.txt', 'file_name': 'a.txt', 'file_hash': 'h1',
+                'hash_scheme': 'md5', 'bookmarks': [{'id': 1}]}
+        store.put_bookmarks(data)
+
+        assert store.get_bookmarks('h1') == data
+        assert store.find_bookmarks('/books/a.txt') == [data]
+        assert store.delete_bookmarks('h1') is True
+        assert store.get_bookmarks('h1') is None
+        assert store.all_bookmarks() == []
+
+
+class TestSqliteStore:
+    """SQLite 存储测试类"""
+
+    def test_wal_mode_and_indexes(self, temp_config):
+        """测试数据库使用 WAL 模式并为路径建立索引"""
+        SqliteStore(temp_config).close()
+
+        conn = sqlite3.connect(str(temp_config.database_file))
+        try:
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            indexes = {row[1] for row in conn.execute("SELECT * FROM sqlite_master WHERE type = 'index'")}
+        finally:
+            conn.close()
+
+        assert {'idx_progress_path', 'idx_bookmarks_path'} <= indexes
+
+    def test_imports_json_once(self, temp_config):
+        """测试首次打开时导入已有的 JSON 数据，之后不再导入"""
+        temp_config.progress_file.write_text(
+            json.dumps({'documents': [_progress('h1')]}), encoding='utf-8'
+        )
+        (temp_config.bookmarks_dir / 'h1.json').write_text(
+            json.dumps({'file_path': '/books/a.txt', 'file_hash': 'h1', 'bookmarks': []}),
+            encoding='utf-8'
+        )
+
+        store = SqliteStore(temp_config)
+        assert store.get_progress('h1')['current_page'] == 3
+        assert store.get_bookmarks('h1')['file_path'] == '/books/a.txt'
+        store.delete_progress('h1')
+        store.close()
+
+        store = SqliteStore(temp_config)
+        assert store.get_progress('h1') is None
+        store.close()
+
+    def test_create_store_uses_config(self, temp_config):
+        """测试按配置选择存储后端"""
+        assert isinstance(create_store(temp_config), SqliteStore)
+
+        temp_config.set_storage_backend('json')
+        assert isinstance(create_store(temp_config), JsonStore)
+
+        with pytest.raises(ValueError):
+            temp_config.set_storage_backend('xml')
+
+    def test_clean_old_data(self, temp_config, tmp_path):
+        """测试清理过期进度与无效书签"""
+        book = tmp_path / 'a.txt'
+        book.write_text('内容', encoding='utf-8')
+
+        store = create_store(temp_config)
+        store.put_progress(_progress('old', str(book), days_ago=40))
+        store.put_progress(_progress('new', str(book)))
+        store.put_bookmarks({'file_path': str(tmp_path / 'gone.txt'), 'file_hash': 'gone',
+                             'bookmarks': [{'id': 1}]})
+        store.put_bookmarks({'file_path': str(book), 'file_hash': 'kept', 'bookmarks': [{'id': 1}]})
+
+        assert temp_config.clean_old_data(days=30) == 2
+        assert [r['file_hash'] for r in store.all_progress()] == ['new']
+        assert [d['file_hash'] for d in store.all_bookmarks()] == ['kept']
+        store.close()
+
+
+class TestJournalStore:
+    """日志式存储测试类"""
+
+    def test_updates_append_to_journal(self, temp_config):
+        """测试更新只追加日志，不重写快照"""
+        store = JournalStore(temp_config)
+        for page in range(1, 6):
+            record = _progress('h1')
+            record['current_page'] = page
+            store.put_progress(record)
+
+        assert not temp_config.progress_file.exists()
+        assert len(temp_config.progress_journal_file.read_bytes().splitlines()) == 5
+        assert JournalStore(temp_config).get_progress('h1')['current_page'] == 5
+
+    def test_replays_on_top_of_snapshot(self, temp_config):
+        """测试在已有的 progress.json 快照上重放日志"""
+        temp_config.progress_file.write_text(
+            json.dumps({'documents': [_progress('h1'), _progress('h2', '/books/b.txt')]}),
+            encoding='utf-8'
+        )
+        store = JournalStore(temp_config)
+        store.delete_progress('h2')
+
+        assert [r['file_hash'] for r in JournalStore(temp_config).all_progress()] == ['h1']
+
+    def test_torn_last_line_ignored(self, temp_config):
+        """测试写入中断留下的残行被忽略，且不影响之后的追加"""
+        store = JournalStore(temp_config)
+        store.put_progress(_progress('h1'))
+        with open(temp_config.progress_journal_file, 'ab') as f:
+            f.write(b'{"op": "put", "record": {"file_ha')
+
+        reopened = JournalStore(temp_config)
+        assert [r['file_hash'] for r in reopened.all_progress()] == ['h1']
+
+        reopened.put_progress(_progress('h2', '/books/b.txt'))
+        assert {r['file_hash'] for r in JournalStore(temp_config).all_progress()} == {'h1', 'h2'}
+
+    def test_compaction(self, temp_config, monkeypatch):
+        """测试日志超过阈值时压缩为快照"""
+        monkeypatch.setattr(JournalStore, 'COMPACT_BYTES', 2000)
+        store = JournalStore(temp_config)
+        other = JournalStore(temp_config)
+        other.all_progress()
+
+        for page in range(1, 21):
+            record = _progress('h1')
+            record['current_page'] = page
+            store.put_progress(record)
+
+        assert temp_config.progress_journal_file.stat().st_size < 2000
+        snapshot = json.loads(temp_config.progress_file.read_text(encoding='utf-8'))
+        assert len(snapshot['documents']) == 1
+        assert other.get_progress('h1')['current_page'] == 20
+
+
+
+def _open_store(config_dir, barrier, errors):
+    """在子进程中与其他进程同时打开 SQLite 存储"""
+    from pathlib import Path
+
+    config = Config()
+    config.config_dir = Path(config_dir)
+    config.config_file = config.config_dir / 'config.json'
+    config.progress_file = config.config_dir / 'progress.json'
+    config.bookmarks_dir = config.config_dir / 'bookmarks'
+    config._ensure_directories()
+    barrier.wait()
+    try:
+        SqliteStore(config).close()
+    except Exception as e:
+        errors.put(repr(e))
+
+
+class TestSqliteStoreConcurrency:
+    """SQLite 存储多进程测试类"""
+
+    def test_concurrent_cold_open(self, temp_config):
+        """测试多个进程同时首次打开数据库时只导入一次且不报错"""
+        import multiprocessing
+
+        temp_config.progress_file.write_text(
+            json.dumps({'documents': [_progress('h1')]}), encoding='utf-8'
+        )
+
+        context = multiprocessing.get_context('spawn')
+        barrier = context.Barrier(6)
+        errors = context.Queue()
+        workers = [
+            context.Process(target=_open_store, args=(str(temp_config.config_dir), barrier, errors))
+            for _ in range(6)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert errors.empty()
+        assert all(worker.exitcode == 0 for worker in workers)
+        store = SqliteStore(temp_config)
+        assert [r['file_hash'] for r in store.all_progress()] == ['h1']
+        store.close()
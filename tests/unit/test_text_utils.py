@@ -7,6 +7,7 @@ from ibook_reader.utils.text_utils import (
     truncate_text,
     normalize_text,
     wrap_text,
+    wrap_line,
     extract_preview
 )
 
@@ -157,3 +158,44 @@ class TestTextUtils:
         result = extract_preview(text, max_length=50)
         # 多余空格应该被合并
         assert result == "这是 一个 有多余 空格的文本"
+    
+    def test_wrap_line_ascii(self):
+        """测试纯ASCII按列数切片"""
+        assert wrap_line("abcdefghij", 4) == ["abcd", "efgh", "ij"]
+        assert wrap_line("abc", 4) == ["abc"]
+        assert wrap_line("", 4) == [""]
+    
+    def test_wrap_line_wide(self):
+        """测试纯中文按列数切片"""
+        assert wrap_line("一二三四五", 4) == ["一二", "三四", "五"]
+        # 奇数宽度时宽字符不能跨行
+        assert wrap_line("一二三四五", 5) == ["一二", "三四", "五"]
+    
+    def test_wrap_line_mixed(self):
+        """测试中英文混排换行"""
+        result = wrap_line("ab中文cd测试", 5)
+        assert result == ["ab中", "文cd", "测试"]
+        assert all(get_display_width(line) <= 5 for line in result)
+    
+    def test_wrap_line_matches_char_by_char(self):
+        """测试与逐字符累加宽度的换行结果一致"""
+        text = "Hello中文😀é　Ａ，World" * 7
+        
+        for max_width in (1, 2, 3, 7, 40):
+            expected = []
+            current, width = "", 0
+            for char in text:
+                char_width = get_char_width(char)
+                if width + char_width > max_width and current:
+                    expected.append(current)
+                    current, width = "", 0
+                current += char
+                width += char_width
+            expected.append(current)
+            
+            assert wrap_line(text, max_width) == expected
+    
+    def test_get_display_width_astral(self):
+        """测试BMP以外字符的宽度"""
+        assert get_display_width("😀") == 2
+        assert get_display_width("a😀b") == 4